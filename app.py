@@ -1,35 +1,38 @@
 # app.py
 
-# 使用 eventlet 进行 monkey-patching，以支持 Socket.IO 的异步特性
-import eventlet
-eventlet.monkey_patch()
+if __name__ == "__main__":
+    # 作为脚本启动时使用 eventlet 进行 monkey-patching，以支持 Socket.IO 的异步特性。
+    # 必须在导入其他模块之前进行；被 WSGI 服务器 (如 gunicorn 的 eventlet worker) 导入时由其负责。
+    import eventlet
+
+    eventlet.monkey_patch()
 
 import os
 import logging
+import mimetypes
 import platform
 import subprocess
-from flask import Flask, render_template, jsonify, request, send_from_directory
-from flask_socketio import SocketIO
-import webbrowser
 import threading
+from urllib.parse import quote
+from flask import Flask, Response, abort, render_template, jsonify, request, send_file
+from flask_socketio import SocketIO
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file as werkzeug_send_file
 
 from src import config as cfg
+from src import compression
 from src import utils
 from src import database
-from src import fetchers
-from src.crawler import Crawler
+from src import events
+from src import metrics
+from src import mirrors
+from src import retry
+from src import scheduler
+from src import storage
 
-# --- 初始化 --- #
-
-# 初始化日志
-utils.setup_logging()
 logger = logging.getLogger(__name__)
 
-# 初始化数据库
-database.init_db()
-
-# 加载配置
-config = cfg.load_config()
+# --- 初始化 --- #
 
 # 初始化 Flask 应用和 SocketIO
 app = Flask(__name__)
@@ -37,9 +40,131 @@ app.config["SECRET_KEY"] = "your-very-secret-key-change-it!"  # 请在生产环
 app.config["TEMPLATES_AUTO_RELOAD"] = True
 app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 0
 socketio = SocketIO(app, async_mode="eventlet")
+# 按 Accept-Encoding 压缩 JSON / HTML 响应 (参数见 config.yaml 的 compression 段)
+compression.init_app(app)
+# 所有推送给浏览器的事件都经过 event_bus：按房间路由，每个客户端有界排队并等待确认后再发送下一批
+event_bus = events.EventBus(socketio)
+
+# 配置、日志、数据库与爬虫服务在首次使用时才初始化 (见 init_services)，
+# 导入本模块本身不读取文件，也不导入 arxiv / requests。
+# crawler 负责界面发起的论文下载；每次抓取则由 job_manager 创建独立的任务运行。
+crawler = None
+job_manager = None
+# 论文的批量删除在后台任务中进行 (见 src/deletion.py)
+deletion_manager = None
+# 缓存的配置服务：按文件 mtime/inode 重新验证，原子写入
+config_service = None
+_init_lock = threading.Lock()
+
+# 定时抓取调度器 (config.yaml 中 schedules.enabled 为 true 时启动) 及各配置档专用的 Crawler
+crawl_scheduler = None
+_scheduled_crawlers = {}
+
+# /api/categories 的预计算响应 (见 get_categories)
+_categories_payload = None
+
+# /api/papers 单页的最大条数
+PAPERS_PAGE_LIMIT = 5000
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def init_services():
+    """加载配置、配置日志、初始化数据库并创建爬虫服务；重复调用不会重复初始化。"""
+    global crawler, job_manager, deletion_manager, config_service
+    if crawler is not None:
+        return crawler
+    with _init_lock:
+        if crawler is None:
+            from src.crawler import Crawler
+            from src.deletion import DeletionManager
+            from src.jobs import JobManager
+
+            config_service = cfg.ConfigService()
+            config = config_service.get()
+            # 日志模式与各模块级别取自配置中的 logging 段
+            utils.setup_logging(config.get("logging"))
+            compression.configure(config.get("compression"))
+            event_bus.configure(config.get("events"))
+            database.init_db()
+
+            # 将各主机熔断器的状态变化推送给前端
+            retry.add_state_listener(
+                lambda host, state: event_bus.emit("circuit_state", {"host": host, "state": state})
+            )
+            # 因磁盘配额被清理的论文推送给所有客户端，列表中显示为可重新下载 (或直接移除)
+            storage.add_eviction_listener(
+                lambda papers, kept: event_bus.emit(
+                    "papers_evicted", {"pdf_urls": [p["pdf_url"] for p in papers], "keep_metadata": kept}
+                )
+            )
+            job_settings = config.get("jobs") or {}
+            job_manager = JobManager(
+                event_bus,
+                max_concurrent=job_settings.get("max_concurrent", 2),
+                max_history=job_settings.get("max_history", 50),
+            )
+            deletion_manager = DeletionManager(event_bus, config.get("deletion"))
+            # 上次运行中断的删除任务留下的标记记录，在后台继续清理
+            deletion_manager.resume_pending()
+            crawler = Crawler(config, event_bus)
+            # 配置文件被保存或在外部修改后，下载服务立即使用新配置；已开始的抓取任务使用各自的快照
+            config_service.subscribe(_on_config_changed)
+
+            schedules = config.get("schedules") or {}
+            if schedules.get("enabled"):
+                _start_scheduler(schedules)
+    return crawler
+
+
+def _on_config_changed(new_config):
+    crawler.config = new_config
+    compression.configure(new_config.get("compression"))
+    event_bus.configure(new_config.get("events"))
+    deletion_manager.configure(new_config.get("deletion"))
+    logger.info("配置已更新并重新加载到爬虫服务。")
+
+
+def _run_scheduled_profile(profile_name):
+    """由调度器调用：以最新的配置文件运行一次配置档，边发现边下载。"""
+    from src.crawler import Crawler
+
+    profile_config = cfg.build_profile_config(config_service.get(), profile_name)
+    profile_crawler = _scheduled_crawlers.get(profile_name)
+    if profile_crawler is None:
+        # 每个配置档的 Crawler 在多次运行之间复用；事件只发往该配置档的房间，不打扰正在使用界面的用户
+        profile_crawler = _scheduled_crawlers[profile_name] = Crawler(
+            profile_config, event_bus, room=f"schedule:{profile_name}"
+        )
+    profile_crawler.config = profile_config
+    fetch_settings = profile_config.get("fetch_settings") or {}
+    # 定时任务与界面发起的抓取任务共享同一个并发上限
+    with job_manager.slot():
+        profile_crawler.run_pipelined(
+            fetch_settings.get("method", "category"), profile_config.get("categories") or {}
+        )
+
+
+def _is_profile_busy(profile_name):
+    """同一配置档的上一次定时运行仍在进行时跳过本次触发。"""
+    profile_crawler = _scheduled_crawlers.get(profile_name)
+    return profile_crawler is not None and profile_crawler.is_running
+
+
+def _start_scheduler(schedules):
+    global crawl_scheduler
+    try:
+        jobs = scheduler.jobs_from_config(schedules)
+    except (KeyError, ValueError) as e:
+        logger.error("schedules 配置无效，定时抓取未启动: %s", e)
+        return
+    crawl_scheduler = scheduler.Scheduler(jobs, _run_scheduled_profile, is_busy=_is_profile_busy).start()
+    logger.info("定时抓取已启动，共 %d 个任务。", len(jobs))
+
 
-# 初始化爬虫服务
-crawler = Crawler(config, socketio)
+@app.before_request
+def ensure_services():
+    init_services()
 
 # --- HTTP 路由 (REST API) --- #
 
@@ -53,7 +178,7 @@ def index():
 @app.route("/api/config", methods=["GET"])
 def get_config():
     """获取当前配置"""
-    return jsonify(cfg.load_config())
+    return jsonify(config_service.get())
 
 
 @app.route("/api/config", methods=["POST"])
@@ -72,10 +197,7 @@ def set_config():
     if "chinese_biorxiv" not in new_config["categories"]:
         new_config["categories"]["chinese_biorxiv"] = []
 
-    if cfg.save_config(new_config):
-        # 更新爬虫实例中的配置
-        crawler.config = new_config
-        logger.info("配置已更新并重新加载到爬虫服务。")
+    if config_service.save(new_config):
         return jsonify({"status": "success", "message": "配置已成功保存。"})
     else:
         return jsonify({"status": "error", "message": "保存配置失败。"}), 500
@@ -83,61 +205,144 @@ def set_config():
 
 @app.route("/api/papers", methods=["GET"])
 def get_papers():
-    """获取所有已下载论文的列表"""
-    papers = database.get_all_papers()
-    return jsonify(papers)
+    """
+    获取已下载论文的列表。
+    带 limit 参数时按下载时间倒序分页，每页最多 PAPERS_PAGE_LIMIT 条：第一页不带游标，之后以上一页
+    最后一条记录的 download_date 与 id 作为 before_date / before_id 获取下一页 (也接受旧的 offset 参数)；
+    记录总数放在 X-Total-Count 响应头中。
+    """
+    limit = request.args.get("limit", type=int)
+    if limit is None:
+        papers = database.get_all_papers()
+        total = len(papers)
+    else:
+        limit = max(1, min(limit, PAPERS_PAGE_LIMIT))
+        before_date = request.args.get("before_date")
+        before_id = request.args.get("before_id", type=int)
+        if before_date is not None and before_id is not None:
+            papers = database.get_papers_page(limit, before=(before_date, before_id))
+        else:
+            papers = database.get_papers_page(limit, offset=max(0, request.args.get("offset", 0, type=int)))
+        total = database.count_papers()
+    response = jsonify(papers)
+    response.headers["X-Total-Count"] = str(total)
+    return response
 
 
 @app.route("/api/papers/delete", methods=["POST"])
 def delete_papers():
-    """删除指定的论文记录及其对应的PDF文件"""
-    paper_ids = request.json.get("paper_ids", [])
+    """
+    删除指定的论文记录及其对应的PDF文件。
+    记录在一个事务中标记为已删除后立即返回 202，文件由后台删除任务清理；
+    请求体中的 sid (客户端的 Socket.IO 连接 ID) 用于接收 delete_progress 进度事件。
+    """
+    data = request.json or {}
+    paper_ids = data.get("paper_ids", [])
     if not paper_ids:
         return jsonify({"status": "error", "message": "未提供论文ID。"}), 400
 
     try:
-        # Delete from database and get filepaths
-        deleted_filepaths = database.delete_papers_by_ids(paper_ids)
-
-        # Delete actual PDF files
-        deleted_count = 0
-        for filepath in deleted_filepaths:
-            if filepath:  # Ensure filepath is not None or empty
-                full_path = os.path.join(
-                    os.path.dirname(os.path.abspath(__file__)), filepath
-                )
-                if os.path.exists(full_path):
-                    os.remove(full_path)
-                    deleted_count += 1
-                    logger.info(f"成功删除文件: {full_path}")
-                else:
-                    logger.warning(f"文件不存在，跳过删除: {full_path}")
-
-        logger.info(
-            f"成功删除 {len(paper_ids)} 条数据库记录，{deleted_count} 个文件被删除。"
-        )
+        job = deletion_manager.submit(paper_ids, owner=data.get("sid"))
+        if job is None:
+            return jsonify({"status": "success", "message": "没有需要删除的记录。", "total": 0})
+
+        logger.info("删除任务 %s 已开始: %d 条记录。", job.id, job.total)
         return (
             jsonify(
                 {
-                    "status": "success",
-                    "message": f"成功删除 {len(paper_ids)} 条记录，{deleted_count} 文件。",
+                    "status": "accepted",
+                    "job_id": job.id,
+                    "total": job.total,
+                    "message": f"正在删除 {job.total} 篇论文...",
                 }
             ),
-            200,
+            202,
         )
     except Exception as e:
-        logger.error(f"删除论文失败: {e}", exc_info=True)
+        logger.error("删除论文失败: %s", e, exc_info=True)
         return jsonify({"status": "error", "message": f"删除论文失败: {e}"}), 500
 
 
+@app.route("/api/deletions", methods=["GET"])
+def list_deletions():
+    """列出进行中与最近结束的删除任务"""
+    return jsonify(deletion_manager.list_jobs())
+
+
+@app.route("/api/deletions/<job_id>", methods=["GET"])
+def get_deletion(job_id):
+    """查询单个删除任务的进度与无法删除的文件"""
+    job = deletion_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "删除任务不存在。"}), 404
+    return jsonify(job.snapshot())
+
+
+@app.route("/api/storage", methods=["GET"])
+def get_storage():
+    """下载目录的磁盘使用情况、配额与清理策略"""
+    config = config_service.get()
+    download_root = (config.get("output_settings") or {}).get("download_dir") or "paper"
+    return jsonify(storage.status(config.get("storage"), os.path.join(PROJECT_ROOT, download_root)))
+
+
+@app.route("/api/mirrors", methods=["GET"])
+def get_mirrors():
+    """各数据源 PDF 镜像的吞吐量、失败率与当前的尝试顺序"""
+    return jsonify(mirrors.status(config_service.get().get("mirrors")))
+
+
 @app.route("/api/categories", methods=["GET"])
 def get_categories():
     """
     Get a list of categories from arXiv and bioRxiv.
+    分类表是固定的：首次请求时序列化并压缩一次，之后按 ETag 返回 304 或预先压缩好的内容。
     """
-    arxiv_categories = fetchers.get_arxiv_categories()
-    biorxiv_categories = fetchers.get_biorxiv_categories()
-    return jsonify({"arxiv": arxiv_categories, "biorxiv": biorxiv_categories})
+    global _categories_payload
+    if _categories_payload is None:
+        from src import fetchers
+
+        _categories_payload = compression.PrecomputedPayload(
+            app.json.dumps(
+                {"arxiv": fetchers.get_arxiv_categories(), "biorxiv": fetchers.get_biorxiv_categories()}
+            ).encode("utf-8")
+        )
+    return _categories_payload.response(request)
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """以 Prometheus 文本格式输出抓取与下载指标"""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.route("/api/jobs", methods=["GET"])
+def get_jobs():
+    """获取抓取任务列表 (运行中、排队中以及最近结束的任务)"""
+    return jsonify({"max_concurrent": job_manager.max_concurrent, "jobs": job_manager.list_jobs()})
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """获取单个抓取任务的状态"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "任务不存在。"}), 404
+    return jsonify(job.snapshot())
+
+
+@app.route("/api/schedules", methods=["GET"])
+def get_schedules():
+    """获取定时抓取任务的状态"""
+    if crawl_scheduler is None:
+        return jsonify({"enabled": False, "jobs": []})
+    return jsonify({"enabled": True, "jobs": crawl_scheduler.snapshot()})
+
+
+@app.route("/api/circuit_breakers", methods=["GET"])
+def get_circuit_breakers():
+    """获取各主机熔断器的当前状态"""
+    return jsonify(retry.breaker_states())
 
 
 def _open_path(path):
@@ -151,7 +356,7 @@ def _open_path(path):
             subprocess.run(["xdg-open", path], check=True)
         return True
     except Exception as e:
-        logger.error(f"无法打开路径 '{path}': {e}", exc_info=True)
+        logger.error("无法打开路径 '%s': %s", path, e, exc_info=True)
         return False
 
 
@@ -163,11 +368,11 @@ def open_file():
         return jsonify({"status": "error", "message": "未提供有效的文件路径。"}), 400
 
     # 安全起见，将路径转换为绝对路径
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    abs_path = os.path.join(base_dir, filepath)
+    abs_path = utils.resolve_paper_path(filepath)
 
     if not os.path.exists(abs_path) or not os.path.isfile(abs_path):
         return jsonify({"status": "error", "message": "文件不存在。"}), 404
+    database.touch_paper(abs_path)
 
     if _open_path(abs_path):
         return jsonify({"status": "success", "message": f"尝试打开文件: {filepath}"})
@@ -182,8 +387,7 @@ def open_folder():
     if not filepath or not isinstance(filepath, str):
         return jsonify({"status": "error", "message": "未提供有效的文件路径。"}), 400
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    abs_path = os.path.join(base_dir, filepath)
+    abs_path = utils.resolve_paper_path(filepath)
     folder_path = os.path.dirname(abs_path)
 
     if not os.path.exists(folder_path):
@@ -195,16 +399,80 @@ def open_folder():
         return jsonify({"status": "error", "message": "打开文件夹失败。"}), 500
 
 
+def _paper_etag(abs_path):
+    """
+    返回文件的内容摘要 (SHA-256) 作为强 ETag。
+    摘要在下载时计算并存入数据库；旧记录缺少摘要时计算一次并补写。
+    不属于任何论文记录的文件返回 None，由 send_file 生成默认的 ETag。
+    """
+    paper = database.get_paper_by_filepath(abs_path)
+    if paper is None:
+        return None
+    if not paper.get("sha256"):
+        paper["sha256"] = utils.file_sha256(abs_path)
+        database.set_paper_sha256(paper["id"], paper["sha256"])
+    return paper["sha256"]
+
+
+def _accel_redirect_response(abs_path, etag, max_age, serving):
+    """返回带 X-Accel-Redirect 头的空响应，由 nginx 的 internal location 发送文件。"""
+    relative_path = os.path.relpath(abs_path, PROJECT_ROOT).replace(os.sep, "/")
+    prefix = serving.get("accel_prefix", "/protected-papers/").rstrip("/")
+    mimetype = mimetypes.guess_type(abs_path)[0] or "application/octet-stream"
+    rv = Response(mimetype=mimetype)
+    rv.headers["X-Accel-Redirect"] = f"{prefix}/{quote(relative_path)}"
+    rv.last_modified = int(os.stat(abs_path).st_mtime)
+    if etag:
+        rv.set_etag(etag)
+    rv.cache_control.max_age = max_age
+    if not max_age:
+        rv.cache_control.no_cache = True
+    # 条件请求命中时直接返回 304，不再经过前置代理读取文件
+    return rv.make_conditional(request)
+
+
 @app.route("/paper_files/<path:filepath>")
 def serve_paper_file(filepath):
-    """提供对下载的PDF文件的访问"""
+    """
+    提供对下载的PDF文件的访问。
+    支持 ETag / Last-Modified 条件请求 (未变化时返回 304) 与 Range 分段读取，
+    浏览器可以边下载边显示大文件，重复打开时无需重新传输。
+    """
     # filepath 是从项目根目录开始的相对路径, e.g., "paper/arXiv/2023-10-27/some-paper.pdf"
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    # send_from_directory 需要一个绝对目录和一个文件名
-    # 我们需要从 filepath 中分离出目录和文件名
-    directory = os.path.join(base_dir, os.path.dirname(filepath))
-    filename = os.path.basename(filepath)
-    return send_from_directory(directory, filename)
+    config = config_service.get()
+    download_root = (config.get("output_settings") or {}).get("download_dir") or "paper"
+    # 只允许访问下载目录中的文件，防止通过 ../ 读取配置文件或数据库
+    download_dir = safe_join(PROJECT_ROOT, download_root)
+    abs_path = safe_join(PROJECT_ROOT, filepath)
+    if download_dir is None or abs_path is None:
+        abort(404)
+    # 与爬虫保存到数据库中的路径格式一致 (Windows 下为反斜杠)
+    download_dir, abs_path = os.path.normpath(download_dir), os.path.normpath(abs_path)
+    if not abs_path.startswith(download_dir + os.sep) or not os.path.isfile(abs_path):
+        abort(404)
+
+    # pdf_serving.mode: direct 由 Flask 发送文件；x-accel-redirect / x-sendfile 只返回响应头，
+    # 由前置的 nginx / Apache (mod_xsendfile) 零拷贝发送文件
+    serving = config.get("pdf_serving") or {}
+    mode = serving.get("mode", "direct")
+    max_age = serving.get("max_age", 0)
+    etag = _paper_etag(abs_path)
+    # 最近打开时间是磁盘配额 LRU 清理的依据
+    database.touch_paper(abs_path)
+
+    if mode == "x-accel-redirect":
+        return _accel_redirect_response(abs_path, etag, max_age, serving)
+    if mode == "x-sendfile":
+        return werkzeug_send_file(
+            abs_path,
+            request.environ,
+            use_x_sendfile=True,
+            conditional=True,
+            etag=etag or True,
+            max_age=max_age,
+            response_class=app.response_class,
+        )
+    return send_file(abs_path, conditional=True, etag=etag or True, max_age=max_age)
 
 
 # --- Socket.IO 事件处理 --- #
@@ -212,25 +480,47 @@ def serve_paper_file(filepath):
 
 @socketio.on("connect")
 def handle_connect():
-    logger.info(f"客户端连接: {request.sid}")
+    init_services()
+    event_bus.connect(request.sid)
+    logger.info("客户端连接: %s", request.sid)
     # 当客户端连接时，发送当前的运行状态
-    if crawler.is_running:
-        socketio.emit(
-            "status_update", {"status": "一个抓取任务已在运行中。"}, room=request.sid
+    active = job_manager.active_jobs()
+    if active:
+        event_bus.emit(
+            "status_update", {"status": f"当前有 {len(active)} 个抓取任务在运行或排队。"}, room=request.sid
         )
 
 
 @socketio.on("disconnect")
 def handle_disconnect():
-    logger.info(f"客户端断开连接: {request.sid}")
+    event_bus.disconnect(request.sid)
+    logger.info("客户端断开连接: %s", request.sid)
+
+
+@socketio.on("resync")
+def handle_resync(data=None):
+    """
+    客户端发现事件序号有缺口 (队列已满时进度事件被丢弃) 时请求当前状态，通过 ack 返回：
+    最新序号、所在房间中未结束任务的状态以及正在进行的下载进度。
+    """
+    rooms = event_bus.rooms_of(request.sid) | {request.sid}
+    jobs = [job for job in job_manager.active_jobs() if job.room in rooms]
+    downloads = crawler.active_downloads(rooms)
+    for job in jobs:
+        downloads.extend(job.crawler.active_downloads(rooms))
+    return {
+        "seq": event_bus.last_seq(request.sid),
+        "jobs": [job.snapshot() for job in jobs],
+        "downloads": downloads,
+    }
 
 
 @socketio.on("start_crawl")
 def handle_start_crawl(data):
     """处理开始抓取事件"""
     mode = data.get("mode", "category")
-    # 更新配置以匹配当前的抓取参数
-    current_config = cfg.load_config()
+    # 以当前配置为基础合并本次抓取的参数；这些参数只属于本次任务，不写回配置文件
+    current_config = config_service.get()
     current_config["fetch_settings"]["method"] = mode
     current_config["keywords"] = data.get("keywords", [])
     current_config["categories"] = data.get("categories", {})
@@ -239,20 +529,67 @@ def handle_start_crawl(data):
     new_fetch_settings = data.get("fetch_settings", {})
     current_config["fetch_settings"].update(new_fetch_settings)
 
-    cfg.save_config(current_config)
-    crawler.config = current_config # Ensure crawler has the latest config
-
-    logger.info(
-        f"收到来自客户端 {request.sid} 的抓取请求，模式: {mode}"
-    )
-    crawler.start_crawl(mode, data.get("categories", {}))
+    logger.info("收到来自客户端 %s 的抓取请求，模式: %s", request.sid, mode)
+    # 每次抓取都是一个独立的任务，使用当前配置的快照；只有发起者 (及之后加入的客户端) 收到它的事件
+    job = job_manager.create(mode, data.get("categories", {}), current_config, owner=request.sid)
+    event_bus.join(request.sid, job.room)
+    event_bus.emit("job_created", job.snapshot(), room=request.sid)
+    job_manager.start(job)
 
 
 @socketio.on("stop_crawl")
-def handle_stop_crawl():
-    """处理停止抓取事件"""
-    logger.info(f"收到来自客户端 {request.sid} 的停止请求")
-    crawler.stop_crawl()
+def handle_stop_crawl(data=None):
+    """处理停止抓取事件；未指定 job_id 时停止该客户端发起的全部任务"""
+    job_id = (data or {}).get("job_id")
+    logger.info("收到来自客户端 %s 的停止请求，任务: %s", request.sid, job_id or '全部')
+    if job_id:
+        stopped = 1 if job_manager.stop(job_id) else 0
+    else:
+        stopped = job_manager.stop_all(owner=request.sid)
+    if not stopped:
+        event_bus.emit("status_update", {"status": "没有正在运行的抓取任务。"}, room=request.sid)
+
+
+@socketio.on("join_job")
+def handle_join_job(data):
+    """加入某个抓取任务的房间以接收它的事件 (例如页面刷新后重新关注自己的任务)"""
+    job = job_manager.get((data or {}).get("job_id"))
+    if job is None:
+        event_bus.emit("status_update", {"status": "任务不存在或已过期。"}, room=request.sid)
+        return
+    event_bus.join(request.sid, job.room)
+    event_bus.emit("job_status", job.snapshot(), room=request.sid)
+
+
+@socketio.on("leave_job")
+def handle_leave_job(data):
+    """离开某个抓取任务的房间"""
+    job = job_manager.get((data or {}).get("job_id"))
+    if job is not None:
+        event_bus.leave(request.sid, job.room)
+
+
+@socketio.on("cancel_download")
+def handle_cancel_download(data):
+    """处理取消单篇论文下载的事件"""
+    pdf_url = (data or {}).get("pdf_url")
+    if not pdf_url:
+        logger.warning("收到无效的取消下载请求: %s", data)
+        return
+
+    logger.info("收到来自 %s 的取消下载请求: %s", request.sid, pdf_url)
+    if not crawler.cancel_download(pdf_url):
+        event_bus.emit(
+            "status_update", {"status": "该论文当前没有正在进行的下载。"}, room=request.sid
+        )
+
+
+@socketio.on("cancel_all_downloads")
+def handle_cancel_all_downloads():
+    """处理取消所有下载的事件"""
+    logger.info("收到来自 %s 的取消全部下载请求", request.sid)
+    count = crawler.cancel_all_downloads()
+    event_bus.emit("status_update", {"status": f"已取消 {count} 个下载。"}, room=request.sid)
 
 
 @socketio.on("download_papers")
@@ -260,22 +597,26 @@ def handle_download_papers(data):
     """处理下载一篇或多篇论文的事件"""
     papers = data.get("papers")
     if not papers or not isinstance(papers, list):
-        logger.warning(f"收到无效的下载请求: {data}")
+        logger.warning("收到无效的下载请求: %s", data)
         return
 
-    logger.info(f"收到来自 {request.sid} 的 {len(papers)} 篇论文的下载请求。")
+    logger.info("收到来自 %s 的 %d 篇论文的下载请求。", request.sid, len(papers))
     for paper_data in papers:
-        # 使用 start_background_task 以非阻塞方式运行下载
-        socketio.start_background_task(crawler.download_single_paper, paper_data)
+        # 使用 start_background_task 以非阻塞方式运行下载；进度只发给发起下载的客户端
+        socketio.start_background_task(crawler.download_single_paper, paper_data, request.sid)
 
 
 # --- 主程序入口 --- #
 
 if __name__ == "__main__":
+    import webbrowser
+
+    init_services()
+
     host = "127.0.0.1"  # Use 127.0.0.1 for local browser opening
     port = 8080
     url = f"http://{host}:{port}"
-    logger.info(f"启动服务器，访问 {url}")
+    logger.info("启动服务器，访问 %s", url)
 
     # Open browser in a new thread to not block the server startup
     threading.Timer(1, lambda: webbrowser.open(url)).start()
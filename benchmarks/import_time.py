@@ -0,0 +1,139 @@
+# benchmarks/import_time.py
+
+"""
+启动导入耗时检查。
+
+在全新的子进程中以 `python -X importtime -c "import <模块>"` 导入各入口模块，
+统计累计导入耗时 (取多次运行中的最小值以降低噪声)，并检查：
+
+    - 耗时是否超出预算 (毫秒，可用 --budget-scale 按机器性能整体放宽)
+    - 是否导入了不应在导入阶段加载的重量级模块 (例如 CLI 入口不应导入 questionary / arxiv)
+
+任一检查失败时以非零状态码退出，可直接用于 CI：
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-scale 2 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块 -> (导入耗时预算 ms, 导入阶段禁止加载的模块)
+TARGETS = {
+    "src.main": (150, ("questionary", "rich", "arxiv", "requests")),
+    "src.batch": (150, ("questionary", "rich", "arxiv", "requests")),
+    "src.crawler": (120, ("questionary", "rich", "arxiv", "requests")),
+    "app": (1000, ("questionary", "arxiv")),
+}
+
+
+def measure_import(module, python=sys.executable):
+    """
+    在子进程中导入 module，返回 (累计耗时 ms, {模块名: 累计耗时 us})。
+    字典只包含由 module 引起的导入，不含解释器启动时 (site 等) 已加载的模块。
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr}")
+
+    # 输出按后序排列，名称前的缩进表示嵌套深度
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # 表头行
+        name = parts[2].rstrip()
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(parts[1])))
+
+    # 从目标模块所在行向前收集缩进更深的行，即它的导入子树
+    for index in range(len(entries) - 1, -1, -1):
+        depth, name, cumulative_us = entries[index]
+        if name == module:
+            imported = {name: cumulative_us}
+            for child_depth, child_name, child_us in reversed(entries[:index]):
+                if child_depth <= depth:
+                    break
+                imported.setdefault(child_name, child_us)
+            return cumulative_us / 1000, imported
+    return 0.0, {}
+
+
+def check_target(module, budget_ms, forbidden, repeat=3, budget_scale=1.0, top=8):
+    timings = []
+    imported = {}
+    for _ in range(max(1, repeat)):
+        elapsed_ms, imported = measure_import(module)
+        timings.append(elapsed_ms)
+
+    best_ms = min(timings)
+    budget = budget_ms * budget_scale
+    loaded_forbidden = sorted(
+        name for name in forbidden if any(m == name or m.startswith(name + ".") for m in imported)
+    )
+    heaviest = sorted(
+        ((name, us) for name, us in imported.items() if name != module),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    return {
+        "module": module,
+        "best_ms": round(best_ms, 1),
+        "runs_ms": [round(t, 1) for t in timings],
+        "budget_ms": round(budget, 1),
+        "over_budget": best_ms > budget,
+        "forbidden_loaded": loaded_forbidden,
+        "heaviest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in heaviest],
+    }
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Check import-time budgets of the entry points.")
+    parser.add_argument("modules", nargs="*", help=f"Modules to check (default: {', '.join(TARGETS)}).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is used.")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply all budgets (for slow machines).")
+    parser.add_argument("--top", type=int, default=8, help="Number of heaviest imports to show.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    modules = args.modules or list(TARGETS)
+
+    results = []
+    for module in modules:
+        budget_ms, forbidden = TARGETS.get(module, (float("inf"), ()))
+        results.append(
+            check_target(module, budget_ms, forbidden, args.repeat, args.budget_scale, args.top)
+        )
+
+    failed = [r for r in results if r["over_budget"] or r["forbidden_loaded"]]
+
+    if args.json:
+        print(json.dumps({"results": results, "ok": not failed}, indent=2, ensure_ascii=False))
+    else:
+        for r in results:
+            status = "FAIL" if r in failed else "ok"
+            print(f"{r['module']:12s} {r['best_ms']:8.1f} ms  (budget {r['budget_ms']:.0f} ms)  {status}")
+            if r["forbidden_loaded"]:
+                print(f"    imports forbidden modules at import time: {', '.join(r['forbidden_loaded'])}")
+            for item in r["heaviest"]:
+                print(f"    {item['ms']:8.1f} ms  {item['module']}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+# benchmarks/mock_servers.py
+
+"""
+本地模拟的 arXiv / bioRxiv 服务器，供基准测试使用。
+
+一个 HTTP 服务同时提供三类接口：
+    /arxiv/api/query?...                         arXiv Atom 查询接口 (分页)
+    /biorxiv/details/biorxiv/<start>/<end>/<cursor>   bioRxiv details JSON 接口 (游标分页)
+    /pdf/<id> 与 /biorxiv/content/<doi>.full.pdf   PDF 文件 (支持 Range)
+
+记录根据序号确定性地生成，服务端内存占用与论文数量无关。
+可配置 PDF 大小、每个请求的额外延迟以及失败率 (失败时返回 503 + Retry-After: 0)。
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+# 标题与摘要所用词表，其中包含基准测试配置里的关键词，使过滤器能命中一部分记录
+VOCABULARY = [
+    "genomics", "bioinformatics", "synthetic biology", "systems biology", "protein",
+    "single-cell", "sequencing", "network", "model", "inference", "deep learning",
+    "cancer", "regulation", "expression", "metabolic", "pathway", "evolution",
+    "microscopy", "imaging", "translational medicine", "variant", "assembly",
+    "transcriptome", "chromatin", "signal", "dynamics", "population", "structure",
+]
+
+BIORXIV_CATEGORIES = [
+    "bioinformatics", "genomics", "synthetic biology", "systems biology",
+    "molecular biology", "cancer biology", "neuroscience", "cell biology",
+    "microbiology", "biophysics", "ecology", "immunology",
+]
+
+ARXIV_CATEGORIES = ["q-bio.GN", "q-bio.QM", "q-bio.MN", "cs.LG", "cs.CV", "stat.ML"]
+
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+def _words(rng, count):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(count))
+
+
+def _authors(rng):
+    return [f"Author{rng.randint(1, 5000)} Surname{rng.randint(1, 5000)}" for _ in range(rng.randint(3, 10))]
+
+
+def make_arxiv_record(index):
+    rng = random.Random(index)
+    day = 1 + index % 28
+    return {
+        "id": f"2401.{index:05d}",
+        "title": _words(rng, rng.randint(6, 14)).capitalize(),
+        "summary": _words(rng, rng.randint(150, 250)),
+        "authors": _authors(rng),
+        "categories": rng.sample(ARXIV_CATEGORIES, rng.randint(1, 3)),
+        "published": f"2024-01-{day:02d}T00:00:00Z",
+    }
+
+
+def make_biorxiv_record(index):
+    rng = random.Random(1_000_000 + index)
+    day = 1 + index % 28
+    return {
+        "doi": f"10.1101/2024.01.{day:02d}.{500000 + index}",
+        "title": _words(rng, rng.randint(6, 14)).capitalize(),
+        "authors": "; ".join(_authors(rng)),
+        "author_corresponding": "Corresponding Author",
+        "author_corresponding_institution": "Mock University",
+        "date": f"2024-01-{day:02d}",
+        "version": str(rng.randint(1, 3)),
+        "type": "new results",
+        "license": "cc_by",
+        "category": rng.choice(BIORXIV_CATEGORIES),
+        "jatsxml": "",
+        "abstract": _words(rng, rng.randint(150, 250)),
+        "published": "NA",
+        "server": "biorxiv",
+    }
+
+
+class MockPaperServer:
+    """
+    在后台线程中运行的模拟服务器。
+
+        with MockPaperServer(arxiv_papers=200, pdf_size=256 * 1024) as server:
+            fetchers.BIORXIV_API_URL = server.biorxiv_api_url
+            ...
+    """
+
+    def __init__(
+        self,
+        arxiv_papers=300,
+        biorxiv_papers=1000,
+        pdf_size=512 * 1024,
+        latency=0.0,
+        failure_rate=0.0,
+        biorxiv_page_size=100,
+        seed=0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.arxiv_papers = arxiv_papers
+        self.biorxiv_papers = biorxiv_papers
+        self.pdf_size = pdf_size
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.biorxiv_page_size = biorxiv_page_size
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._pdf_body = (b"%PDF-1.4\n" + bytes(range(256)) * (pdf_size // 256 + 1))[:pdf_size]
+
+        self.stats = {"requests": 0, "failures": 0, "bytes_sent": 0}
+        self._stats_lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    # --- 生命周期 ---
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def arxiv_query_url_format(self):
+        return f"{self.url}/arxiv/api/query?{{}}"
+
+    @property
+    def biorxiv_api_url(self):
+        return f"{self.url}/biorxiv/details/biorxiv"
+
+    @property
+    def biorxiv_content_url(self):
+        return f"{self.url}/biorxiv/content"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-paper-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --- 内部实现 ---
+
+    def _should_fail(self):
+        if self.failure_rate <= 0:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < self.failure_rate
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _arxiv_feed(self, start, max_results):
+        end = min(self.arxiv_papers, start + max_results)
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+            'xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+            "<title>ArXiv Query</title>\n"
+            f"<id>{self.url}/arxiv/api/mock</id>\n"
+            "<updated>2024-01-31T00:00:00Z</updated>\n"
+            f"<opensearch:totalResults>{self.arxiv_papers}</opensearch:totalResults>\n"
+            f"<opensearch:startIndex>{start}</opensearch:startIndex>\n"
+            f"<opensearch:itemsPerPage>{max_results}</opensearch:itemsPerPage>\n"
+        ]
+        for index in range(start, end):
+            record = make_arxiv_record(index)
+            arxiv_id = f"{record['id']}v1"
+            authors = "".join(f"<author><name>{escape(name)}</name></author>" for name in record["authors"])
+            categories = "".join(
+                f'<category term="{cat}" scheme="http://arxiv.org/schemas/atom"/>' for cat in record["categories"]
+            )
+            parts.append(
+                "<entry>"
+                f"<id>http://arxiv.org/abs/{arxiv_id}</id>"
+                f"<updated>{record['published']}</updated>"
+                f"<published>{record['published']}</published>"
+                f"<title>{escape(record['title'])}</title>"
+                f"<summary>{escape(record['summary'])}</summary>"
+                f"{authors}"
+                f'<link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>'
+                f'<link title="pdf" href="{self.url}/pdf/{arxiv_id}" rel="related" type="application/pdf"/>'
+                f'<arxiv:primary_category term="{record["categories"][0]}" scheme="http://arxiv.org/schemas/atom"/>'
+                f"{categories}"
+                "</entry>\n"
+            )
+        parts.append("</feed>\n")
+        return "".join(parts).encode("utf-8")
+
+    def _biorxiv_page(self, cursor, start_date=None, end_date=None):
+        # 与真实接口一样只返回日期范围内的记录 (记录的日期见 make_biorxiv_record)
+        indices = [
+            index
+            for index in range(self.biorxiv_papers)
+            if (start_date or "") <= f"2024-01-{1 + index % 28:02d}" <= (end_date or "9999")
+        ]
+        collection = [make_biorxiv_record(index) for index in indices[cursor : cursor + self.biorxiv_page_size]]
+        payload = {
+            "messages": [
+                {
+                    "status": "ok",
+                    "interval": "mock",
+                    "cursor": cursor,
+                    "count": len(collection),
+                    "count_new_papers": len(collection),
+                    "total": len(indices),
+                }
+            ],
+            "collection": collection,
+        }
+        return json.dumps(payload).encode("utf-8")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_body(self, status, body, content_type, extra_headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (extra_headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+                server._count("bytes_sent", len(body))
+
+            def _send_failure(self):
+                server._count("failures")
+                self._send_body(503, b"Service Unavailable", "text/plain", {"Retry-After": "0"})
+
+            def _send_pdf(self):
+                body = server._pdf_body
+                start = 0
+                range_header = self.headers.get("Range")
+                if range_header and range_header.startswith("bytes="):
+                    start = int(range_header[len("bytes="):].split("-")[0] or 0)
+                if start >= len(body):
+                    self._send_body(416, b"", "application/pdf")
+                    return
+                self.send_response(206 if start else 200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(body) - start))
+                self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+                try:
+                    for offset in range(start, len(body), PDF_CHUNK_SIZE):
+                        chunk = body[offset:offset + PDF_CHUNK_SIZE]
+                        self.wfile.write(chunk)
+                        server._count("bytes_sent", len(chunk))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_GET(self):
+                server._count("requests")
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._should_fail():
+                    self._send_failure()
+                    return
+
+                parsed = urlparse(self.path)
+                path = parsed.path
+                if path == "/arxiv/api/query":
+                    query = parse_qs(parsed.query)
+                    start = int(query.get("start", ["0"])[0])
+                    max_results = int(query.get("max_results", ["100"])[0])
+                    self._send_body(200, server._arxiv_feed(start, max_results), "application/atom+xml")
+                elif path.startswith("/biorxiv/details/biorxiv/"):
+                    segments = path.rstrip("/").split("/")
+                    cursor = int(segments[-1]) if len(segments) >= 7 else 0
+                    dates = segments[4:6] if len(segments) >= 7 else []
+                    self._send_body(200, server._biorxiv_page(cursor, *dates), "application/json")
+                elif path.startswith("/pdf/") or (path.startswith("/biorxiv/content/") and path.endswith(".pdf")):
+                    self._send_pdf()
+                else:
+                    self._send_body(404, b"Not Found", "text/plain")
+
+        return Handler
@@ -0,0 +1,297 @@
+# benchmarks/run_benchmark.py
+
+"""
+端到端吞吐量基准测试。
+
+在本地启动模拟的 arXiv / bioRxiv 服务器 (见 mock_servers.py)，
+使用临时数据库与临时下载目录运行真实的 fetchers / Crawler / download_pdf 代码，统计：
+
+    - 发现阶段: 论文数与每秒发现论文数
+    - 下载阶段: 下载字节数与 MB/s
+    - 流水线模式: 发现 + 下载的总耗时
+    - 数据库耗时: is_paper_downloaded / add_paper 调用次数与总时间
+    - 进程峰值内存 (RSS)
+
+结果写入 JSON 文件，并可与上一次的结果对比：
+
+    python -m benchmarks.run_benchmark --output benchmarks/results/base.json
+    python -m benchmarks.run_benchmark --compare benchmarks/results/base.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import arxiv
+
+from src import database, fetchers
+from src.crawler import Crawler
+
+from .mock_servers import MockPaperServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+# 对比时展示的指标: (路径, 数值越大越好)
+COMPARED_METRICS = [
+    (("discovery", "papers_per_second"), True),
+    (("download", "mb_per_second"), True),
+    (("pipeline", "wall_seconds"), False),
+    (("db", "total_seconds"), False),
+    (("peak_rss_mb",), False),
+]
+
+
+class _DbTimer:
+    """包装 database 模块中的函数以统计调用次数与耗时。"""
+
+    def __init__(self, names):
+        self.calls = {name: 0 for name in names}
+        self.seconds = {name: 0.0 for name in names}
+        self._originals = {name: getattr(database, name) for name in names}
+
+    def install(self):
+        for name, func in self._originals.items():
+            setattr(database, name, self._wrap(name, func))
+
+    def uninstall(self):
+        for name, func in self._originals.items():
+            setattr(database, name, func)
+
+    def _wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.calls[name] += 1
+                self.seconds[name] += time.perf_counter() - start
+
+        return timed
+
+    def summary(self):
+        return {
+            "calls": dict(self.calls),
+            "seconds": {name: round(value, 4) for name, value in self.seconds.items()},
+            "total_seconds": round(sum(self.seconds.values()), 4),
+        }
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end crawl/download throughput benchmark.")
+    parser.add_argument("--mode", choices=["keyword", "category"], default="keyword")
+    parser.add_argument("--arxiv-papers", type=int, default=300, help="Number of papers served by the mock arXiv API.")
+    parser.add_argument("--biorxiv-papers", type=int, default=1000, help="Number of records served by the mock bioRxiv API.")
+    parser.add_argument("--pdf-size-kb", type=int, default=512, help="Size of each served PDF in KiB.")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Extra latency added to every mock response.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of mock responses that fail with 503.")
+    parser.add_argument("--arxiv-delay", type=float, default=0.0, help="arXiv client delay between pages (production uses 3s).")
+    parser.add_argument("--workers", type=int, default=4, help="Download worker threads.")
+    parser.add_argument("--output", type=str, default=None, help="Result JSON path (default: benchmarks/results/<timestamp>.json).")
+    parser.add_argument("--compare", type=str, default=None, help="Previous result JSON to compare against.")
+    parser.add_argument("--log-level", type=str, default="WARNING")
+    return parser.parse_args(argv)
+
+
+def _build_config(args, download_dir):
+    return {
+        "fetch_settings": {
+            "method": args.mode,
+            "arxiv_max_results_kw": args.arxiv_papers,
+            "max_papers_per_category_fetch": args.arxiv_papers,
+            "search_by_authors": [],
+            "search_by_ids": [],
+            "arxiv_sort_by": "SubmittedDate",
+            "arxiv_sort_order": "Descending",
+            "keyword_search_field": "all",
+            "search_start_date": "2024-01-01",
+            "search_end_date": "2024-01-31",
+        },
+        "keywords": ["genomics", "bioinformatics", "synthetic biology"],
+        "categories": {
+            "arxiv": ["q-bio.GN"],
+            "biorxiv": ["bioinformatics", "genomics", "synthetic biology"],
+        },
+        "output_settings": {"download_dir": download_dir},
+    }
+
+
+def _reset_storage(work_dir):
+    """为每个阶段准备全新的数据库与下载目录。"""
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    database.DB_PATH = os.path.join(work_dir, "bench.db")
+    database.init_db()
+    return os.path.join(work_dir, "paper")
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KiB，macOS 上为字节
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_discovery_and_download(args, work_dir):
+    """先发现全部论文，再并行下载 (与 CLI 默认模式相同的两个阶段)。"""
+    download_dir = _reset_storage(work_dir)
+    crawler = Crawler(_build_config(args, download_dir))
+    categories = crawler.config["categories"]
+
+    start = time.perf_counter()
+    papers = crawler._run_crawl_task(args.mode, categories) or []
+    discovery_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(crawler.download_single_paper, papers))
+    download_seconds = time.perf_counter() - start
+    downloaded_bytes = _dir_size(download_dir)
+
+    return {
+        "discovery": {
+            "papers": len(papers),
+            "seconds": round(discovery_seconds, 3),
+            "papers_per_second": round(len(papers) / discovery_seconds, 2) if discovery_seconds else None,
+        },
+        "download": {
+            "papers": len(papers),
+            "succeeded": sum(1 for ok in results if ok),
+            "bytes": downloaded_bytes,
+            "seconds": round(download_seconds, 3),
+            "mb_per_second": round(downloaded_bytes / (1024 * 1024) / download_seconds, 2) if download_seconds else None,
+        },
+    }
+
+
+def run_pipeline(args, work_dir):
+    """流水线模式：发现与下载并行进行。"""
+    download_dir = _reset_storage(work_dir)
+    crawler = Crawler(_build_config(args, download_dir))
+
+    start = time.perf_counter()
+    stats = crawler.run_pipelined(args.mode, crawler.config["categories"], num_workers=args.workers) or {}
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "pipeline": {
+            **stats,
+            "bytes": _dir_size(download_dir),
+            "wall_seconds": round(wall_seconds, 3),
+        }
+    }
+
+
+def compare_results(current, previous):
+    lines = []
+    for path, higher_is_better in COMPARED_METRICS:
+        old, new = previous, current
+        for key in path:
+            old = (old or {}).get(key)
+            new = (new or {}).get(key)
+        name = ".".join(path)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or old == 0:
+            lines.append(f"{name:32s} {old!s:>12} -> {new!s:>12}")
+            continue
+        change = (new - old) / old * 100
+        better = change > 0 if higher_is_better else change < 0
+        marker = "better" if better else ("worse" if change else "same")
+        lines.append(f"{name:32s} {old:>12} -> {new:>12}  ({change:+.1f}%, {marker})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING), format="%(levelname)s %(name)s: %(message)s")
+
+    server = MockPaperServer(
+        arxiv_papers=args.arxiv_papers,
+        biorxiv_papers=args.biorxiv_papers,
+        pdf_size=args.pdf_size_kb * 1024,
+        latency=args.latency_ms / 1000,
+        failure_rate=args.failure_rate,
+    ).start()
+
+    # 将数据源指向模拟服务器
+    fetchers.BIORXIV_API_URL = server.biorxiv_api_url
+    fetchers.BIORXIV_CONTENT_URL = server.biorxiv_content_url
+    fetchers.ARXIV_DELAY_SECONDS = args.arxiv_delay
+    arxiv.Client.query_url_format = server.arxiv_query_url_format
+
+    original_db_path = database.DB_PATH
+    work_dir = tempfile.mkdtemp(prefix="paper-crawler-bench-")
+    db_timer = _DbTimer(["is_paper_downloaded", "add_paper"])
+    db_timer.install()
+
+    try:
+        results = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                key: getattr(args, key)
+                for key in (
+                    "mode", "arxiv_papers", "biorxiv_papers", "pdf_size_kb",
+                    "latency_ms", "failure_rate", "arxiv_delay", "workers",
+                )
+            },
+        }
+        results.update(run_discovery_and_download(args, work_dir))
+        results.update(run_pipeline(args, work_dir))
+        results["db"] = db_timer.summary()
+        results["peak_rss_mb"] = _peak_rss_mb()
+        results["mock_server"] = dict(server.stats)
+    finally:
+        db_timer.uninstall()
+        database.DB_PATH = original_db_path
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"\nComparison with {args.compare}:")
+        print(compare_results(results, previous))
+
+
+if __name__ == "__main__":
+    main()
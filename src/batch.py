@@ -0,0 +1,460 @@
+# src/batch.py
+
+"""
+无界面的批量模式，适用于 cron / Kubernetes Job 等无人值守场景。
+
+    python -m src.batch                                # 运行 config.yaml 中的全部配置档
+    python -m src.batch --profile genomics --profile imaging --output results.ndjson
+    python -m src.batch --daemon                       # 按 schedules 段定时运行，直到收到 SIGTERM
+
+一次调用中运行 profiles 段定义的多个配置档：各配置档的发现与下载在各自的流水线中并发进行，
+同一进程内共享 HTTP 连接池与数据库，多个配置档发现的同一篇论文只下载一次：由最先发现它的配置档下载，
+下载失败时移交给之后发现它的配置档重试 (结果状态为 handed_off，不计入前者的失败数)。
+结果以 NDJSON (每行一个 JSON 对象) 写到标准输出或 --output 指定的文件，日志以 JSON 行写到标准错误。
+本模块不导入 questionary / rich 等交互式依赖。
+
+守护模式 (--daemon) 下由 src.scheduler 按 cron 表达式触发各配置档，每次运行写出一条 profile_done 记录；
+各配置档的 Crawler、HTTP 连接池与已入库链接索引在多次运行之间复用。
+
+退出码:
+    0    所有配置档完成，且没有下载失败
+    1    有论文下载失败
+    2    参数或配置错误
+    130  被 SIGINT/SIGTERM 中断 (守护模式下收到信号后正常退出为 0)
+"""
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import config, scheduler
+from .crawler import Crawler
+from .database import init_db
+from .utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+# 没有定义 profiles 时，以基础配置作为唯一的配置档运行
+DEFAULT_PROFILE = "default"
+
+FETCH_METHODS = ("keyword", "category")
+
+
+class NdjsonWriter:
+    """线程安全地逐行写出 JSON 记录，每行写完立即 flush，便于下游实时消费。"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+
+class BatchRunner:
+    """
+    并发运行多个配置档。每个配置档拥有独立的 Crawler 与下载线程，
+    配置档之间通过共享的 pdf_url 登记表去重。
+    """
+
+    def __init__(
+        self,
+        profile_configs,
+        writer,
+        workers=2,
+        queue_size=16,
+        max_parallel=4,
+        drain_timeout=30,
+    ):
+        self.profile_configs = profile_configs
+        self.writer = writer
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_parallel = max(1, max_parallel)
+        self.drain_timeout = drain_timeout
+        self.crawlers = {name: Crawler(cfg, socketio=None) for name, cfg in profile_configs.items()}
+        self.interrupted = False
+        # 正在处理中的 pdf_url -> 负责下载它的配置档；运行结束后释放，已完成的下载由已入库链接索引去重
+        self._claimed = {}
+        # pdf_url -> 因该论文已被认领而跳过它的配置档 (按跳过的先后顺序)，认领者下载失败时按顺序移交
+        self._waiters = {}
+        # 配置档 -> 认领者下载失败后移交给它的论文
+        self._handoffs = {}
+        # 已被认领者成功下载的 pdf_url (随认领一起释放)
+        self._downloaded = set()
+        self._duplicates = {name: 0 for name in profile_configs}
+        self._handed_off = {name: 0 for name in profile_configs}
+        self._claims_changed = threading.Condition()
+
+    def request_shutdown(self):
+        """非阻塞地停止所有配置档，可在信号处理函数中调用。"""
+        self.interrupted = True
+        for crawler in self.crawlers.values():
+            crawler.request_shutdown()
+
+    def _claim(self, profile_name, paper_data):
+        """认领一篇论文；已被其他配置档认领时登记为等待者，待认领者有结果后再决定是否计为重复。"""
+        with self._claims_changed:
+            owner = self._claimed.setdefault(paper_data.pdf_url, profile_name)
+            if owner != profile_name and paper_data.pdf_url in self._downloaded:
+                self._duplicates[profile_name] += 1
+            elif owner != profile_name:
+                waiters = self._waiters.setdefault(paper_data.pdf_url, [])
+                if profile_name not in waiters:
+                    waiters.append(profile_name)
+        return owner == profile_name
+
+    def _resolve(self, profile_name, paper, success):
+        """
+        记录认领者的下载结果：成功时等待者各计一篇重复；失败时把论文移交给第一个等待者，
+        没有等待者时释放认领，之后发现它的配置档可以重新下载。返回接手的配置档 (没有时为 None)。
+        """
+        heir = None
+        with self._claims_changed:
+            waiters = self._waiters.pop(paper.pdf_url, [])
+            if success:
+                self._downloaded.add(paper.pdf_url)
+                for name in waiters:
+                    self._duplicates[name] += 1
+            elif waiters:
+                heir = waiters.pop(0)
+                self._claimed[paper.pdf_url] = heir
+                if waiters:
+                    self._waiters[paper.pdf_url] = waiters
+                self._handoffs.setdefault(heir, []).append(paper)
+                self._handed_off[profile_name] += 1
+                logger.info("配置档 '%s' 下载失败，移交给配置档 '%s': %s", profile_name, heir, paper.title)
+            else:
+                self._claimed.pop(paper.pdf_url, None)
+            self._claims_changed.notify_all()
+        return heir
+
+    def _release_claims(self, profile_name):
+        with self._claims_changed:
+            for pdf_url in [url for url, owner in self._claimed.items() if owner == profile_name]:
+                del self._claimed[pdf_url]
+                self._downloaded.discard(pdf_url)
+                # 停止时排队中的论文没有结果，等待它们的配置档不再等待
+                self._waiters.pop(pdf_url, None)
+            self._claims_changed.notify_all()
+
+    def _is_waiting(self, profile_name):
+        """调用时需持有 self._claims_changed。"""
+        return bool(self._handoffs.get(profile_name)) or any(
+            profile_name in waiters for waiters in self._waiters.values()
+        )
+
+    def _download_handoffs(self, profile_name, crawler, on_result):
+        """
+        配置档自己的论文处理完后，等待它跳过的论文在认领者那里有结果，并下载移交给它的论文。
+        返回 (成功数, 失败数)。
+        """
+        downloaded = failed = 0
+        while True:
+            with self._claims_changed:
+                while not self.interrupted and not self._handoffs.get(profile_name) and self._is_waiting(profile_name):
+                    self._claims_changed.wait(timeout=1)
+                papers = self._handoffs.pop(profile_name, [])
+            if self.interrupted or not papers:
+                return downloaded, failed
+            for paper in papers:
+                success, paper = crawler._download(paper)
+                if success:
+                    downloaded += 1
+                else:
+                    failed += 1
+                on_result(paper, success)
+
+    def run_profile(self, name):
+        """运行单个配置档并返回其统计记录 (同时写出每篇论文的结果)。"""
+        profile_config = self.profile_configs[name]
+        crawler = self.crawlers[name]
+        method = profile_config["fetch_settings"]["method"]
+        record = {
+            "event": "profile_done",
+            "profile": name,
+            "method": method,
+            "status": "ok",
+            "discovered": 0,
+            "downloaded": 0,
+            "failed": 0,
+            "duplicates": 0,
+            "seconds": 0.0,
+        }
+        if self.interrupted:
+            record["status"] = "skipped"
+            return record
+
+        with self._claims_changed:
+            self._duplicates[name] = 0
+            self._handed_off[name] = 0
+
+        def accept(paper_data):
+            return self._claim(name, paper_data)
+
+        def on_result(paper_data, success):
+            heir = self._resolve(name, paper_data, success)
+            self.writer.write(
+                {
+                    "event": "paper",
+                    "profile": name,
+                    "status": "downloaded" if success else ("handed_off" if heir else "failed"),
+                    "title": paper_data.title,
+                    "source": paper_data.source,
+                    "category": paper_data.category,
+                    "paper_url": paper_data.paper_url,
+                    "pdf_url": paper_data.pdf_url,
+                    "filepath": paper_data.filepath,
+                }
+            )
+
+        logger.info("配置档 '%s' 开始运行，模式: %s", name, method)
+        start = time.perf_counter()
+        try:
+            stats = crawler.run_pipelined(
+                method,
+                profile_config.get("categories") or {},
+                num_workers=self.workers,
+                queue_size=self.queue_size,
+                on_result=on_result,
+                drain_timeout=self.drain_timeout,
+                accept=accept,
+            ) or {}
+            record.update(stats)
+            handed_downloaded, handed_failed = self._download_handoffs(name, crawler, on_result)
+            record["downloaded"] += handed_downloaded
+            record["failed"] += handed_failed
+        finally:
+            self._release_claims(name)
+        with self._claims_changed:
+            duplicates = self._duplicates[name]
+            handed_off = self._handed_off[name]
+        # 移交给其他配置档的论文由接手的配置档计入结果，不算作本配置档的失败
+        record["failed"] -= handed_off
+        record["handed_off"] = handed_off
+        record["duplicates"] = duplicates
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        record["stages"] = crawler.tracer.summary()
+        if self.interrupted:
+            record["status"] = "interrupted"
+        logger.info(
+            "配置档 '%s' 结束: 发现 %s 篇，下载 %s 篇，失败 %s 篇，与其他配置档重复 %s 篇。",
+            name, record["discovered"], record["downloaded"], record["failed"], duplicates,
+        )
+        return record
+
+    def run(self):
+        """运行全部配置档，写出每个配置档与整体的统计，返回退出码。"""
+        start = time.perf_counter()
+        records = []
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="batch-profile")
+        try:
+            futures = {executor.submit(self.run_profile, name): name for name in self.profile_configs}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    logger.error("配置档 '%s' 运行失败: %s", name, e, exc_info=True)
+                    record = {"event": "profile_done", "profile": name, "status": "error", "error": str(e)}
+                records.append(record)
+                self.writer.write(record)
+        finally:
+            executor.shutdown(wait=not self.interrupted, cancel_futures=True)
+
+        totals = {
+            key: sum(record.get(key, 0) for record in records)
+            for key in ("discovered", "downloaded", "failed", "duplicates")
+        }
+        errors = sum(1 for record in records if record.get("status") == "error")
+        if self.interrupted:
+            exit_code = EXIT_INTERRUPTED
+        elif errors or totals["failed"]:
+            exit_code = EXIT_FAILURES
+        else:
+            exit_code = EXIT_OK
+
+        self.writer.write(
+            {
+                "event": "summary",
+                "profiles": len(records),
+                "errors": errors,
+                **totals,
+                "seconds": round(time.perf_counter() - start, 3),
+                "interrupted": self.interrupted,
+                "exit_code": exit_code,
+            }
+        )
+        return exit_code
+
+    def run_scheduled(self, name):
+        """供调度器调用：运行一次配置档并写出其统计记录。"""
+        record = self.run_profile(name)
+        record["scheduled"] = True
+        self.writer.write(record)
+        if record.get("failed"):
+            raise RuntimeError(f"{record['failed']} 篇论文下载失败")
+
+    def is_busy(self, name):
+        return self.crawlers[name].is_running
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run crawl profiles headlessly and write NDJSON results."
+    )
+    parser.add_argument("--config", type=str, default="config.yaml", help="Path to the configuration file.")
+    parser.add_argument(
+        "--profile",
+        dest="profiles",
+        action="append",
+        default=None,
+        help="Profile name from the 'profiles' section; repeat to run several. Default: all profiles.",
+    )
+    parser.add_argument("--workers", type=int, default=2, help="Download workers per profile.")
+    parser.add_argument("--max-parallel", type=int, default=4, help="Max number of profiles running at once.")
+    parser.add_argument("--queue-size", type=int, default=16, help="Per-profile download queue size.")
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=30,
+        help="Seconds to wait for in-flight downloads to stop after SIGINT/SIGTERM.",
+    )
+    parser.add_argument("--output", type=str, default="-", help="NDJSON output path ('-' for stdout).")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and start profiles on the cron schedules from the 'schedules' section.",
+    )
+    parser.add_argument("--log-level", type=str, default=None, help="Override logging.level from the config.")
+    return parser.parse_args(argv)
+
+
+def build_profile_configs(config_data, profile_names=None):
+    """
+    解析要运行的配置档并合并出各自的完整配置。
+    配置档不存在或抓取模式无效时抛出 ValueError。
+    """
+    available = config.list_profiles(config_data)
+    if not available:
+        if profile_names and profile_names != [DEFAULT_PROFILE]:
+            raise ValueError(f"配置文件中没有定义 profiles，无法运行: {profile_names}")
+        profile_configs = {DEFAULT_PROFILE: dict(config_data)}
+    else:
+        profile_configs = {}
+        for name in profile_names or available:
+            try:
+                profile_configs[name] = config.build_profile_config(config_data, name)
+            except KeyError as e:
+                raise ValueError(e.args[0]) from None
+
+    for name, profile_config in profile_configs.items():
+        fetch_settings = dict(profile_config.get("fetch_settings") or {})
+        method = fetch_settings.get("method", "category")
+        if method not in FETCH_METHODS:
+            raise ValueError(f"配置档 '{name}' 的抓取模式无效: {method}")
+        fetch_settings["method"] = method
+        profile_config["fetch_settings"] = fetch_settings
+    return profile_configs
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    try:
+        config_data = config.load_config(args.config)
+    except Exception as e:
+        sys.stderr.write(f"加载配置文件失败: {e}\n")
+        return EXIT_USAGE
+
+    # 标准输出留给 NDJSON 结果，日志始终以 JSON 行写到标准错误
+    logging_settings = {**(config_data.get("logging") or {}), "mode": "json"}
+    if args.log_level:
+        logging_settings["level"] = args.log_level
+    setup_logging(logging_settings)
+
+    try:
+        profile_configs = build_profile_configs(config_data, args.profiles)
+    except ValueError as e:
+        logger.error("%s", e)
+        return EXIT_USAGE
+
+    init_db()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    runner = BatchRunner(
+        profile_configs,
+        NdjsonWriter(output),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        max_parallel=args.max_parallel,
+        drain_timeout=args.drain_timeout,
+    )
+
+    def handle_signal(signum, frame):
+        if runner.interrupted:
+            raise KeyboardInterrupt
+        logger.warning("收到信号 %s，正在停止所有配置档 (再次发送将强制退出)...", signal.Signals(signum).name)
+        runner.request_shutdown()
+
+    previous_handlers = {}
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous_handlers[signum] = signal.getsignal(signum)
+        signal.signal(signum, handle_signal)
+
+    try:
+        if args.daemon:
+            return run_daemon(runner, config_data.get("schedules"))
+        logger.info("批量模式开始，配置档: %s", list(profile_configs))
+        return runner.run()
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        if output is not sys.stdout:
+            output.close()
+
+
+def run_daemon(runner, schedules):
+    """按 schedules 段定时运行配置档，直到收到 SIGINT/SIGTERM。"""
+    try:
+        jobs = scheduler.jobs_from_config(schedules)
+    except (KeyError, ValueError) as e:
+        logger.error("schedules 配置无效: %s", e)
+        return EXIT_USAGE
+    unknown = sorted({job.profile for job in jobs} - set(runner.profile_configs))
+    if unknown:
+        logger.error("schedules 中引用了未选择或不存在的配置档: %s", unknown)
+        return EXIT_USAGE
+    if not jobs:
+        logger.error("守护模式需要在 schedules.jobs 中至少定义一个定时任务。")
+        return EXIT_USAGE
+
+    crawl_scheduler = scheduler.Scheduler(jobs, runner.run_scheduled, is_busy=runner.is_busy)
+    logger.info("守护模式开始，共 %s 个定时任务。", len(jobs))
+    crawl_scheduler.start()
+    # 主线程只等待停止信号；信号处理函数会设置 runner.interrupted
+    while not runner.interrupted:
+        time.sleep(1)
+    crawl_scheduler.stop()
+    crawl_scheduler.wait_for_running_jobs(runner.drain_timeout)
+    runner.writer.write({"event": "daemon_stopped", "jobs": crawl_scheduler.snapshot()})
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
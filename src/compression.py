@@ -0,0 +1,172 @@
+# src/compression.py
+
+"""
+Web API 响应的压缩与预计算负载。
+
+init_app() 注册一个 after_request 钩子：按请求的 Accept-Encoding 协商 br / gzip，
+压缩 JSON、HTML 等文本响应。文件下载 (send_file) 与流式响应原样返回。
+brotli 为可选依赖 (pip install brotli)，未安装时只使用 gzip。
+
+PrecomputedPayload 用于内容固定的响应 (例如分类列表)：序列化与各编码的压缩只在创建时做一次，
+并带有按编码区分的 ETag，客户端重复请求时直接返回 304。
+
+    compression:
+      enabled: true
+      min_size: 1024      # 小于该字节数的响应不压缩
+      gzip_level: 6
+      brotli_quality: 4   # 动态响应使用较低的质量以节省 CPU；预计算负载总是使用最高质量
+"""
+
+import gzip
+import hashlib
+import logging
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = frozenset(
+    {
+        "application/json",
+        "application/javascript",
+        "text/css",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+        "image/svg+xml",
+    }
+)
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "min_size": 1024,
+    "gzip_level": 6,
+    "brotli_quality": 4,
+}
+
+_settings = dict(DEFAULT_SETTINGS)
+
+
+def configure(settings):
+    """用 config.yaml 中的 compression 段更新压缩参数，缺省项使用 DEFAULT_SETTINGS。"""
+    global _settings
+    _settings = {**DEFAULT_SETTINGS, **(settings or {})}
+
+
+def available_encodings():
+    """按优先级返回本进程支持的内容编码。"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encodings):
+    """
+    根据请求的 Accept-Encoding (werkzeug 的 MIMEAccept 风格对象) 选择编码。
+    服务端的优先级高于客户端的 q 值顺序，但 q=0 的编码不会被选中；都不可用时返回 None。
+    """
+    for encoding in available_encodings():
+        if accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(data, encoding, level=None):
+    if encoding == "br":
+        return brotli.compress(data, quality=_settings["brotli_quality"] if level is None else level)
+    if encoding == "gzip":
+        # mtime=0 使相同内容的压缩结果逐字节一致
+        return gzip.compress(data, compresslevel=_settings["gzip_level"] if level is None else level, mtime=0)
+    raise ValueError(f"不支持的内容编码: {encoding}")
+
+
+def _encoded_etag(etag, encoding):
+    """同一资源的不同编码是不同的表示，需要不同的 ETag。"""
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def _add_vary(response):
+    response.vary.add("Accept-Encoding")
+
+
+def compress_response(response, request):
+    """按需压缩响应，返回 (可能被修改的) 响应；供 after_request 钩子调用。"""
+    if not _settings["enabled"]:
+        return response
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    _add_vary(response)
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < _settings["min_size"]:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(_encoded_etag(etag, encoding), weak=weak)
+    return response
+
+
+def init_app(app):
+    """为 Flask 应用注册响应压缩钩子。"""
+    from flask import request
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, request)
+
+    return app
+
+
+class PrecomputedPayload:
+    """
+    内容固定的响应体：创建时计算 ETag 并预先压缩出各编码版本。
+
+    response(request) 根据 Accept-Encoding 选择版本，If-None-Match 命中时返回 304。
+    预先压缩的版本带有 Content-Encoding 头，after_request 钩子不会再次压缩。
+    """
+
+    def __init__(self, data, mimetype="application/json", max_age=0):
+        self.mimetype = mimetype
+        self.max_age = max_age
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+        self.bodies = {None: data}
+        for encoding in available_encodings():
+            level = 11 if encoding == "br" else 9
+            self.bodies[encoding] = compress(data, encoding, level)
+        logger.debug(
+            "预计算响应 %s: %s",
+            self.etag,
+            ", ".join(f"{encoding or 'identity'}={len(body)}B" for encoding, body in self.bodies.items()),
+        )
+
+    def response(self, request):
+        from flask import Response
+
+        encoding = choose_encoding(request.accept_encodings) if _settings["enabled"] else None
+        etag = _encoded_etag(self.etag, encoding)
+
+        if request.if_none_match.contains(etag):
+            rv = Response(status=304)
+        else:
+            rv = Response(self.bodies[encoding], mimetype=self.mimetype)
+            if encoding:
+                rv.headers["Content-Encoding"] = encoding
+        rv.set_etag(etag)
+        _add_vary(rv)
+        rv.cache_control.max_age = self.max_age
+        if not self.max_age:
+            rv.cache_control.no_cache = True
+        return rv
@@ -1,6 +1,9 @@
+import copy
 import yaml
 import os
 import logging
+import tempfile
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +29,7 @@ def load_config(config_path: str = None) -> dict:
     if not os.path.exists(config_path):
         # 如果默认配置文件不存在，尝试创建一个
         if config_path == os.path.join(get_project_root(), "config.yaml"):
-            logger.warning(f"配置文件 {config_path} 未找到，将创建一个默认配置。")
+            logger.warning("配置文件 %s 未找到，将创建一个默认配置。", config_path)
             default_config = {
                 "fetch_settings": {
                     "method": "category",
@@ -45,6 +48,7 @@ def load_config(config_path: str = None) -> dict:
                     "arxiv": ["cs.LG", "q-bio.QM"],
                     "biorxiv": ["bioinformatics", "genomics"],
                 },
+                "logging": {"mode": "rich", "level": "INFO", "levels": {}},
             }
             save_config(default_config, config_path)
             return default_config
@@ -55,7 +59,7 @@ def load_config(config_path: str = None) -> dict:
         with open(config_path, "r", encoding="utf-8") as f:
             return yaml.safe_load(f)
     except yaml.YAMLError as e:
-        logger.error(f"解析配置文件 {config_path} 出错: {e}")
+        logger.error("解析配置文件 %s 出错: %s", config_path, e)
         raise
 
 
@@ -68,16 +72,155 @@ def save_config(config_data: dict, config_path: str = None) -> bool:
         config_path = os.path.join(get_project_root(), "config.yaml")
 
     try:
-        with open(config_path, "w", encoding="utf-8") as f:
-            yaml.dump(
-                config_data,
-                f,
-                allow_unicode=True,
-                default_flow_style=False,
-                sort_keys=False,
-            )
-        logger.info(f"配置已成功保存到 {config_path}")
+        _atomic_write_yaml(config_data, config_path)
+        logger.info("配置已成功保存到 %s", config_path)
         return True
     except Exception as e:
-        logger.error(f"保存配置到 {config_path} 失败: {e}")
+        logger.error("保存配置到 %s 失败: %s", config_path, e)
         return False
+
+
+def _dump_yaml(config_data, f):
+    yaml.dump(
+        config_data,
+        f,
+        allow_unicode=True,
+        default_flow_style=False,
+        sort_keys=False,
+    )
+
+
+def _atomic_write_yaml(config_data, config_path):
+    """
+    先写入同目录下的临时文件并 fsync，再用 os.replace 原子地替换目标文件，
+    并发读取者只会看到旧文件或完整的新文件，不会读到写了一半的内容。
+    """
+    directory = os.path.dirname(os.path.abspath(config_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".yaml.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            _dump_yaml(config_data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(config_path):
+            os.chmod(tmp_path, os.stat(config_path).st_mode & 0o7777)
+        try:
+            os.replace(tmp_path, config_path)
+        except OSError as e:
+            # 例如配置文件是单独挂载进容器的文件时无法被替换，退回到直接覆盖写入
+            logger.warning("无法原子地替换 %s (%s)，改为直接写入。", config_path, e)
+            with open(config_path, "w", encoding="utf-8") as f:
+                _dump_yaml(config_data, f)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# --- 配置服务 ---
+
+
+class ConfigService:
+    """
+    在内存中缓存已解析的配置，供 Web 服务等长期运行的进程使用。
+
+    get() 每次只对配置文件做一次 stat，文件的 mtime / inode / 大小变化时才重新解析 YAML；
+    save() 原子地写入文件并立即更新缓存。配置变化 (包括外部编辑文件) 时会依次调用
+    subscribe() 注册的回调，参数为新配置的副本。
+    """
+
+    def __init__(self, config_path: str = None):
+        self.config_path = config_path or os.path.join(get_project_root(), "config.yaml")
+        self._config = None
+        self._signature = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.config_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _revalidate(self):
+        """文件有变化时重新加载，返回是否加载了新内容。调用时需持有 self._lock。"""
+        signature = self._file_signature()
+        if self._config is not None and signature == self._signature:
+            return False
+        try:
+            config_data = load_config(self.config_path)
+        except Exception as e:
+            if self._config is None:
+                raise
+            # 例如文件正在被手动编辑，暂时继续使用上一次成功解析的配置
+            logger.error("重新加载配置文件 %s 失败，继续使用旧配置: %s", self.config_path, e)
+            self._signature = signature
+            return False
+        self._config = config_data or {}
+        # load_config 可能刚刚创建了默认配置文件，重新取一次签名
+        self._signature = self._file_signature()
+        return True
+
+    def get(self) -> dict:
+        """返回当前配置的副本，调用者可以随意修改它。"""
+        with self._lock:
+            had_config = self._config is not None
+            reloaded = self._revalidate()
+            config_data = copy.deepcopy(self._config)
+        if reloaded and had_config:
+            self._notify(config_data)
+        return config_data
+
+    def save(self, config_data: dict) -> bool:
+        """原子地保存配置并更新缓存，返回是否成功。"""
+        with self._lock:
+            if not save_config(config_data, self.config_path):
+                return False
+            self._config = copy.deepcopy(config_data)
+            self._signature = self._file_signature()
+        self._notify(config_data)
+        return True
+
+    def subscribe(self, callback):
+        """注册配置变化回调 callback(new_config)。"""
+        self._subscribers.append(callback)
+
+    def _notify(self, config_data):
+        for callback in list(self._subscribers):
+            try:
+                callback(copy.deepcopy(config_data))
+            except Exception as e:
+                logger.error("配置变化回调执行失败: %s", e, exc_info=True)
+
+
+# --- 配置档 (profiles) ---
+
+
+def list_profiles(config_data: dict) -> list:
+    """返回配置中定义的配置档名称列表。"""
+    return list((config_data.get("profiles") or {}).keys())
+
+
+def build_profile_config(config_data: dict, profile_name: str) -> dict:
+    """
+    将 profiles 中指定的配置档合并到基础配置上，返回一份新的配置。
+
+    配置档中的 keywords 与 categories 整体替换基础配置中的对应项；
+    fetch_settings 与 output_settings 按键覆盖；method 是 fetch_settings.method 的简写。
+    基础配置本身不会被修改。
+    """
+    profiles = config_data.get("profiles") or {}
+    if profile_name not in profiles:
+        raise KeyError(f"配置档 '{profile_name}' 不存在，可用的配置档: {list(profiles)}")
+    profile = profiles[profile_name] or {}
+
+    merged = copy.deepcopy({key: value for key, value in config_data.items() if key != "profiles"})
+    for key in ("keywords", "categories"):
+        if key in profile:
+            merged[key] = copy.deepcopy(profile[key])
+    for key in ("fetch_settings", "output_settings"):
+        if key in profile:
+            merged[key] = {**(merged.get(key) or {}), **copy.deepcopy(profile[key])}
+    if "method" in profile:
+        merged.setdefault("fetch_settings", {})["method"] = profile["method"]
+    return merged
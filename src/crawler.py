@@ -1,26 +1,46 @@
 # src/crawler.py
 
 import os
+import time
+import queue
 import logging
 from datetime import datetime
-from threading import Thread
+from threading import Condition, Event, Lock, Thread
 
-from . import fetchers, utils, database
+from . import fetchers, utils, database, metrics, mirrors, storage, tracing
+from .models import Paper
 
 logger = logging.getLogger(__name__)
 
+# 流水线模式中通知下载线程退出的哨兵对象
+_QUEUE_SENTINEL = object()
+
 
 class Crawler:
-    def __init__(self, config, socketio=None):
+    def __init__(self, config, socketio=None, room=None):
         self.config = config
         self.socketio = socketio
+        # 设置后事件只发送到该 Socket.IO 房间 (例如某个抓取任务)，否则广播给所有客户端
+        self.room = room
         self.is_running = False
-        self._stop_requested = False
-
-    def _emit(self, event, data):
+        # 发现阶段与下载阶段共享的停止信号
+        self._stop_event = Event()
+        # 正在进行的下载: pdf_url -> 该下载的取消信号
+        self._active_downloads = {}
+        # 正在进行的下载的事件房间与进度: pdf_url -> {"room", "progress"}，供客户端重新同步状态
+        self._download_state = {}
+        self._downloads_cond = Condition()
+        # 当前这次运行的分阶段耗时统计，每次开始抓取时重置
+        self.tracer = tracing.Tracer()
+
+    def _emit(self, event, data, room=None):
+        """发送事件到 room (未指定时为 self.room)；两者都为空时广播给所有客户端。"""
         if self.socketio:
-            self.socketio.emit(event, data)
-            # time.sleep(0.01) # Give the server a moment to send the message
+            room = room or self.room
+            if room:
+                self.socketio.emit(event, data, room=room)
+            else:
+                self.socketio.emit(event, data)
 
     def start_crawl(self, mode, categories=None):
         if self.is_running:
@@ -28,77 +48,182 @@ class Crawler:
             self._emit("status_update", {"status": "一个抓取任务已在运行中。"})
             return
 
-        self._stop_requested = False
+        self._stop_event.clear()
         self.is_running = True
 
         # 使用线程在后台运行抓取任务
         thread = Thread(target=self._run_crawl_task, args=(mode, categories))
         thread.start()
 
+    def run_crawl(self, mode, categories=None):
+        """
+        在当前线程中运行一次抓取 (start_crawl 的阻塞版本)，返回找到的新论文列表；
+        已有任务在运行时返回 None。开始前调用过 request_shutdown() 则立即结束。
+        """
+        if self.is_running:
+            logger.warning("抓取任务已在运行中，请勿重复启动。")
+            return None
+        self.is_running = True
+        return self._run_crawl_task(mode, categories)
+
     def stop_crawl(self):
         if not self.is_running:
             logger.warning("没有正在运行的抓取任务。")
             return
-        self._stop_requested = True
+        self._stop_event.set()
         logger.info("收到停止请求，将在当前论文处理完毕后停止。")
         self._emit("status_update", {"status": "收到停止请求..."})
 
+    def cancel_download(self, pdf_url):
+        """取消一篇正在下载的论文。返回是否找到了对应的下载任务。"""
+        with self._downloads_cond:
+            cancel_event = self._active_downloads.get(pdf_url)
+        if cancel_event is None:
+            return False
+        cancel_event.set()
+        logger.info("已请求取消下载: %s", pdf_url)
+        return True
+
+    def cancel_all_downloads(self):
+        """取消所有正在进行的下载，返回被取消的任务数。"""
+        with self._downloads_cond:
+            cancel_events = list(self._active_downloads.values())
+        for cancel_event in cancel_events:
+            cancel_event.set()
+        if cancel_events:
+            logger.info("已请求取消 %s 个正在进行的下载。", len(cancel_events))
+        return len(cancel_events)
+
+    def request_shutdown(self):
+        """非阻塞地请求关闭：停止发现阶段并取消所有下载。可在信号处理函数中调用。"""
+        self._stop_event.set()
+        self.cancel_all_downloads()
+
+    def shutdown(self, timeout=10):
+        """
+        优雅关闭：停止发现阶段、取消所有下载，并在截止时间内等待下载线程退出。
+        返回是否在截止时间内全部结束。
+        """
+        self.request_shutdown()
+        deadline = time.monotonic() + timeout
+        with self._downloads_cond:
+            while self._active_downloads:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("仍有 %s 个下载未能在 %s 秒内结束。", len(self._active_downloads), timeout)
+                    return False
+                self._downloads_cond.wait(remaining)
+        return True
+
+    def active_downloads(self, rooms=None):
+        """
+        返回正在进行的下载及其进度 [{"pdf_url", "progress"}]。
+        指定 rooms 时只返回事件发往这些房间 (或广播) 的下载。
+        """
+        with self._downloads_cond:
+            return [
+                {"pdf_url": pdf_url, "progress": state["progress"]}
+                for pdf_url, state in self._download_state.items()
+                if rooms is None or state["room"] is None or state["room"] in rooms
+            ]
+
+    def _register_download(self, pdf_url, room=None):
+        """登记一个下载任务并返回其取消信号；同一链接已在下载中时返回 None。"""
+        with self._downloads_cond:
+            if pdf_url in self._active_downloads:
+                return None
+            cancel_event = Event()
+            self._active_downloads[pdf_url] = cancel_event
+            self._download_state[pdf_url] = {"room": room or self.room, "progress": 0}
+        metrics.ACTIVE_DOWNLOADS.inc()
+        return cancel_event
+
+    def _unregister_download(self, pdf_url):
+        with self._downloads_cond:
+            self._active_downloads.pop(pdf_url, None)
+            self._download_state.pop(pdf_url, None)
+            self._downloads_cond.notify_all()
+        metrics.ACTIVE_DOWNLOADS.dec()
+
+    def _discover_papers(self, mode, categories):
+        """
+        依次调用各个抓取器，逐篇产出数据库中尚不存在的新论文。
+        这是一个生成器，批量模式与流水线模式共用。
+        """
+        # 1. 确定要调用的爬取函数和对应的类别列表
+        arxiv_cats = categories.get("arxiv", [])
+        biorxiv_cats = categories.get("biorxiv", [])
+
+        fetcher_map = {
+            "keyword": [
+                (fetchers.fetch_from_arxiv_by_keyword, None),
+                (fetchers.fetch_from_biorxiv_by_keyword, None),
+            ],
+            "category": [
+                (fetchers.fetch_from_arxiv_by_category, arxiv_cats),
+                (fetchers.fetch_from_biorxiv_by_category, biorxiv_cats),
+            ],
+        }
+
+        fetcher_functions = fetcher_map.get(mode)
+        if not fetcher_functions:
+            raise ValueError(f"未知的抓取模式: {mode}")
+
+        # 2. 逐篇产出去重后的新论文
+        unique_urls = set()
+        # 已入库链接索引在进程内共享，这里只增量读取上次运行以来的新记录
+        with tracing.span("discover.known_urls_refresh"):
+            database.known_urls.refresh()
+
+        for fetcher, cats_list in fetcher_functions:
+            if self._stop_event.is_set():
+                return
+
+            source_name = fetcher.__name__.split("_")[2].capitalize()
+            source_label = source_name.lower()
+            self._emit("status_update", {"status": f"正在从 {source_name} 获取论文列表..."})
+
+            try:
+                # fetcher 是一个生成器
+                paper_generator = fetcher(self.config, cats_list) if cats_list is not None else fetcher(self.config)
+
+                for paper_data in tracing.traced_iter(f"discover.{source_label}.fetch", paper_generator):
+                    if self._stop_event.is_set():
+                        break
+                    if not paper_data:
+                        continue
+                    # 确保论文没有被重复添加
+                    if paper_data.paper_url in unique_urls:
+                        metrics.CANDIDATES.inc(source=source_label, result="duplicate")
+                        continue
+                    # 检查论文是否已在数据库中
+                    if paper_data.pdf_url in database.known_urls:
+                        metrics.CANDIDATES.inc(source=source_label, result="known")
+                        continue
+                    metrics.CANDIDATES.inc(source=source_label, result="new")
+                    unique_urls.add(paper_data.paper_url)
+                    yield paper_data
+            except Exception as e:
+                logger.error("从 %s 获取数据时出错: %s", source_name, e, exc_info=True)
+                self._emit("status_update", {"status": f"从 {source_name} 获取数据时出错: {e}"})
+
+    def emit_trace_summary(self):
+        """将分阶段耗时统计发送给前端，并返回统计行。"""
+        rows = self.tracer.summary()
+        self._emit("trace_summary", {"spans": rows})
+        return rows
+
     def _run_crawl_task(self, mode, categories):
-        logger.info(f"抓取任务开始，模式: '{mode}', 类别: {categories}")
+        logger.info("抓取任务开始，模式: '%s', 类别: %s", mode, categories)
         self._emit("status_update", {"status": f"抓取任务启动，模式: '{mode}'"})
+        self.tracer = tracing.Tracer()
 
         try:
-            # 1. 确定要调用的爬取函数和对应的类别列表
-            arxiv_cats = categories.get("arxiv", [])
-            biorxiv_cats = categories.get("biorxiv", [])
-
-            fetcher_map = {
-                "keyword": [
-                    (fetchers.fetch_from_arxiv_by_keyword, None),
-                    (fetchers.fetch_from_biorxiv_by_keyword, None),
-                ],
-                "category": [
-                    (fetchers.fetch_from_arxiv_by_category, arxiv_cats),
-                    (fetchers.fetch_from_biorxiv_by_category, biorxiv_cats),
-                ],
-            }
-
-            fetcher_functions = fetcher_map.get(mode)
-            if not fetcher_functions:
-                raise ValueError(f"未知的抓取模式: {mode}")
-
-            # 2. 执行爬取并将所有结果收集到一个列表中
-            paper_list = []
-            unique_urls = set()
-
-            for fetcher, cats_list in fetcher_functions:
-                if self._stop_requested:
-                    break
-
-                source_name = fetcher.__name__.split("_")[2].capitalize()
-                self._emit("status_update", {"status": f"正在从 {source_name} 获取论文列表..."})
+            # 执行爬取并将所有结果收集到一个列表中
+            with tracing.activate(self.tracer), tracing.span("discover.total"):
+                paper_list = list(self._discover_papers(mode, categories))
 
-                try:
-                    # fetcher 是一个生成器
-                    paper_generator = fetcher(self.config, cats_list) if cats_list is not None else fetcher(self.config)
-
-                    for paper_data in paper_generator:
-                        if self._stop_requested:
-                            break
-                        # 确保论文没有被重复添加
-                        if paper_data["paper_url"] not in unique_urls:
-                            # 检查论文是否已在数据库中
-                            if not database.is_paper_downloaded(paper_data["pdf_url"]):
-                                paper_list.append(paper_data)
-                                unique_urls.add(paper_data["paper_url"])
-                except Exception as e:
-                    logger.error(f"从 {source_name} 获取数据时出错: {e}", exc_info=True)
-                    self._emit("status_update", {"status": f"从 {source_name} 获取数据时出错: {e}"})
-
-                if self._stop_requested:
-                    break
-
-            if self._stop_requested:
+            if self._stop_event.is_set():
                 final_status = "抓取任务已手动停止。"
             else:
                 final_status = f"抓取任务完成。找到 {len(paper_list)} 篇新论文。"
@@ -106,81 +231,291 @@ class Crawler:
             logger.info(final_status)
             self._emit("status_update", {"status": final_status})
 
-            # 3. 将整个列表发送给前端，或者在CLI模式下返回它
+            # 3. 将整个列表发送给前端，并返回给调用者 (CLI 模式与任务管理器)
             if self.socketio:
-                self._emit("paper_list_update", {"papers": paper_list})
-            else:
-                return paper_list # CLI mode
+                self._emit("paper_list_update", {"papers": [paper.to_dict() for paper in paper_list]})
+            return paper_list
 
         except Exception as e:
-            logger.error(f"抓取任务执行失败: {e}", exc_info=True)
+            logger.error("抓取任务执行失败: %s", e, exc_info=True)
             self._emit("status_update", {"status": f"错误: {e}"})
         finally:
             self.is_running = False
-            self._stop_requested = False
+            self._stop_event.clear()
+            self.emit_trace_summary()
             self._emit("crawl_finished", {})
 
-    def _download_paper(self, paper_data):
+    def run_pipelined(
+        self,
+        mode,
+        categories,
+        num_workers=4,
+        queue_size=16,
+        on_result=None,
+        drain_timeout=30,
+        accept=None,
+    ):
         """
-        下载单个 PDF 文件并报告进度。
-        这是一个私有方法，只负责下载，不与数据库交互。
+        流水线模式：发现阶段产出的论文经有界队列直接交给下载线程，
+        使元数据抓取与 PDF 下载并行进行。
+        队列满时发现阶段阻塞等待 (背压)；停止信号由发现与下载两端共享，
+        停止后仍在队列中的论文将被丢弃，并最多等待 drain_timeout 秒让下载线程退出。
+        on_result(paper_data, success) 会在每篇论文处理完成后于下载线程中调用。
+        accept(paper_data) 若提供，则在入队前调用，返回 False 的论文被跳过且不计入发现数
+        (批量模式用它在多个配置档之间去重)。
+        返回统计字典: {"discovered": n, "downloaded": n, "failed": n}。
         """
+        if self.is_running:
+            logger.warning("抓取任务已在运行中，请勿重复启动。")
+            return None
+
+        self._stop_event.clear()
+        self.is_running = True
+        self.tracer = tracing.Tracer()
+        logger.info("流水线抓取开始，模式: '%s', 下载线程数: %s, 队列长度: %s", mode, num_workers, queue_size)
+        self._emit("status_update", {"status": f"流水线抓取任务启动，模式: '{mode}'"})
+
+        paper_queue = queue.Queue(maxsize=queue_size)
+        stats = {"discovered": 0, "downloaded": 0, "failed": 0}
+        stats_lock = Lock()
+
+        def worker():
+            while True:
+                paper_data = paper_queue.get()
+                metrics.PIPELINE_QUEUE_DEPTH.set(paper_queue.qsize())
+                try:
+                    if paper_data is _QUEUE_SENTINEL:
+                        return
+                    if self._stop_event.is_set():
+                        continue  # 停止后只排空队列，不再下载
+                    success, paper = self._download(paper_data)
+                    with stats_lock:
+                        stats["downloaded" if success else "failed"] += 1
+                    if on_result:
+                        on_result(paper, success)
+                finally:
+                    paper_queue.task_done()
+
+        workers = [
+            Thread(target=worker, name=f"pipeline-download-{i}", daemon=True)
+            for i in range(max(1, num_workers))
+        ]
+        for t in workers:
+            t.start()
+
+        try:
+            with tracing.activate(self.tracer), tracing.span("discover.total"):
+                for paper_data in self._discover_papers(mode, categories):
+                    if accept is not None and not accept(paper_data):
+                        continue
+                    stats["discovered"] += 1
+                    # 带超时地入队，队列满时阻塞 (背压)，同时及时响应停止信号
+                    with tracing.span("pipeline.queue_wait"):
+                        while not self._stop_event.is_set():
+                            try:
+                                paper_queue.put(paper_data, timeout=0.5)
+                                metrics.PIPELINE_QUEUE_DEPTH.set(paper_queue.qsize())
+                                break
+                            except queue.Full:
+                                continue
+                    if self._stop_event.is_set():
+                        break
+        except Exception as e:
+            logger.error("流水线抓取任务执行失败: %s", e, exc_info=True)
+            self._emit("status_update", {"status": f"错误: {e}"})
+        finally:
+            if self._stop_event.is_set():
+                # 丢弃尚未开始的下载，让下载线程尽快看到退出信号
+                while True:
+                    try:
+                        paper_queue.get_nowait()
+                        paper_queue.task_done()
+                    except queue.Empty:
+                        break
+                deadline = time.monotonic() + drain_timeout
+            else:
+                deadline = None
+            for _ in workers:
+                paper_queue.put(_QUEUE_SENTINEL)
+            for t in workers:
+                t.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+            if self._stop_event.is_set():
+                final_status = "流水线抓取任务已手动停止。"
+            else:
+                final_status = (
+                    f"流水线抓取任务完成。发现 {stats['discovered']} 篇新论文，"
+                    f"成功下载 {stats['downloaded']} 篇，失败 {stats['failed']} 篇。"
+                )
+            logger.info(final_status)
+            self._emit("status_update", {"status": final_status})
+
+            self.is_running = False
+            self._stop_event.clear()
+            self.emit_trace_summary()
+            self._emit("crawl_finished", {})
+
+        return stats
+
+    def _download_root(self):
+        """下载根目录的绝对路径；可通过 output_settings.download_dir 配置，相对路径基于项目根目录。"""
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        download_root = (self.config.get("output_settings") or {}).get("download_dir") or "paper"
+        return os.path.join(base_dir, download_root)
+
+    def _download_paper(self, paper, cancel_event=None, room=None):
+        """
+        下载单个 PDF 文件并报告进度，返回 (文件路径, sha256)；下载失败时文件路径为 None。
+        这是一个私有方法，只负责下载，不与数据库交互。
+        """
         today_str = datetime.now().strftime("%Y-%m-%d")
-        download_dir = os.path.join(base_dir, "paper", paper_data["source"], today_str)
+        download_dir = os.path.join(self._download_root(), paper.source, today_str)
         os.makedirs(download_dir, exist_ok=True)
 
-        filename = f"{utils.sanitize_filename(paper_data['title'])}.pdf"
+        filename = f"{utils.sanitize_filename(paper.title)}.pdf"
         filepath = os.path.join(download_dir, filename)
 
-        def progress_callback(progress, downloaded_mb, total_mb):
+        state = self._download_state.get(paper.pdf_url)
+        digest = {}
+
+        def progress_callback(progress, downloaded_bytes, total_bytes):
+            # 回调在每个数据块后都会调用；只在百分比变化时发送事件
+            if state is not None:
+                if state["progress"] == progress:
+                    return
+                state["progress"] = progress
             self._emit(
                 "download_progress",
                 {
-                    "pdf_url": paper_data["pdf_url"], # 使用唯一的 URL 作为标识符
+                    "pdf_url": paper.pdf_url, # 使用唯一的 URL 作为标识符
                     "progress": progress,
-                    "status": f"下载中... {downloaded_mb:.2f}/{total_mb:.2f} MB"
+                    "status": f"下载中... {downloaded_bytes / 1048576:.2f}/{total_bytes / 1048576:.2f} MB"
                 },
+                room,
             )
 
-        if utils.download_pdf(
-            paper_data["pdf_url"],
-            filepath,
-            paper_data.get("paper_url"),
-            progress_callback,
-        ):
-            return filepath
-        return None
-
-    def download_single_paper(self, paper_data):
+        def checksum_callback(sha256):
+            digest["sha256"] = sha256
+
+        # 依次尝试各镜像 (最优的在前)；一个镜像失败后换下一个，已下载的部分断点续传
+        # (download_pdf 以 If-Range 校验，其他镜像上的文件不同时从头下载)
+        mirror_settings = self.config.get("mirrors")
+        targets = mirrors.candidates(paper.source, paper.pdf_url, mirror_settings)
+        retries = {"max_retries": mirrors.retries_per_mirror(mirror_settings)} if len(targets) > 1 else {}
+        for index, (mirror, url) in enumerate(targets):
+            if index:
+                metrics.MIRROR_FAILOVERS.inc(source=paper.source)
+                logger.warning("从 %s 下载失败，改用镜像 %s: %s", targets[index - 1][0], mirror, paper.title)
+            if utils.download_pdf(
+                url,
+                filepath,
+                paper.paper_url,
+                progress_callback,
+                cancel_event=cancel_event,
+                checksum_callback=checksum_callback,
+                transfer_callback=lambda ok, size, seconds, status_code, mirror=mirror: mirrors.record(
+                    mirror, mirror_settings, ok, size, seconds, status_code
+                ),
+                **retries,
+            ):
+                return filepath, digest.get("sha256")
+            if cancel_event is not None and cancel_event.is_set():
+                break
+        return None, None
+
+    def download_single_paper(self, paper_data, room=None):
         """
         公开方法：下载、更新数据库并通知前端。
+        返回是否下载成功 (已存在于数据库中的论文视为成功)。
+        下载过程可通过 cancel_download / cancel_all_downloads 取消。
+        room 指定接收本次下载事件的房间 (例如发起下载的客户端 sid)，默认为 self.room。
+        paper_data 为 Paper，或其 JSON / 数据库行形式 (例如客户端发来的论文)。
         """
+        success, _ = self._download(paper_data, room)
+        return success
+
+    def _download(self, paper_data, room=None):
+        """下载并记录一篇论文，返回 (是否成功, 论文)；下载成功时论文带有文件信息。"""
+        paper = Paper.from_dict(paper_data)
+        pdf_url = paper.pdf_url
+        cancel_event = self._register_download(pdf_url, room)
+        if cancel_event is None:
+            logger.warning("论文 '%s' 正在下载中，忽略重复请求。", paper.title)
+            return False, paper
+
+        try:
+            with tracing.activate(self.tracer):
+                return self._download_and_record(paper, cancel_event, room)
+        finally:
+            self._unregister_download(pdf_url)
+
+    def _download_and_record(self, paper, cancel_event, room=None):
+        pdf_url = paper.pdf_url
         try:
-            logger.info(f"开始下载论文: {paper_data['title']}")
+            logger.info("开始下载论文: %s", paper.title)
 
             # 检查是否已下载，以防万一
-            if database.is_paper_downloaded(paper_data["pdf_url"]):
-                logger.warning(f"论文 '{paper_data['title']}' 已存在于数据库中，跳过下载。")
+            with tracing.span("download.db_check"):
+                known = database.is_paper_downloaded(pdf_url)
+            if known:
+                logger.warning("论文 '%s' 已存在于数据库中，跳过下载。", paper.title)
                 # 也许需要通知前端这个状态
-                return
-
-            filepath = self._download_paper(paper_data)
+                return True, paper
+
+            # 磁盘配额与剩余空间检查，必要时先清理旧文件；空间仍不足时拒绝下载
+            storage_settings = self.config.get("storage")
+            with tracing.span("download.storage_check"):
+                allowed, reason = storage.ensure_capacity(storage_settings, self._download_root(), cancel_event)
+            if not allowed:
+                if cancel_event.is_set():
+                    metrics.DOWNLOADS.inc(result="cancelled")
+                    self._emit("download_cancelled", {"pdf_url": pdf_url}, room)
+                    return False, paper
+                metrics.DOWNLOADS.inc(result="refused")
+                logger.warning("拒绝下载论文 '%s': %s", paper.title, reason)
+                self._emit("download_failed", {"pdf_url": pdf_url, "reason": reason}, room)
+                self._emit("status_update", {"status": f"下载被拒绝: {reason}"}, room)
+                return False, paper
+
+            with tracing.span("download.transfer"):
+                filepath, sha256 = self._download_paper(paper, cancel_event, room)
 
             if filepath:
-                logger.info(f"论文 '{paper_data['title']}' 下载成功，路径: {filepath}")
-                paper_data["filepath"] = filepath
-                paper_data["download_date"] = datetime.now().isoformat()
+                logger.info("论文 '%s' 下载成功，路径: %s", paper.title, filepath)
+                # 项目目录下的文件保存相对路径，整个目录移动后记录仍然有效
+                paper = paper.downloaded(
+                    filepath=utils.relative_paper_path(filepath),
+                    file_size=os.path.getsize(filepath),
+                    sha256=sha256,
+                    download_date=datetime.now().isoformat(),
+                )
 
                 # 存入数据库
-                database.add_paper(paper_data)
+                with tracing.span("download.db_insert"):
+                    paper_id = database.add_paper(paper)
+                # 新文件计入配额，超出时清理其他文件
+                with tracing.span("download.storage_enforce"):
+                    storage.enforce_quota(storage_settings, keep_ids=[paper_id] if paper_id else ())
 
                 # 通过 paper_downloaded 事件通知前端
-                self._emit("paper_downloaded", {"paper": paper_data})
+                self._emit("paper_downloaded", {"paper": paper.to_dict()}, room)
+                metrics.DOWNLOADS.inc(result="success")
+                return True, paper
+            elif cancel_event.is_set():
+                metrics.DOWNLOADS.inc(result="cancelled")
+                logger.info("论文下载已取消: %s", paper.title)
+                self._emit("download_cancelled", {"pdf_url": pdf_url}, room)
+                return False, paper
             else:
-                logger.error(f"下载论文失败: {paper_data['title']}")
-                self._emit("status_update", {"status": f"下载失败: {paper_data['title']}"})
+                metrics.DOWNLOADS.inc(result="failed")
+                logger.error("下载论文失败: %s", paper.title)
+                self._emit("download_failed", {"pdf_url": pdf_url}, room)
+                self._emit("status_update", {"status": f"下载失败: {paper.title}"}, room)
+                return False, paper
 
         except Exception as e:
-            logger.error(f"处理论文下载时出错 '{paper_data['title']}': {e}", exc_info=True)
-            self._emit("status_update", {"status": f"处理下载时出错: {e}"})
+            metrics.DOWNLOADS.inc(result="failed")
+            logger.error("处理论文下载时出错 '%s': %s", paper.title, e, exc_info=True)
+            self._emit("download_failed", {"pdf_url": pdf_url}, room)
+            self._emit("status_update", {"status": f"处理下载时出错: {e}"}, room)
+            return False, paper
@@ -2,7 +2,12 @@
 
 import sqlite3
 import os
+import json
 import logging
+import functools
+import threading
+
+from . import metrics, utils
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +23,73 @@ def get_db_connection():
     return conn
 
 
+def _timed(operation):
+    """记录被装饰函数的耗时到 DB_QUERY_SECONDS 指标。"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.DB_QUERY_SECONDS.time(operation=operation):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# 建表之后新增的列：列名 -> 列定义。已有数据库在 init_db() 时自动补齐
+_MIGRATED_COLUMNS = {
+    "sha256": "TEXT",  # PDF 内容的 SHA-256，用作 HTTP 强 ETag
+    "deleted_at": "TIMESTAMP",  # 删除任务开始的时间；非空表示记录已标记删除、文件尚待清理
+    "file_size": "INTEGER",  # PDF 文件大小 (字节)，用于磁盘配额统计
+    "last_access": "TIMESTAMP",  # 最近一次在界面中打开的时间，LRU 清理的依据
+    "evicted_at": "TIMESTAMP",  # 文件因磁盘配额被清理的时间；记录保留，可重新下载
+}
+
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_papers_filepath ON papers (filepath)",
+    # 论文列表按下载时间分页
+    "CREATE INDEX IF NOT EXISTS idx_papers_download_date ON papers (download_date DESC, id DESC)",
+    # 启动时查找未完成的删除
+    "CREATE INDEX IF NOT EXISTS idx_papers_deleted_at ON papers (deleted_at) WHERE deleted_at IS NOT NULL",
+    # 磁盘配额清理按最近访问时间挑选文件
+    "CREATE INDEX IF NOT EXISTS idx_papers_last_access ON papers (COALESCE(last_access, download_date)) "
+    "WHERE evicted_at IS NULL AND deleted_at IS NULL",
+)
+
+# 建表之后新增的表，新旧数据库都在 init_db() 时创建
+_TABLES = (
+    # 一致性检查 (src/reconcile.py) 缓存的目录内容：目录 mtime 未变化时不再重新列出
+    """
+    CREATE TABLE IF NOT EXISTS scan_cache (
+        directory TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL,
+        subdirs TEXT NOT NULL,  -- JSON: [子目录名]
+        files TEXT NOT NULL     -- JSON: [[文件名, 大小]]
+    )
+    """,
+    # 数据源查询结果缓存 (src/query_cache.py)
+    """
+    CREATE TABLE IF NOT EXISTS query_cache (
+        key TEXT PRIMARY KEY,
+        created_at REAL NOT NULL,
+        payload BLOB NOT NULL  -- zlib 压缩的 JSON
+    )
+    """,
+)
+
+# 文件仍在磁盘上的记录 (未被标记删除，也未被配额清理)
+_RESIDENT = "deleted_at IS NULL AND evicted_at IS NULL"
+
+# 批量操作时每条语句最多绑定的 ID 数 (SQLite 默认的变量上限较低)
+_ID_CHUNK_SIZE = 500
+
+
 def init_db():
     """初始化数据库和表"""
     if os.path.exists(DB_PATH):
         logger.info("数据库已存在，跳过初始化。")
+        _migrate_db()
         return
 
     logger.info("初始化数据库...")
@@ -39,98 +107,312 @@ def init_db():
             paper_url TEXT UNIQUE NOT NULL, -- 论文摘要页链接
             pdf_url TEXT UNIQUE NOT NULL,   -- PDF下载链接
             filepath TEXT,                  -- 本地文件路径
-            download_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            download_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sha256 TEXT,                    -- PDF 内容的 SHA-256
+            deleted_at TIMESTAMP,           -- 标记删除的时间，非空时不出现在论文列表中
+            file_size INTEGER,              -- PDF 文件大小 (字节)
+            last_access TIMESTAMP,          -- 最近一次打开的时间
+            evicted_at TIMESTAMP            -- 文件被配额清理的时间，记录保留
         );
         """
         )
+        for statement in _TABLES + _INDEXES:
+            cursor.execute(statement)
         conn.commit()
         conn.close()
+        known_urls.reset()
         logger.info("数据库表 'papers' 创建成功。")
     except sqlite3.Error as e:
-        logger.error(f"数据库初始化失败: {e}")
+        logger.error("数据库初始化失败: %s", e)
 
 
-def add_paper(paper_data):
-    """添加一条论文记录"""
+def _migrate_db():
+    """为旧版本创建的数据库补齐新增的列与索引。"""
+    try:
+        conn = get_db_connection()
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(papers)")}
+        for column, definition in _MIGRATED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE papers ADD COLUMN {column} {definition}")
+                logger.info("数据库迁移: 已添加列 papers.%s", column)
+        for statement in _TABLES + _INDEXES:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("数据库迁移失败: %s", e)
+
+
+class KnownUrlIndex:
+    """
+    已入库论文 pdf_url 的内存索引，供发现阶段判断论文是否已下载，
+    避免每篇候选论文都查询一次数据库。
+
+    首次 refresh() 读取全部链接，之后只增量读取 id 更大的新记录 (包括其他进程写入的)；
+    本进程内的 add_paper / delete_* 会同步更新索引。id 为 AUTOINCREMENT，不会被重用，
+    因此增量读取后记录总数与索引中的记录数不一致时，说明有记录被删除 (例如另一进程中
+    Web 界面的删除任务)，此时重新全量加载。
+    """
+
+    def __init__(self):
+        self._urls = set()
+        self._max_id = 0
+        self._rows = 0  # 已加载的记录数
+        self._db_path = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """增量加载自上次刷新以来新增的记录；数据库文件变化或有记录被删除时重新全量加载。"""
+        with self._lock:
+            if self._db_path != DB_PATH:
+                self._clear()
+                self._db_path = DB_PATH
+            try:
+                with metrics.DB_QUERY_SECONDS.time(operation="known_urls_refresh"):
+                    conn = get_db_connection()
+                    try:
+                        rows = self._load(conn)
+                        total = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+                        if total != self._rows + len(rows):
+                            logger.debug("已下载论文索引与数据库不一致 (记录被删除)，重新全量加载。")
+                            self._clear()
+                            rows = self._load(conn)
+                    finally:
+                        conn.close()
+            except sqlite3.Error as e:
+                logger.error("加载已下载论文索引失败: %s", e)
+                return len(self._urls)
+            for row in rows:
+                self._urls.add(row["pdf_url"])
+            if rows:
+                self._max_id = rows[-1]["id"]
+            self._rows += len(rows)
+            return len(self._urls)
+
+    def _load(self, conn):
+        return conn.execute("SELECT id, pdf_url FROM papers WHERE id > ? ORDER BY id", (self._max_id,)).fetchall()
+
+    def _clear(self):
+        self._urls = set()
+        self._max_id = 0
+        self._rows = 0
+
+    def reset(self):
+        """清空索引，下次 refresh() 时重新全量加载。"""
+        with self._lock:
+            self._clear()
+            self._db_path = None
+
+    def add(self, pdf_url):
+        with self._lock:
+            self._urls.add(pdf_url)
+
+    def discard(self, pdf_urls):
+        with self._lock:
+            self._urls.difference_update(pdf_urls)
+
+    def __contains__(self, pdf_url):
+        return pdf_url in self._urls
+
+    def __len__(self):
+        return len(self._urls)
+
+
+# 进程内共享的已下载链接索引；定时任务与多个配置档之间复用
+known_urls = KnownUrlIndex()
+
+
+@_timed("add_paper")
+def add_paper(paper):
+    """添加一条论文记录 (models.Paper)"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         cursor.execute(
             """
-        INSERT INTO papers (title, authors, source, category, paper_url, pdf_url, filepath)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO papers (title, authors, source, category, paper_url, pdf_url, filepath, sha256, file_size)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-            (
-                paper_data.get("title", "N/A"),
-                paper_data.get("authors"),
-                paper_data.get("source"),
-                paper_data.get("category"),
-                paper_data.get("paper_url"),
-                paper_data.get("pdf_url"),
-                paper_data.get("filepath"),
-            ),
+            paper.to_row(),
         )
         conn.commit()
         conn.close()
+        known_urls.add(paper.pdf_url)
         return cursor.lastrowid
     except sqlite3.IntegrityError:
-        logger.debug(
-            f"论文 '{paper_data.get('title')}' 已存在，跳过添加。"
-        )
+        # 释放写锁，否则下面的更新 (新连接) 会等待到超时
+        conn.rollback()
+        conn.close()
+        # 文件曾被配额清理的论文重新下载后，更新原有记录
+        paper_id = _restore_evicted_paper(paper)
+        if paper_id is not None:
+            return paper_id
+        logger.debug("论文 '%s' 已存在，跳过添加。", paper.title)
+        return None
+    except sqlite3.Error as e:
+        logger.error("添加论文到数据库失败: %s", e)
         return None
+
+
+def _restore_evicted_paper(paper):
+    """文件已被清理的记录重新指向新下载的文件，返回记录 ID；记录不存在或未被清理时返回 None"""
+    try:
+        conn = get_db_connection()
+        with conn:
+            row = conn.execute(
+                "SELECT id FROM papers WHERE pdf_url = ? AND evicted_at IS NOT NULL",
+                (paper.pdf_url,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    """
+                UPDATE papers SET filepath = ?, sha256 = ?, file_size = ?, evicted_at = NULL,
+                    download_date = CURRENT_TIMESTAMP, last_access = NULL
+                WHERE id = ?
+                """,
+                    (paper.filepath, paper.sha256, paper.file_size, row["id"]),
+                )
+        conn.close()
+        if row is None:
+            return None
+        logger.info("论文 '%s' 已重新下载。", paper.title)
+        return row["id"]
     except sqlite3.Error as e:
-        logger.error(f"添加论文到数据库失败: {e}")
+        logger.error("更新重新下载的论文记录失败: %s", e)
         return None
 
 
+@_timed("get_all_papers")
 def get_all_papers():
     """获取所有论文记录"""
     try:
         conn = get_db_connection()
         papers = conn.execute(
-            "SELECT * FROM papers ORDER BY download_date DESC"
+            "SELECT * FROM papers WHERE deleted_at IS NULL ORDER BY download_date DESC"
         ).fetchall()
         conn.close()
         return [dict(p) for p in papers]
     except sqlite3.Error as e:
-        logger.error(f"从数据库获取论文列表失败: {e}")
+        logger.error("从数据库获取论文列表失败: %s", e)
         return []
 
 
+@_timed("get_papers_page")
+def get_papers_page(limit, before=None, offset=0):
+    """
+    按下载时间倒序分页获取论文记录。
+    before 为上一页最后一条记录的 (download_date, id)，返回排在它之后的记录 (键集分页，使用
+    idx_papers_download_date 索引)；分页期间插入或删除记录不会使后面的页错位。
+    offset 仅为兼容旧的调用方保留。
+    """
+    try:
+        conn = get_db_connection()
+        if before is not None:
+            papers = conn.execute(
+                "SELECT * FROM papers WHERE deleted_at IS NULL AND (download_date, id) < (?, ?)"
+                " ORDER BY download_date DESC, id DESC LIMIT ?",
+                (before[0], before[1], limit),
+            ).fetchall()
+        else:
+            papers = conn.execute(
+                "SELECT * FROM papers WHERE deleted_at IS NULL"
+                " ORDER BY download_date DESC, id DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        conn.close()
+        return [dict(p) for p in papers]
+    except sqlite3.Error as e:
+        logger.error("从数据库获取论文列表失败: %s", e)
+        return []
+
+
+@_timed("count_papers")
+def count_papers():
+    """返回论文记录总数"""
+    try:
+        conn = get_db_connection()
+        total = conn.execute("SELECT COUNT(*) FROM papers WHERE deleted_at IS NULL").fetchone()[0]
+        conn.close()
+        return total
+    except sqlite3.Error as e:
+        logger.error("统计论文数量失败: %s", e)
+        return 0
+
+
+@_timed("is_paper_downloaded")
 def is_paper_downloaded(pdf_url):
     """通过 PDF 链接检查论文是否已下载"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM papers WHERE pdf_url = ?", (pdf_url,))
+        # 文件被配额清理的记录视为未下载，可以重新下载
+        cursor.execute("SELECT id FROM papers WHERE pdf_url = ? AND evicted_at IS NULL", (pdf_url,))
         paper = cursor.fetchone()
         conn.close()
         return paper is not None
     except sqlite3.Error as e:
-        logger.error(f"查询数据库失败: {e}")
+        logger.error("查询数据库失败: %s", e)
+        return False
+
+
+def _filepath_variants(filepath):
+    """同一文件在数据库中可能的两种写法：绝对路径 (旧版本) 与相对项目根目录的路径"""
+    return utils.resolve_paper_path(filepath), utils.relative_paper_path(filepath)
+
+
+@_timed("get_paper_by_filepath")
+def get_paper_by_filepath(filepath):
+    """通过本地文件路径 (绝对或相对路径均可) 查找论文记录，未找到时返回 None"""
+    try:
+        conn = get_db_connection()
+        paper = conn.execute(
+            "SELECT * FROM papers WHERE filepath IN (?, ?)", _filepath_variants(filepath)
+        ).fetchone()
+        conn.close()
+        return dict(paper) if paper else None
+    except sqlite3.Error as e:
+        logger.error("查询数据库失败: %s", e)
+        return None
+
+
+@_timed("set_paper_sha256")
+def set_paper_sha256(paper_id, sha256):
+    """为已有记录补写内容摘要"""
+    try:
+        conn = get_db_connection()
+        conn.execute("UPDATE papers SET sha256 = ? WHERE id = ?", (sha256, paper_id))
+        conn.commit()
+        conn.close()
+        return True
+    except sqlite3.Error as e:
+        logger.error("更新论文 ID: %s 的摘要失败: %s", paper_id, e)
         return False
 
 
+@_timed("delete_paper_by_id")
 def delete_paper_by_id(paper_id):
     """通过ID删除单篇论文记录"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         # First, get the filepath before deleting the record
-        cursor.execute("SELECT filepath FROM papers WHERE id = ?", (paper_id,))
+        cursor.execute("SELECT filepath, pdf_url FROM papers WHERE id = ?", (paper_id,))
         result = cursor.fetchone()
         filepath = result["filepath"] if result else None
 
         cursor.execute("DELETE FROM papers WHERE id = ?", (paper_id,))
         conn.commit()
         conn.close()
-        logger.info(f"成功从数据库删除论文 ID: {paper_id}")
+        if result:
+            known_urls.discard([result["pdf_url"]])
+        logger.info("成功从数据库删除论文 ID: %s", paper_id)
         return filepath  # Return filepath for file system deletion
     except sqlite3.Error as e:
-        logger.error(f"从数据库删除论文 ID: {paper_id} 失败: {e}")
+        logger.error("从数据库删除论文 ID: %s 失败: %s", paper_id, e)
         return None
 
 
+@_timed("delete_papers_by_ids")
 def delete_papers_by_ids(paper_ids):
     """通过ID列表批量删除论文记录"""
     if not paper_ids:
@@ -144,7 +426,7 @@ def delete_papers_by_ids(paper_ids):
         # Get filepaths for all papers to be deleted
         placeholders = ",".join("?" * len(paper_ids))
         cursor.execute(
-            f"SELECT filepath FROM papers WHERE id IN ({placeholders})", paper_ids
+            f"SELECT filepath, pdf_url FROM papers WHERE id IN ({placeholders})", paper_ids
         )
         results = cursor.fetchall()
         filepaths = [row["filepath"] for row in results if row["filepath"]]
@@ -152,8 +434,328 @@ def delete_papers_by_ids(paper_ids):
         cursor.execute(f"DELETE FROM papers WHERE id IN ({placeholders})", paper_ids)
         conn.commit()
         conn.close()
-        logger.info(f"成功从数据库批量删除论文 ID: {paper_ids}")
+        known_urls.discard([row["pdf_url"] for row in results])
+        logger.info("成功从数据库批量删除论文 ID: %s", paper_ids)
         return filepaths  # Return filepaths for file system deletion
     except sqlite3.Error as e:
-        logger.error(f"从数据库批量删除论文 ID: {paper_ids} 失败: {e}")
+        logger.error("从数据库批量删除论文 ID: %s 失败: %s", paper_ids, e)
         return []
+
+
+def _chunked(ids, size=_ID_CHUNK_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+@_timed("tombstone_papers")
+def tombstone_papers(paper_ids):
+    """
+    在一个事务中把论文记录标记为已删除 (deleted_at)，返回本次新标记的完整记录。
+    已标记或不存在的 ID 被忽略。
+    标记后的记录不再出现在论文列表中，文件由后台删除任务清理后再调用 purge_papers()。
+    """
+    if not paper_ids:
+        return []
+
+    marked = []
+    try:
+        conn = get_db_connection()
+        with conn:
+            # 先取得写锁，避免读取与标记之间有其他连接修改同一批记录
+            conn.execute("BEGIN IMMEDIATE")
+            for chunk in _chunked(paper_ids):
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT * FROM papers WHERE id IN ({placeholders}) AND deleted_at IS NULL",
+                    chunk,
+                ).fetchall()
+                conn.execute(
+                    f"UPDATE papers SET deleted_at = CURRENT_TIMESTAMP "
+                    f"WHERE id IN ({placeholders}) AND deleted_at IS NULL",
+                    chunk,
+                )
+                marked.extend(dict(row) for row in rows)
+        conn.close()
+        logger.info("已标记删除 %d 条论文记录。", len(marked))
+        return marked
+    except sqlite3.Error as e:
+        logger.error("标记删除论文失败: %s", e)
+        return []
+
+
+@_timed("get_tombstoned_papers")
+def get_tombstoned_papers():
+    """返回已标记删除但尚未清理的论文记录 (例如删除过程中服务被关闭)"""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT * FROM papers WHERE deleted_at IS NOT NULL ORDER BY id"
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        logger.error("查询待清理的论文记录失败: %s", e)
+        return []
+
+
+@_timed("purge_papers")
+def purge_papers(paper_ids):
+    """删除已标记删除的记录 (文件已清理)，返回删除的记录数"""
+    if not paper_ids:
+        return 0
+
+    pdf_urls = []
+    purged = 0
+    try:
+        conn = get_db_connection()
+        with conn:
+            for chunk in _chunked(paper_ids):
+                placeholders = ",".join("?" * len(chunk))
+                condition = f"id IN ({placeholders}) AND deleted_at IS NOT NULL"
+                pdf_urls.extend(
+                    row["pdf_url"]
+                    for row in conn.execute(f"SELECT pdf_url FROM papers WHERE {condition}", chunk)
+                )
+                purged += conn.execute(f"DELETE FROM papers WHERE {condition}", chunk).rowcount
+        conn.close()
+        known_urls.discard(pdf_urls)
+        return purged
+    except sqlite3.Error as e:
+        logger.error("清理已删除的论文记录失败: %s", e)
+        return 0
+
+
+@_timed("restore_papers")
+def restore_papers(paper_ids):
+    """撤销删除标记 (文件无法删除时)，记录重新出现在论文列表中；返回恢复的记录数"""
+    if not paper_ids:
+        return 0
+
+    restored = 0
+    try:
+        conn = get_db_connection()
+        with conn:
+            for chunk in _chunked(paper_ids):
+                placeholders = ",".join("?" * len(chunk))
+                restored += conn.execute(
+                    f"UPDATE papers SET deleted_at = NULL WHERE id IN ({placeholders})", chunk
+                ).rowcount
+        conn.close()
+        return restored
+    except sqlite3.Error as e:
+        logger.error("恢复论文记录失败: %s", e)
+        return 0
+
+
+@_timed("touch_paper")
+def touch_paper(filepath, min_interval=60):
+    """
+    记录论文文件被打开的时间 (LRU 清理依据)。
+    同一文件 min_interval 秒内的重复访问 (例如 Range 分段请求) 不再写数据库。
+    """
+    try:
+        conn = get_db_connection()
+        with conn:
+            conn.execute(
+                "UPDATE papers SET last_access = CURRENT_TIMESTAMP WHERE filepath IN (?, ?) "
+                "AND (last_access IS NULL OR last_access < datetime('now', ?))",
+                (*_filepath_variants(filepath), f"-{int(min_interval)} seconds"),
+            )
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("更新论文访问时间失败: %s", e)
+
+
+@_timed("storage_usage")
+def storage_usage():
+    """返回仍在磁盘上的论文文件总大小 (字节) 与缺少大小信息的记录数"""
+    try:
+        conn = get_db_connection()
+        row = conn.execute(
+            f"SELECT COALESCE(SUM(file_size), 0), COUNT(*) - COUNT(file_size) FROM papers "
+            f"WHERE {_RESIDENT} AND filepath IS NOT NULL"
+        ).fetchone()
+        conn.close()
+        return row[0], row[1]
+    except sqlite3.Error as e:
+        logger.error("统计论文文件大小失败: %s", e)
+        return 0, 0
+
+
+@_timed("get_papers_missing_size")
+def get_papers_missing_size(limit=1000):
+    """返回缺少文件大小的记录 [{id, filepath}] (旧版本下载的论文)"""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(
+            f"SELECT id, filepath FROM papers WHERE {_RESIDENT} AND filepath IS NOT NULL "
+            f"AND file_size IS NULL LIMIT ?",
+            (limit,),
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        logger.error("查询论文文件大小失败: %s", e)
+        return []
+
+
+@_timed("set_paper_file_sizes")
+def set_paper_file_sizes(sizes):
+    """批量写入文件大小: sizes 为 [(paper_id, file_size)]"""
+    try:
+        conn = get_db_connection()
+        with conn:
+            conn.executemany("UPDATE papers SET file_size = ? WHERE id = ?", [(size, pid) for pid, size in sizes])
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("更新论文文件大小失败: %s", e)
+
+
+# 清理策略 -> 排序方式 (先清理排在前面的)
+_EVICTION_ORDER = {
+    "lru": "COALESCE(last_access, download_date) ASC, id ASC",
+    "oldest": "download_date ASC, id ASC",
+}
+
+
+@_timed("get_eviction_candidates")
+def get_eviction_candidates(policy, limit, exclude_ids=()):
+    """按清理策略返回最先被清理的文件记录 [{id, title, pdf_url, filepath, file_size}]"""
+    order = _EVICTION_ORDER[policy]
+    exclude_ids = list(exclude_ids)
+    exclude = f"AND id NOT IN ({','.join('?' * len(exclude_ids))})" if exclude_ids else ""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(
+            f"SELECT id, title, pdf_url, filepath, file_size FROM papers "
+            f"WHERE {_RESIDENT} AND filepath IS NOT NULL {exclude} ORDER BY {order} LIMIT ?",
+            (*exclude_ids, limit),
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        logger.error("查询待清理的论文文件失败: %s", e)
+        return []
+
+
+@_timed("mark_papers_evicted")
+def mark_papers_evicted(paper_ids):
+    """标记论文文件已被清理 (记录保留)，返回更新的记录数"""
+    if not paper_ids:
+        return 0
+
+    updated = 0
+    try:
+        conn = get_db_connection()
+        with conn:
+            for chunk in _chunked(paper_ids):
+                placeholders = ",".join("?" * len(chunk))
+                updated += conn.execute(
+                    f"UPDATE papers SET evicted_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})", chunk
+                ).rowcount
+        conn.close()
+        return updated
+    except sqlite3.Error as e:
+        logger.error("标记论文文件已清理失败: %s", e)
+        return 0
+
+
+@_timed("get_resident_papers")
+def get_resident_papers():
+    """返回文件应当在磁盘上的全部记录 (未被标记删除，也未被配额清理)"""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(f"SELECT * FROM papers WHERE {_RESIDENT}").fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    except sqlite3.Error as e:
+        logger.error("从数据库获取论文列表失败: %s", e)
+        return []
+
+
+@_timed("update_paper_paths")
+def update_paper_paths(updates):
+    """批量更新文件路径: updates 为 [(paper_id, filepath, file_size)]，file_size 为 None 时保持原值"""
+    try:
+        conn = get_db_connection()
+        with conn:
+            conn.executemany(
+                "UPDATE papers SET filepath = ?, file_size = COALESCE(?, file_size) WHERE id = ?",
+                [(filepath, file_size, paper_id) for paper_id, filepath, file_size in updates],
+            )
+        conn.close()
+        return True
+    except sqlite3.Error as e:
+        logger.error("更新论文文件路径失败: %s", e)
+        return False
+
+
+def _scan_cache_condition(root):
+    """root 本身及其下全部目录的查询条件"""
+    prefix = os.path.join(root, "")
+    return "directory = ? OR substr(directory, 1, ?) = ?", (root, len(prefix), prefix)
+
+
+@_timed("load_scan_cache")
+def load_scan_cache(root):
+    """读取 root 下各目录上次扫描的结果: {目录: (mtime_ns, [子目录名], [[文件名, 大小]])}"""
+    condition, params = _scan_cache_condition(root)
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(f"SELECT * FROM scan_cache WHERE {condition}", params).fetchall()
+        conn.close()
+        return {row["directory"]: (row["mtime_ns"], json.loads(row["subdirs"]), json.loads(row["files"])) for row in rows}
+    except (sqlite3.Error, ValueError) as e:
+        logger.error("读取目录扫描缓存失败: %s", e)
+        return {}
+
+
+@_timed("save_scan_cache")
+def save_scan_cache(root, entries):
+    """用本次扫描的结果替换 root 下的目录缓存: entries 的格式与 load_scan_cache 的返回值相同"""
+    condition, params = _scan_cache_condition(root)
+    try:
+        conn = get_db_connection()
+        with conn:
+            conn.execute(f"DELETE FROM scan_cache WHERE {condition}", params)
+            conn.executemany(
+                "INSERT INTO scan_cache (directory, mtime_ns, subdirs, files) VALUES (?, ?, ?, ?)",
+                [
+                    (directory, mtime_ns, json.dumps(subdirs, ensure_ascii=False), json.dumps(files, ensure_ascii=False))
+                    for directory, (mtime_ns, subdirs, files) in entries.items()
+                ],
+            )
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("保存目录扫描缓存失败: %s", e)
+
+
+@_timed("get_query_cache")
+def get_query_cache(key):
+    """返回查询缓存 (created_at, payload)；没有缓存时返回 None。"""
+    try:
+        conn = get_db_connection()
+        row = conn.execute("SELECT created_at, payload FROM query_cache WHERE key = ?", (key,)).fetchone()
+        conn.close()
+        return (row["created_at"], row["payload"]) if row else None
+    except sqlite3.Error as e:
+        logger.error("读取查询缓存失败: %s", e)
+        return None
+
+
+@_timed("save_query_cache")
+def save_query_cache(key, created_at, payload, expire_before=None):
+    """写入一条查询缓存，并清除 created_at 早于 expire_before 的过期缓存。"""
+    try:
+        conn = get_db_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO query_cache (key, created_at, payload) VALUES (?, ?, ?)",
+                (key, created_at, payload),
+            )
+            if expire_before is not None:
+                conn.execute("DELETE FROM query_cache WHERE created_at < ?", (expire_before,))
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error("保存查询缓存失败: %s", e)
@@ -0,0 +1,215 @@
+# src/deletion.py
+
+"""
+后台批量删除论文。
+
+删除请求不再在 HTTP 请求内逐个删除文件，而是成为一个 DeletionJob：
+    1. 在一个事务中把记录标记为已删除 (papers.deleted_at)，记录立即从论文列表中消失；
+    2. 后台线程按批用线程池删除 PDF 文件，每批结束后推送 delete_progress 事件；
+    3. 文件已删除 (或本来就不存在) 的记录从数据库清除；无法删除的文件 (权限、占用等)
+       撤销删除标记，记录恢复，随 delete_finished 事件一起报告给客户端。
+服务在删除过程中被关闭时，残留的标记在下次启动时由 resume_pending() 继续清理。
+
+    deletion:
+      workers: 8         # 同时删除文件的线程数
+      batch_size: 200    # 每批删除的文件数；每批结束后更新数据库并推送进度
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from . import database, utils
+
+logger = logging.getLogger(__name__)
+
+STATUS_RUNNING = "running"
+STATUS_FINISHED = "finished"
+STATUS_FAILED = "failed"
+
+DEFAULT_SETTINGS = {
+    "workers": 8,
+    "batch_size": 200,
+}
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _remove_file(paper):
+    """删除论文的 PDF 文件，成功 (或文件本来就不存在) 时返回 None，否则返回错误信息。"""
+    filepath = paper.get("filepath")
+    if not filepath:
+        return None
+    try:
+        os.remove(utils.resolve_paper_path(filepath))
+        return None
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        return str(e)
+
+
+class DeletionJob:
+    """一次批量删除及其进度。"""
+
+    def __init__(self, job_id, papers, owner=None):
+        self.id = job_id
+        self.papers = papers
+        self.owner = owner
+        self.total = len(papers)
+        self.done = 0
+        self.deleted_urls = []  # 已删除论文的 pdf_url，客户端据此从列表中移除
+        self.failed = []  # [{id, title, filepath, error}]
+        self.restored = []  # 恢复的完整记录，供客户端重新加入列表
+        self.status = STATUS_RUNNING
+        self.error = None
+        self.created_at = _now()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status != STATUS_RUNNING
+
+    def progress(self):
+        return {"job_id": self.id, "done": self.done, "total": self.total, "failed": len(self.failed)}
+
+    def snapshot(self):
+        return {
+            **self.progress(),
+            "status": self.status,
+            "owner": self.owner,
+            "deleted": len(self.deleted_urls),
+            "failures": self.failed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class DeletionManager:
+    """
+    创建并运行删除任务。
+
+    进度事件发往任务的发起客户端 (owner 为其 sid；为 None 时广播)，
+    delete_finished 广播给所有客户端，其他标签页据此同步论文列表。
+    """
+
+    def __init__(self, socketio=None, settings=None, max_history=50):
+        self.socketio = socketio
+        self.max_history = max_history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.configure(settings)
+
+    def configure(self, settings):
+        """用 config.yaml 中的 deletion 段更新参数，对之后开始的任务生效。"""
+        settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.workers = max(1, settings["workers"])
+        self.batch_size = max(1, settings["batch_size"])
+
+    def _emit(self, event, data, room=None):
+        if self.socketio:
+            self.socketio.emit(event, data, room=room)
+
+    def submit(self, paper_ids, owner=None):
+        """
+        标记删除指定的论文并在后台清理文件，立即返回 DeletionJob；
+        没有可删除的记录 (不存在或已在删除中) 时返回 None。
+        """
+        papers = database.tombstone_papers(paper_ids)
+        if not papers:
+            return None
+        return self._start(papers, owner)
+
+    def resume_pending(self):
+        """继续清理上次运行遗留的删除标记，返回任务 (没有遗留时返回 None)。"""
+        papers = database.get_tombstoned_papers()
+        if not papers:
+            return None
+        logger.info("发现 %d 条未完成删除的论文记录，继续清理。", len(papers))
+        return self._start(papers, owner=None)
+
+    def _start(self, papers, owner):
+        job = DeletionJob(uuid.uuid4().hex[:12], papers, owner)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+        logger.info("已创建删除任务 %s: %d 篇论文，来源: %s", job.id, job.total, owner)
+        thread = threading.Thread(target=self._run, args=(job,), name=f"delete-job-{job.id}", daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job):
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="delete-file") as pool:
+                for start in range(0, job.total, self.batch_size):
+                    self._delete_batch(job, pool, job.papers[start : start + self.batch_size])
+                    self._emit("delete_progress", job.progress(), room=job.owner)
+                    # 让出执行权，避免长时间的删除任务占住 eventlet 事件循环
+                    time.sleep(0)
+            job.status = STATUS_FINISHED
+        except Exception as e:
+            job.status = STATUS_FAILED
+            job.error = str(e)
+            logger.error("删除任务 %s 失败: %s", job.id, e, exc_info=True)
+        finally:
+            job.finished_at = _now()
+            # 任务结束后不再需要完整记录
+            job.papers = []
+            logger.info(
+                "删除任务 %s 结束: 已删除 %d 篇，%d 个文件无法删除。",
+                job.id,
+                len(job.deleted_urls),
+                len(job.failed),
+            )
+            self._emit(
+                "delete_finished",
+                {
+                    **job.snapshot(),
+                    "deleted_urls": job.deleted_urls,
+                    "restored": job.restored,
+                },
+            )
+
+    def _delete_batch(self, job, pool, papers):
+        removed, failed = [], []
+        for paper, error in zip(papers, pool.map(_remove_file, papers)):
+            if error is None:
+                removed.append(paper)
+            else:
+                logger.warning("无法删除文件 %s: %s", paper.get("filepath"), error)
+                failed.append((paper, error))
+
+        # 文件已删除的记录从数据库清除；清除失败的记录保留删除标记，下次启动时重试
+        if removed:
+            database.purge_papers([paper["id"] for paper in removed])
+            job.deleted_urls.extend(paper["pdf_url"] for paper in removed)
+        # 文件仍在磁盘上的记录撤销删除标记，保持数据库与文件一致
+        if failed:
+            database.restore_papers([paper["id"] for paper, _ in failed])
+            for paper, error in failed:
+                job.failed.append(
+                    {"id": paper["id"], "title": paper.get("title"), "filepath": paper.get("filepath"), "error": error}
+                )
+                job.restored.append(paper)
+        job.done += len(papers)
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values()]
@@ -0,0 +1,267 @@
+# src/events.py
+
+"""
+带背压的 Socket.IO 事件分发。
+
+EventBus 提供与 SocketIO.emit 相同的 emit(event, data, room=None) 接口，可以直接替代
+socketio 传给 Crawler / JobManager。事件不会立即发出，而是先放入每个客户端自己的有界队列：
+
+    - 房间：room 为客户端 sid (request.sid) 或 join() 登记过的房间 (例如 "job:<id>")；
+      room 为 None 时发送给所有已连接的客户端。
+    - 流控：事件以 "events" 批量发送，客户端处理完一批并确认 (ack) 后才发送下一批，
+      因此一个卡住或处于后台的标签页最多只占用 max_pending 个事件，不会在服务端无限堆积。
+    - 丢弃策略：队列满时丢弃最旧的进度类事件 (DROPPABLE_EVENTS)；同一下载的新进度直接替换
+      尚未发出的旧进度。任务状态、下载完成等终态事件不会被丢弃：队列里全是终态事件时，
+      新的论文列表 (paper_list_update) 合并进尚未发出的那一个，其余终态事件可以超出 max_pending，
+      但达到 overflow_limit 时清空该客户端的队列并断开连接，页面重新连接后重新加载论文列表与任务状态。
+    - 序号：每个事件带有按客户端递增的序号 seq，客户端发现序号不连续时可以请求 resync 获取当前状态。
+
+    events:
+      max_pending: 200    # 每个客户端排队事件上限 (终态事件可以超出)
+      overflow_limit: 1000  # 终态事件也不能超出的上限，达到时断开该客户端
+      batch_size: 50      # 每批最多发送的事件数
+      ack_timeout: 30     # 超过该秒数仍未确认时视为确认丢失，继续发送
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# 进度类事件 -> 合并键字段 (None 表示不合并，只在队列满时被丢弃)
+DROPPABLE_EVENTS = {
+    "download_progress": "pdf_url",
+    "status_update": None,
+    "circuit_state": "host",
+    "delete_progress": "job_id",
+}
+
+# 论文列表事件 -> 列表字段；队列满时新列表合并进尚未发出的同名事件 (按 pdf_url 去重)
+COALESCABLE_LISTS = {
+    "paper_list_update": "papers",
+}
+
+DEFAULT_SETTINGS = {
+    "max_pending": 200,
+    "overflow_limit": 1000,
+    "batch_size": 50,
+    "ack_timeout": 30,
+}
+
+
+class ClientQueue:
+    """单个客户端的待发送事件及流控状态。调用方需持有 EventBus 的锁。"""
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.pending = deque()  # [seq, event, data]
+        self.seq = 0
+        self.dropped = 0
+        self.overflowed = False
+        self.in_flight = False
+        self.sent_at = 0.0
+        self.rooms = set()
+
+    def push(self, event, data, max_pending, overflow_limit=None):
+        """
+        加入一个事件，返回因队列已满被丢弃的事件名 (没有丢弃时返回 None)。
+        被丢弃事件的序号不会发给客户端，客户端据此发现序号缺口。
+        终态事件达到 overflow_limit 时清空队列并设置 overflowed，由 EventBus 断开该客户端。
+        """
+        coalesce_field = DROPPABLE_EVENTS.get(event)
+        if coalesce_field is not None and isinstance(data, dict):
+            key = data.get(coalesce_field)
+            for item in self.pending:
+                # 同一对象尚未发出的进度直接替换为最新值，保留原来的序号与位置
+                if item[1] == event and isinstance(item[2], dict) and item[2].get(coalesce_field) == key:
+                    item[2] = data
+                    return None
+
+        dropped = None
+        if len(self.pending) >= max_pending:
+            victim = next((item for item in self.pending if item[1] in DROPPABLE_EVENTS), None)
+            if victim is not None:
+                self.pending.remove(victim)
+                dropped = victim[1]
+            elif event in DROPPABLE_EVENTS:
+                self.dropped += 1
+                return event
+            elif self._coalesce_list(event, data):
+                return None
+            elif overflow_limit is not None and len(self.pending) >= overflow_limit:
+                self.pending.clear()
+                self.overflowed = True
+                return event
+            # 队列里全是终态事件时可以超出 max_pending，直到 overflow_limit
+        if dropped is not None:
+            self.dropped += 1
+
+        self.seq += 1
+        self.pending.append([self.seq, event, data])
+        return dropped
+
+    def _coalesce_list(self, event, data):
+        """把论文列表合并进尚未发出的同名事件，返回是否已合并。"""
+        list_field = COALESCABLE_LISTS.get(event)
+        if list_field is None or not isinstance(data, dict):
+            return False
+        for item in reversed(self.pending):
+            if item[1] == event and isinstance(item[2], dict):
+                merged = {paper.get("pdf_url"): paper for paper in item[2].get(list_field) or ()}
+                for paper in data.get(list_field) or ():
+                    merged[paper.get("pdf_url")] = paper
+                item[2] = {**item[2], **data, list_field: list(merged.values())}
+                return True
+        return False
+
+    def take_batch(self, batch_size):
+        batch = []
+        while self.pending and len(batch) < batch_size:
+            batch.append(self.pending.popleft())
+        return batch
+
+
+class EventBus:
+    """按客户端排队、批量发送并等待确认的 Socket.IO 事件分发器。"""
+
+    def __init__(self, socketio, settings=None):
+        self.socketio = socketio
+        self._clients = {}
+        self._rooms = {}
+        self._lock = threading.Lock()
+        self.configure(settings)
+
+    def configure(self, settings):
+        """用 config.yaml 中的 events 段更新参数，缺省项使用 DEFAULT_SETTINGS。"""
+        settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.max_pending = max(1, settings["max_pending"])
+        self.overflow_limit = max(self.max_pending, settings["overflow_limit"])
+        self.batch_size = max(1, settings["batch_size"])
+        self.ack_timeout = settings["ack_timeout"]
+
+    # --- 连接与房间 ---
+
+    def connect(self, sid):
+        with self._lock:
+            self._clients.setdefault(sid, ClientQueue(sid))
+
+    def disconnect(self, sid):
+        with self._lock:
+            self._remove_client(sid)
+
+    def _remove_client(self, sid):
+        """调用时需持有 self._lock。"""
+        client = self._clients.pop(sid, None)
+        if client is None:
+            return
+        for room in client.rooms:
+            members = self._rooms.get(room)
+            if members is not None:
+                members.discard(sid)
+                if not members:
+                    del self._rooms[room]
+
+    def join(self, sid, room):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                return
+            client.rooms.add(room)
+            self._rooms.setdefault(room, set()).add(sid)
+
+    def leave(self, sid, room):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is not None:
+                client.rooms.discard(room)
+            members = self._rooms.get(room)
+            if members is not None:
+                members.discard(sid)
+                if not members:
+                    del self._rooms[room]
+
+    def rooms_of(self, sid):
+        with self._lock:
+            client = self._clients.get(sid)
+            return set(client.rooms) if client else set()
+
+    def last_seq(self, sid):
+        with self._lock:
+            client = self._clients.get(sid)
+            return client.seq if client else 0
+
+    # --- 发送 ---
+
+    def _recipients(self, room):
+        if room is None:
+            return list(self._clients.values())
+        if room in self._clients:
+            return [self._clients[room]]
+        return [self._clients[sid] for sid in self._rooms.get(room, ()) if sid in self._clients]
+
+    def emit(self, event, data=None, room=None, to=None):
+        """把事件放入接收者的队列；接收者空闲时立即发送。"""
+        room = to if to is not None else room
+        ready = []
+        overflowed = []
+        with self._lock:
+            for client in self._recipients(room):
+                dropped = client.push(event, data, self.max_pending, self.overflow_limit)
+                if client.overflowed:
+                    # 队列已清空；不再向它排队事件，重新连接后页面重新加载全部状态
+                    metrics.SOCKET_CLIENTS_OVERFLOWED.inc()
+                    self._remove_client(client.sid)
+                    overflowed.append(client.sid)
+                    continue
+                if dropped is not None:
+                    metrics.SOCKET_EVENTS_DROPPED.inc(event=dropped)
+                batch = self._next_batch(client)
+                if batch:
+                    ready.append((client.sid, batch))
+        for sid, batch in ready:
+            self._send(sid, batch)
+        for sid in overflowed:
+            self._disconnect_overflowed(sid)
+
+    def _disconnect_overflowed(self, sid):
+        logger.warning("客户端 %s 积压的事件超过 %d 个，断开连接以便其重新加载。", sid, self.overflow_limit)
+        try:
+            self.socketio.server.disconnect(sid)
+        except Exception as e:
+            logger.warning("断开客户端 %s 失败: %s", sid, e)
+
+    def _next_batch(self, client):
+        """客户端没有未确认的批次 (或确认已超时) 时取出下一批。调用时需持有 self._lock。"""
+        if client.in_flight and time.monotonic() - client.sent_at < self.ack_timeout:
+            return None
+        batch = client.take_batch(self.batch_size)
+        if not batch:
+            client.in_flight = False
+            return None
+        client.in_flight = True
+        client.sent_at = time.monotonic()
+        return {"events": batch, "dropped": client.dropped}
+
+    def _send(self, sid, batch):
+        try:
+            self.socketio.emit("events", batch, to=sid, callback=lambda *args: self._on_ack(sid))
+        except Exception as e:
+            logger.warning("向客户端 %s 发送事件失败: %s", sid, e)
+            with self._lock:
+                client = self._clients.get(sid)
+                if client is not None:
+                    client.in_flight = False
+
+    def _on_ack(self, sid):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                return
+            client.in_flight = False
+            batch = self._next_batch(client)
+        if batch:
+            self._send(sid, batch)
@@ -1,211 +1,253 @@
 # src/fetchers.py
 
+import time
+import queue
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from . import utils
-import arxiv
+from itertools import chain, zip_longest
+from operator import itemgetter
+from . import metrics, query_cache, retry, tracing, utils
+from .models import Paper
+
+# arxiv 包 (及其依赖的 feedparser) 只在实际查询 arXiv 时才导入，
+# 只抓取 bioRxiv 或只读取分类列表时不必为它付出导入时间。
 
 logger = logging.getLogger(__name__)
 
+# 各数据源的接口地址。基准测试会将它们指向本地的模拟服务器。
+BIORXIV_API_URL = "https://api.biorxiv.org/details/biorxiv"
+BIORXIV_CONTENT_URL = "https://www.biorxiv.org/content"
+
+# bioRxiv 日期窗口的默认参数 (可在 fetch_settings 中覆盖)
+BIORXIV_WINDOW_DAYS = 7  # 每个窗口的天数，0 表示不切分
+BIORXIV_PARALLEL_WINDOWS = 4  # 同时抓取的窗口数
+BIORXIV_WINDOW_RETRIES = 2  # 单个窗口失败后的重试次数
+BIORXIV_WINDOW_RETRY_DELAY = 5
+BIORXIV_WINDOW_BUFFER = 1000  # 每个窗口预取的最大记录数
+
+# arXiv 客户端参数 (官方要求两次请求之间至少间隔 3 秒)
+ARXIV_PAGE_SIZE = 100
+ARXIV_DELAY_SECONDS = 3
+ARXIV_NUM_RETRIES = 5
+
+# arXiv 查询拆分的默认参数 (可在 fetch_settings 中覆盖)
+ARXIV_CHUNK_SIZE = 10  # 每个子查询中关键词 / 作者 / 分类各自的最大个数，0 表示不拆分
+ARXIV_CHUNK_MAX_CHARS = 600  # 每组条件的最大长度，避免请求 URL 过长
+ARXIV_PARALLEL_QUERIES = 2  # 同时执行的子查询数 (请求间隔仍由共享的限速器保证)
+
+
+# 常用 arXiv 分类 (按学科分组)。调用方只读，不要修改。
+ARXIV_CATEGORIES = [
+    {
+        "group": "Physics",
+        "categories": [
+            {"code": "astro-ph", "name": "Astrophysics"},
+            {"code": "cond-mat", "name": "Condensed Matter"},
+            {"code": "gr-qc", "name": "General Relativity and Quantum Cosmology"},
+            {"code": "hep-ex", "name": "High Energy Physics - Experiment"},
+            {"code": "hep-lat", "name": "High Energy Physics - Lattice"},
+            {"code": "hep-ph", "name": "High Energy Physics - Phenomenology"},
+            {"code": "hep-th", "name": "High Energy Physics - Theory"},
+            {"code": "nucl-ex", "name": "Nuclear Experiment"},
+            {"code": "nucl-th", "name": "Nuclear Theory"},
+            {"code": "physics", "name": "Physics (Other)"},
+            {"code": "quant-ph", "name": "Quantum Physics"},
+        ],
+    },
+    {
+        "group": "Mathematics",
+        "categories": [
+            {"code": "math.AG", "name": "Algebraic Geometry"},
+            {"code": "math.AP", "name": "Analysis of PDEs"},
+            {"code": "math.CA", "name": "Classical Analysis and ODEs"},
+            {"code": "math.CO", "name": "Combinatorics"},
+            {"code": "math.CT", "name": "Category Theory"},
+            {"code": "math.CV", "name": "Complex Variables"},
+            {"code": "math.DG", "name": "Differential Geometry"},
+            {"code": "math.DS", "name": "Dynamical Systems"},
+            {"code": "math.FA", "name": "Functional Analysis"},
+            {"code": "math.GM", "name": "General Mathematics"},
+            {"code": "math.GN", "name": "General Topology"},
+            {"code": "math.GR", "name": "Group Theory"},
+            {"code": "math.GT", "name": "Geometric Topology"},
+            {"code": "math.HO", "name": "History and Overview"},
+            {"code": "math.IT", "name": "Information Theory"},
+            {"code": "math.KT", "name": "K-Theory and Homology"},
+            {"code": "math.LO", "name": "Logic"},
+            {"code": "math.MG", "name": "Metric Geometry"},
+            {"code": "math.MP", "name": "Mathematical Physics"},
+            {"code": "math.NA", "name": "Numerical Analysis"},
+            {"code": "math.NT", "name": "Number Theory"},
+            {"code": "math.OA", "name": "Operator Algebras"},
+            {"code": "math.OC", "name": "Optimization and Control"},
+            {"code": "math.PR", "name": "Probability"},
+            {"code": "math.QA", "name": "Quantum Algebra"},
+            {"code": "math.RA", "name": "Rings and Algebras"},
+            {"code": "math.RT", "name": "Representation Theory"},
+            {"code": "math.SG", "name": "Symplectic Geometry"},
+            {"code": "math.SP", "name": "Spectral Theory"},
+            {"code": "math.ST", "name": "Statistics Theory"},
+        ],
+    },
+    {
+        "group": "Computer Science",
+        "categories": [
+            {"code": "cs.AI", "name": "Artificial Intelligence"},
+            {"code": "cs.AR", "name": "Hardware Architecture"},
+            {"code": "cs.CC", "name": "Computational Complexity"},
+            {
+                "code": "cs.CE",
+                "name": "Computational Engineering, Finance, and Science",
+            },
+            {"code": "cs.CG", "name": "Computational Geometry"},
+            {"code": "cs.CL", "name": "Computation and Language"},
+            {"code": "cs.CR", "name": "Cryptography and Security"},
+            {"code": "cs.CV", "name": "Computer Vision and Pattern Recognition"},
+            {"code": "cs.CY", "name": "Computers and Society"},
+            {"code": "cs.DB", "name": "Databases"},
+            {
+                "code": "cs.DC",
+                "name": "Distributed, Parallel, and Cluster Computing",
+            },
+            {"code": "cs.DL", "name": "Digital Libraries"},
+            {"code": "cs.DM", "name": "Discrete Mathematics"},
+            {"code": "cs.DS", "name": "Data Structures and Algorithms"},
+            {"code": "cs.ET", "name": "Emerging Technologies"},
+            {"code": "cs.FL", "name": "Formal Languages and Automata Theory"},
+            {"code": "cs.GA", "name": "General Algorithms"},
+            {"code": "cs.GR", "name": "Graphics"},
+            {"code": "cs.GT", "name": "Computer Science and Game Theory"},
+            {"code": "cs.HC", "name": "Human-Computer Interaction"},
+            {"code": "cs.IR", "name": "Information Retrieval"},
+            {"code": "cs.IT", "name": "Information Theory"},
+            {"code": "cs.LG", "name": "Machine Learning"},
+            {"code": "cs.LO", "name": "Logic in Computer Science"},
+            {"code": "cs.MA", "name": "Multiagent Systems"},
+            {"code": "cs.MM", "name": "Multimedia"},
+            {"code": "cs.MS", "name": "Mathematical Software"},
+            {"code": "cs.NA", "name": "Numerical Analysis"},
+            {"code": "cs.NE", "name": "Neural and Evolutionary Computing"},
+            {"code": "cs.NI", "name": "Networking and Internet Architecture"},
+            {"code": "cs.OS", "name": "Operating Systems"},
+            {"code": "cs.PF", "name": "Performance"},
+            {"code": "cs.PL", "name": "Programming Languages"},
+            {"code": "cs.RO", "name": "Robotics"},
+            {"code": "cs.SC", "name": "Symbolic Computation"},
+            {"code": "cs.SD", "name": "Sound"},
+            {"code": "cs.SE", "name": "Software Engineering"},
+            {"code": "cs.SI", "name": "Social and Information Networks"},
+            {"code": "cs.SY", "name": "Systems and Control"},
+        ],
+    },
+    {
+        "group": "Quantitative Biology",
+        "categories": [
+            {"code": "q-bio.BM", "name": "Biomolecules"},
+            {"code": "q-bio.CB", "name": "Cell Behavior"},
+            {"code": "q-bio.GN", "name": "Genomics"},
+            {"code": "q-bio.MN", "name": "Molecular Networks"},
+            {"code": "q-bio.NC", "name": "Neurons and Cognition"},
+            {"code": "q-bio.PE", "name": "Populations and Evolution"},
+            {"code": "q-bio.QM", "name": "Quantitative Methods"},
+            {"code": "q-bio.SC", "name": "Subcellular Processes"},
+            {"code": "q-bio.TO", "name": "Tissues and Organs"},
+        ],
+    },
+    {
+        "group": "Quantitative Finance",
+        "categories": [
+            {"code": "q-fin.CP", "name": "Computational Finance"},
+            {"code": "q-fin.EC", "name": "Economics"},
+            {"code": "q-fin.GN", "name": "General Finance"},
+            {"code": "q-fin.MF", "name": "Mathematical Finance"},
+            {"code": "q-fin.PM", "name": "Portfolio Management"},
+            {"code": "q-fin.PR", "name": "Pricing of Securities"},
+            {"code": "q-fin.RM", "name": "Risk Management"},
+            {"code": "q-fin.ST", "name": "Statistical Finance"},
+            {"code": "q-fin.TR", "name": "Trading and Market Microstructure"},
+        ],
+    },
+    {
+        "group": "Statistics",
+        "categories": [
+            {"code": "stat.AP", "name": "Applications"},
+            {"code": "stat.CO", "name": "Computation"},
+            {"code": "stat.ML", "name": "Machine Learning"},
+            {"code": "stat.ME", "name": "Methodology"},
+            {"code": "stat.OT", "name": "Other Statistics"},
+            {"code": "stat.TH", "name": "Theory"},
+        ],
+    },
+    {
+        "group": "Electrical Engineering and Systems Science",
+        "categories": [
+            {"code": "eess.AS", "name": "Audio and Speech Processing"},
+            {"code": "eess.IV", "name": "Image and Video Processing"},
+            {"code": "eess.SP", "name": "Signal Processing"},
+            {"code": "eess.SY", "name": "Systems and Control"},
+        ],
+    },
+    {
+        "group": "Economics",
+        "categories": [
+            {"code": "econ.EM", "name": "Econometrics"},
+            {"code": "econ.GN", "name": "General Economics"},
+            {"code": "econ.TH", "name": "Theoretical Economics"},
+        ],
+    },
+]
+
+
+# bioRxiv 的全部学科分类。调用方只读，不要修改。
+BIORXIV_CATEGORIES = [
+    "Animal Behavior and Cognition",
+    "Biochemistry",
+    "Bioengineering",
+    "Bioinformatics",
+    "Biophysics",
+    "Cancer Biology",
+    "Cell Biology",
+    "Developmental Biology",
+    "Ecology",
+    "Evolutionary Biology",
+    "Genetics",
+    "Genomics",
+    "Immunology",
+    "Microbiology",
+    "Molecular Biology",
+    "Neuroscience",
+    "Paleontology",
+    "Pathology",
+    "Pharmacology and Toxicology",
+    "Physiology",
+    "Plant Biology",
+    "Scientific Communication and Education",
+    "Synthetic Biology",
+    "Systems Biology",
+    "Zoology",
+]
+
+# 分组名 -> 该组全部分类代码，供按分类抓取时展开分组，避免每次都遍历整个分类表
+ARXIV_GROUP_CODES = {
+    group["group"]: [category["code"] for category in group["categories"]]
+    for group in ARXIV_CATEGORIES
+}
+
 
 def get_arxiv_categories():
     """
     Returns a hardcoded list of common arXiv categories.
     """
-    logger.info("Returning hardcoded arXiv categories...")
-    return [
-        {
-            "group": "Physics",
-            "categories": [
-                {"code": "astro-ph", "name": "Astrophysics"},
-                {"code": "cond-mat", "name": "Condensed Matter"},
-                {"code": "gr-qc", "name": "General Relativity and Quantum Cosmology"},
-                {"code": "hep-ex", "name": "High Energy Physics - Experiment"},
-                {"code": "hep-lat", "name": "High Energy Physics - Lattice"},
-                {"code": "hep-ph", "name": "High Energy Physics - Phenomenology"},
-                {"code": "hep-th", "name": "High Energy Physics - Theory"},
-                {"code": "nucl-ex", "name": "Nuclear Experiment"},
-                {"code": "nucl-th", "name": "Nuclear Theory"},
-                {"code": "physics", "name": "Physics (Other)"},
-                {"code": "quant-ph", "name": "Quantum Physics"},
-            ],
-        },
-        {
-            "group": "Mathematics",
-            "categories": [
-                {"code": "math.AG", "name": "Algebraic Geometry"},
-                {"code": "math.AP", "name": "Analysis of PDEs"},
-                {"code": "math.CA", "name": "Classical Analysis and ODEs"},
-                {"code": "math.CO", "name": "Combinatorics"},
-                {"code": "math.CT", "name": "Category Theory"},
-                {"code": "math.CV", "name": "Complex Variables"},
-                {"code": "math.DG", "name": "Differential Geometry"},
-                {"code": "math.DS", "name": "Dynamical Systems"},
-                {"code": "math.FA", "name": "Functional Analysis"},
-                {"code": "math.GM", "name": "General Mathematics"},
-                {"code": "math.GN", "name": "General Topology"},
-                {"code": "math.GR", "name": "Group Theory"},
-                {"code": "math.GT", "name": "Geometric Topology"},
-                {"code": "math.HO", "name": "History and Overview"},
-                {"code": "math.IT", "name": "Information Theory"},
-                {"code": "math.KT", "name": "K-Theory and Homology"},
-                {"code": "math.LO", "name": "Logic"},
-                {"code": "math.MG", "name": "Metric Geometry"},
-                {"code": "math.MP", "name": "Mathematical Physics"},
-                {"code": "math.NA", "name": "Numerical Analysis"},
-                {"code": "math.NT", "name": "Number Theory"},
-                {"code": "math.OA", "name": "Operator Algebras"},
-                {"code": "math.OC", "name": "Optimization and Control"},
-                {"code": "math.PR", "name": "Probability"},
-                {"code": "math.QA", "name": "Quantum Algebra"},
-                {"code": "math.RA", "name": "Rings and Algebras"},
-                {"code": "math.RT", "name": "Representation Theory"},
-                {"code": "math.SG", "name": "Symplectic Geometry"},
-                {"code": "math.SP", "name": "Spectral Theory"},
-                {"code": "math.ST", "name": "Statistics Theory"},
-            ],
-        },
-        {
-            "group": "Computer Science",
-            "categories": [
-                {"code": "cs.AI", "name": "Artificial Intelligence"},
-                {"code": "cs.AR", "name": "Hardware Architecture"},
-                {"code": "cs.CC", "name": "Computational Complexity"},
-                {
-                    "code": "cs.CE",
-                    "name": "Computational Engineering, Finance, and Science",
-                },
-                {"code": "cs.CG", "name": "Computational Geometry"},
-                {"code": "cs.CL", "name": "Computation and Language"},
-                {"code": "cs.CR", "name": "Cryptography and Security"},
-                {"code": "cs.CV", "name": "Computer Vision and Pattern Recognition"},
-                {"code": "cs.CY", "name": "Computers and Society"},
-                {"code": "cs.DB", "name": "Databases"},
-                {
-                    "code": "cs.DC",
-                    "name": "Distributed, Parallel, and Cluster Computing",
-                },
-                {"code": "cs.DL", "name": "Digital Libraries"},
-                {"code": "cs.DM", "name": "Discrete Mathematics"},
-                {"code": "cs.DS", "name": "Data Structures and Algorithms"},
-                {"code": "cs.ET", "name": "Emerging Technologies"},
-                {"code": "cs.FL", "name": "Formal Languages and Automata Theory"},
-                {"code": "cs.GA", "name": "General Algorithms"},
-                {"code": "cs.GR", "name": "Graphics"},
-                {"code": "cs.GT", "name": "Computer Science and Game Theory"},
-                {"code": "cs.HC", "name": "Human-Computer Interaction"},
-                {"code": "cs.IR", "name": "Information Retrieval"},
-                {"code": "cs.IT", "name": "Information Theory"},
-                {"code": "cs.LG", "name": "Machine Learning"},
-                {"code": "cs.LO", "name": "Logic in Computer Science"},
-                {"code": "cs.MA", "name": "Multiagent Systems"},
-                {"code": "cs.MM", "name": "Multimedia"},
-                {"code": "cs.MS", "name": "Mathematical Software"},
-                {"code": "cs.NA", "name": "Numerical Analysis"},
-                {"code": "cs.NE", "name": "Neural and Evolutionary Computing"},
-                {"code": "cs.NI", "name": "Networking and Internet Architecture"},
-                {"code": "cs.OS", "name": "Operating Systems"},
-                {"code": "cs.PF", "name": "Performance"},
-                {"code": "cs.PL", "name": "Programming Languages"},
-                {"code": "cs.RO", "name": "Robotics"},
-                {"code": "cs.SC", "name": "Symbolic Computation"},
-                {"code": "cs.SD", "name": "Sound"},
-                {"code": "cs.SE", "name": "Software Engineering"},
-                {"code": "cs.SI", "name": "Social and Information Networks"},
-                {"code": "cs.SY", "name": "Systems and Control"},
-            ],
-        },
-        {
-            "group": "Quantitative Biology",
-            "categories": [
-                {"code": "q-bio.BM", "name": "Biomolecules"},
-                {"code": "q-bio.CB", "name": "Cell Behavior"},
-                {"code": "q-bio.GN", "name": "Genomics"},
-                {"code": "q-bio.MN", "name": "Molecular Networks"},
-                {"code": "q-bio.NC", "name": "Neurons and Cognition"},
-                {"code": "q-bio.PE", "name": "Populations and Evolution"},
-                {"code": "q-bio.QM", "name": "Quantitative Methods"},
-                {"code": "q-bio.SC", "name": "Subcellular Processes"},
-                {"code": "q-bio.TO", "name": "Tissues and Organs"},
-            ],
-        },
-        {
-            "group": "Quantitative Finance",
-            "categories": [
-                {"code": "q-fin.CP", "name": "Computational Finance"},
-                {"code": "q-fin.EC", "name": "Economics"},
-                {"code": "q-fin.GN", "name": "General Finance"},
-                {"code": "q-fin.MF", "name": "Mathematical Finance"},
-                {"code": "q-fin.PM", "name": "Portfolio Management"},
-                {"code": "q-fin.PR", "name": "Pricing of Securities"},
-                {"code": "q-fin.RM", "name": "Risk Management"},
-                {"code": "q-fin.ST", "name": "Statistical Finance"},
-                {"code": "q-fin.TR", "name": "Trading and Market Microstructure"},
-            ],
-        },
-        {
-            "group": "Statistics",
-            "categories": [
-                {"code": "stat.AP", "name": "Applications"},
-                {"code": "stat.CO", "name": "Computation"},
-                {"code": "stat.ML", "name": "Machine Learning"},
-                {"code": "stat.ME", "name": "Methodology"},
-                {"code": "stat.OT", "name": "Other Statistics"},
-                {"code": "stat.TH", "name": "Theory"},
-            ],
-        },
-        {
-            "group": "Electrical Engineering and Systems Science",
-            "categories": [
-                {"code": "eess.AS", "name": "Audio and Speech Processing"},
-                {"code": "eess.IV", "name": "Image and Video Processing"},
-                {"code": "eess.SP", "name": "Signal Processing"},
-                {"code": "eess.SY", "name": "Systems and Control"},
-            ],
-        },
-        {
-            "group": "Economics",
-            "categories": [
-                {"code": "econ.EM", "name": "Econometrics"},
-                {"code": "econ.GN", "name": "General Economics"},
-                {"code": "econ.TH", "name": "Theoretical Economics"},
-            ],
-        },
-    ]
+    return ARXIV_CATEGORIES
 
 
 def get_biorxiv_categories():
     """
     Returns a hardcoded list of bioRxiv categories.
     """
-    logger.info("Fetching bioRxiv categories...")
-    return [
-        "Animal Behavior and Cognition",
-        "Biochemistry",
-        "Bioengineering",
-        "Bioinformatics",
-        "Biophysics",
-        "Cancer Biology",
-        "Cell Biology",
-        "Developmental Biology",
-        "Ecology",
-        "Evolutionary Biology",
-        "Genetics",
-        "Genomics",
-        "Immunology",
-        "Microbiology",
-        "Molecular Biology",
-        "Neuroscience",
-        "Paleontology",
-        "Pathology",
-        "Pharmacology and Toxicology",
-        "Physiology",
-        "Plant Biology",
-        "Scientific Communication and Education",
-        "Synthetic Biology",
-        "Systems Biology",
-        "Zoology",
-    ]
+    return BIORXIV_CATEGORIES
 
 
 # --- arXiv Fetchers ---
@@ -213,27 +255,70 @@ def get_biorxiv_categories():
 
 def _arxiv_result_to_paper_data(result):
     """
-    Converts an arxiv.Result object to the standard paper data dictionary.
+    Converts an arxiv.Result object to a Paper record.
     """
     pdf_url = result.pdf_url  # Directly use the pdf_url attribute
 
     if not pdf_url:
-        logger.warning(f"无法从 arXiv 结果中找到 PDF URL: {result.entry_id}")
+        logger.warning("无法从 arXiv 结果中找到 PDF URL: %s", result.entry_id)
         return None
 
-    return {
-        "title": result.title.strip(),
-        "authors": ", ".join([author.name for author in result.authors]),
-        "source": "arXiv",
-        "category": ", ".join(result.categories),
-        "paper_url": result.entry_id,
-        "pdf_url": pdf_url,
-        "published_date": result.published.date().isoformat(),
-        "abstract": result.summary.strip().replace("\n", " "),
-    }
+    return Paper.create(
+        title=result.title.strip(),
+        authors=", ".join([author.name for author in result.authors]),
+        source="arXiv",
+        category=", ".join(result.categories),
+        paper_url=result.entry_id,
+        pdf_url=pdf_url,
+        published_date=result.published.date().isoformat(),
+        abstract=result.summary.strip().replace("\n", " "),
+    )
+
+
+class _RateLimiter:
+    """相邻两次请求的开始时间至少间隔 interval 秒；多个线程按到达顺序预约时间片。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self, interval):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# 进程内所有 arXiv 请求共享同一个限速器，并发的子查询合计仍遵守 arXiv 的请求间隔要求
+_arxiv_rate_limiter = _RateLimiter()
+_arxiv_client_class = None
+
+
+def _make_arxiv_client():
+    import arxiv
+
+    global _arxiv_client_class
+    if _arxiv_client_class is None:
+
+        class RateLimitedClient(arxiv.Client):
+            """每次请求 (含重试) 前由共享限速器控制间隔，取代每个客户端各自的 delay_seconds。"""
+
+            def _parse_feed(self, url, first_page=True, _try_index=0):
+                _arxiv_rate_limiter.wait(ARXIV_DELAY_SECONDS)
+                return super()._parse_feed(url, first_page=first_page, _try_index=_try_index)
+
+        _arxiv_client_class = RateLimitedClient
+
+    return _arxiv_client_class(
+        page_size=ARXIV_PAGE_SIZE,
+        delay_seconds=0,
+        num_retries=ARXIV_NUM_RETRIES,
+    )
 
 
-def _build_arxiv_query(fetch_settings, keywords, categories=[]):
+def _build_arxiv_query(fetch_settings, keywords, categories=[], authors=None):
     """Helper to build the arXiv query string."""
     query_parts = []
 
@@ -245,7 +330,8 @@ def _build_arxiv_query(fetch_settings, keywords, categories=[]):
         query_parts.append(f"({keyword_query})")
 
     # Authors
-    authors = fetch_settings.get("search_by_authors", [])
+    if authors is None:
+        authors = fetch_settings.get("search_by_authors", [])
     if authors:
         author_query = " OR ".join([f'au:"{author}"' for author in authors])
         query_parts.append(f"({author_query})")
@@ -267,20 +353,48 @@ def _build_arxiv_query(fetch_settings, keywords, categories=[]):
     return " AND ".join(query_parts)
 
 
-def fetch_from_arxiv_by_keyword(config):
-    logger.info("开始从 arXiv 按关键词获取论文列表...")
-    fetch_settings = config["fetch_settings"]
-    keywords = config.get("keywords", [])
-    id_list = fetch_settings.get("search_by_ids", [])
+def _chunk_terms(terms, chunk_size, max_chars=ARXIV_CHUNK_MAX_CHARS):
+    """
+    把一组条件按个数 (chunk_size) 与总长度 (max_chars) 切分；chunk_size 不大于 0 时不切分。
+    条件为空时返回 [[]]，表示该维度不参与查询。
+    """
+    terms = list(terms)
+    if not terms:
+        return [[]]
+    if chunk_size <= 0:
+        return [terms]
+
+    chunks, current, length = [], [], 0
+    for term in terms:
+        if current and (len(current) >= chunk_size or length + len(term) > max_chars):
+            chunks.append(current)
+            current, length = [], 0
+        current.append(term)
+        length += len(term) + 10  # 字段前缀、引号与 " OR "
+    chunks.append(current)
+    return chunks
+
+
+def _plan_arxiv_queries(fetch_settings, keywords, categories=()):
+    """
+    把关键词、作者与分类分别切分为有限大小的组，返回 [(子查询, 子查询中的分类数)]。
+    子查询为各组的笛卡尔积，全部子查询结果的并集与不拆分时的查询条件相同。
+    """
+    chunk_size = int(fetch_settings.get("arxiv_chunk_size", ARXIV_CHUNK_SIZE) or 0)
+    authors = fetch_settings.get("search_by_authors", [])
 
-    search_query = _build_arxiv_query(fetch_settings, keywords)
+    plan = []
+    for keyword_chunk in _chunk_terms(keywords, chunk_size):
+        for author_chunk in _chunk_terms(authors, chunk_size):
+            for category_chunk in _chunk_terms(categories, chunk_size):
+                query = _build_arxiv_query(fetch_settings, keyword_chunk, category_chunk, authors=author_chunk)
+                if query:
+                    plan.append((query, len(category_chunk)))
+    return plan
 
-    if id_list:
-        logger.info(f"正在通过 ID 列表精确查找: {id_list}")
-        search_query = "" # id_list overrides query
-    elif not search_query:
-        logger.warning("未提供关键词、作者或日期范围，arXiv 查询为空，将不会返回任何结果。")
-        return
+
+def _arxiv_sort_options(fetch_settings):
+    import arxiv
 
     sort_by_str = fetch_settings.get("arxiv_sort_by", "SubmittedDate")
     sort_order_str = fetch_settings.get("arxiv_sort_order", "Descending")
@@ -292,77 +406,182 @@ def fetch_from_arxiv_by_keyword(config):
     }
     sort_by = sort_criterion_map.get(sort_by_str, arxiv.SortCriterion.SubmittedDate)
     sort_order = arxiv.SortOrder.Ascending if sort_order_str == "Ascending" else arxiv.SortOrder.Descending
+    return sort_by, sort_order
+
 
-    client = arxiv.Client(page_size=100, delay_seconds=3, num_retries=5)
+def _arxiv_id(result):
+    """返回不含版本号的 arXiv ID，同一论文的不同版本视为同一篇。"""
+    return result.get_short_id().rsplit("v", 1)[0]
+
+
+def _arxiv_record(result):
+    """把 arxiv.Result 转换为可缓存的记录: 论文 (Paper.to_dict()) 及合并结果时用到的 ID 与日期。"""
+    paper_data = _arxiv_result_to_paper_data(result)
+    if not paper_data:
+        return None
+    return {
+        "id": _arxiv_id(result),
+        "published": result.published.isoformat(),
+        "updated": result.updated.isoformat(),
+        "paper": paper_data.to_dict(),
+    }
+
+
+def _merge_arxiv_results(chunk_results, fetch_settings, limit=None):
+    """
+    合并各子查询的记录并按 arXiv ID 去重。
+    按日期排序时合并后重新排序；按相关性排序时各子查询的结果按名次交替合并。
+    limit 不为 None 时只保留前 limit 篇。
+    """
+    sort_by = fetch_settings.get("arxiv_sort_by", "SubmittedDate")
+    if sort_by == "Relevance":
+        merged = (record for rank in zip_longest(*chunk_results) for record in rank if record is not None)
+    else:
+        # 日期均为 UTC 的 ISO 格式，按字符串排序即按时间排序
+        date_field = "updated" if sort_by == "LastUpdatedDate" else "published"
+        merged = sorted(
+            chain.from_iterable(chunk_results),
+            key=itemgetter(date_field),
+            reverse=fetch_settings.get("arxiv_sort_order", "Descending") != "Ascending",
+        )
+
+    seen, records = set(), []
+    for record in merged:
+        if record["id"] in seen:
+            continue
+        seen.add(record["id"])
+        records.append(record)
+        if limit and len(records) >= limit:
+            break
+    return records
+
+
+def _query_arxiv(fetch_settings, query, max_results, id_list=()):
+    """执行一个 arXiv 查询并返回记录列表；出错时抛出异常。"""
+    import arxiv
+
+    sort_by, sort_order = _arxiv_sort_options(fetch_settings)
+    client = _make_arxiv_client()
     search = arxiv.Search(
-        query=search_query,
-        id_list=id_list,
-        max_results=fetch_settings.get("arxiv_max_results_kw", 100),
+        query=query,
+        id_list=list(id_list),
+        max_results=max_results,
         sort_by=sort_by,
         sort_order=sort_order,
     )
+    with metrics.FETCH_SECONDS.time(source="arxiv"), tracing.span("arxiv.query"):
+        records = [_arxiv_record(result) for result in client.results(search)]
+    return [record for record in records if record]
 
+
+def _search_arxiv(fetch_settings, query, max_results, id_list=(), cache_settings=None):
+    """
+    执行一个 arXiv 查询，优先使用查询缓存 (见 src/query_cache.py)，返回记录列表；
+    出错时记录日志并返回空列表。
+    """
+    params = {
+        "query": " ".join(query.split()),
+        "id_list": [str(arxiv_id).strip() for arxiv_id in id_list],
+        "sort_by": fetch_settings.get("arxiv_sort_by", "SubmittedDate"),
+        "sort_order": fetch_settings.get("arxiv_sort_order", "Descending"),
+        "max_results": max_results,
+    }
     try:
-        results = list(client.results(search))
-        logger.info(f"arXiv 关键词查询找到 {len(results)} 篇论文。")
-        for result in results:
-            yield _arxiv_result_to_paper_data(result)
+        return query_cache.get_or_fetch(
+            "arxiv",
+            params,
+            lambda: _query_arxiv(fetch_settings, query, max_results, id_list),
+            cache_settings,
+        )
     except Exception as e:
-        logger.error(f"执行 arXiv 查询时出错: {e}", exc_info=True)
+        logger.error("执行 arXiv 查询时出错 (%s): %s", query or id_list, e, exc_info=True)
+        return []
+
+
+def _run_arxiv_queries(fetch_settings, queries, cache_settings=None):
+    """并发执行 [(子查询, 结果上限)]，按提交顺序返回各子查询的记录列表。"""
+    parallel = int(fetch_settings.get("arxiv_parallel_queries", ARXIV_PARALLEL_QUERIES) or 1)
+    parallel = max(1, min(parallel, len(queries)))
+    if len(queries) > 1:
+        logger.info("arXiv 查询拆分为 %d 个子查询，并发数 %d。", len(queries), parallel)
+    if parallel == 1:
+        return [
+            _search_arxiv(fetch_settings, query, max_results, cache_settings=cache_settings)
+            for query, max_results in queries
+        ]
+    # Tracer 按线程保存，子查询线程需要显式激活调用方的 Tracer，查询耗时才会计入阶段统计
+    tracer = tracing.current_tracer()
+
+    def run(query, max_results):
+        with tracing.activate(tracer):
+            return _search_arxiv(fetch_settings, query, max_results, cache_settings=cache_settings)
+
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="arxiv-query") as pool:
+        futures = [pool.submit(run, query, max_results) for query, max_results in queries]
+        return [future.result() for future in futures]
+
+
+def fetch_from_arxiv_by_keyword(config):
+    logger.info("开始从 arXiv 按关键词获取论文列表...")
+    fetch_settings = config["fetch_settings"]
+    keywords = config.get("keywords", [])
+    id_list = fetch_settings.get("search_by_ids", [])
+    max_results = fetch_settings.get("arxiv_max_results_kw", 100)
+    cache_settings = config.get("query_cache")
+
+    if id_list:
+        logger.info("正在通过 ID 列表精确查找: %s", id_list)
+        # id_list overrides query
+        records = _search_arxiv(fetch_settings, "", max_results, id_list=id_list, cache_settings=cache_settings)
+    else:
+        plan = _plan_arxiv_queries(fetch_settings, keywords)
+        if not plan:
+            logger.warning("未提供关键词、作者或日期范围，arXiv 查询为空，将不会返回任何结果。")
+            return
+        # 每个子查询有各自的结果上限时返回全部子查询结果的并集；
+        # 否则每个子查询取前 max_results 篇，合并后再取总体的前 max_results 篇
+        per_chunk = int(fetch_settings.get("arxiv_max_results_per_chunk", 0) or 0)
+        chunk_results = _run_arxiv_queries(
+            fetch_settings, [(query, per_chunk or max_results) for query, _ in plan], cache_settings
+        )
+        records = _merge_arxiv_results(chunk_results, fetch_settings, None if per_chunk else max_results)
+
+    logger.info("arXiv 关键词查询找到 %s 篇论文。", len(records))
+    for record in records:
+        yield Paper.from_dict(record["paper"])
 
 
 def fetch_from_arxiv_by_category(config, selected_categories_list):
     logger.info("开始从 arXiv 按分类获取论文列表...")
     fetch_settings = config["fetch_settings"]
 
-    all_arxiv_categories = get_arxiv_categories()
-    expanded_categories = []
+    # 选中的分组展开为组内全部分类；去重时保留顺序，使同样的选择总是生成同样的查询
+    expanded_categories = {}
     for selected_cat_code in selected_categories_list:
-        is_group = any(selected_cat_code == group_data["group"] for group_data in all_arxiv_categories)
-        if is_group:
-            for group_data in all_arxiv_categories:
-                if selected_cat_code == group_data["group"]:
-                    expanded_categories.extend(sub_cat["code"] for sub_cat in group_data["categories"])
-                    break
-        else:
-            expanded_categories.append(selected_cat_code)
-
-    search_query = _build_arxiv_query(fetch_settings, [], categories=list(set(expanded_categories)))
+        for code in ARXIV_GROUP_CODES.get(selected_cat_code, (selected_cat_code,)):
+            expanded_categories[code] = None
 
-    if not search_query:
+    plan = _plan_arxiv_queries(fetch_settings, [], categories=list(expanded_categories))
+    if not plan:
         logger.warning("未提供分类、作者或日期范围，arXiv 查询为空，将不会返回任何结果。")
         return
 
-    sort_by_str = fetch_settings.get("arxiv_sort_by", "SubmittedDate")
-    sort_order_str = fetch_settings.get("arxiv_sort_order", "Descending")
-
-    sort_criterion_map = {
-        "Relevance": arxiv.SortCriterion.Relevance,
-        "LastUpdatedDate": arxiv.SortCriterion.LastUpdatedDate,
-        "SubmittedDate": arxiv.SortCriterion.SubmittedDate,
-    }
-    sort_by = sort_criterion_map.get(sort_by_str, arxiv.SortCriterion.SubmittedDate)
-    sort_order = arxiv.SortOrder.Ascending if sort_order_str == "Ascending" else arxiv.SortOrder.Descending
-
-    client = arxiv.Client(page_size=100, delay_seconds=3, num_retries=5)
-    search = arxiv.Search(
-        query=search_query,
-        max_results=fetch_settings.get("max_papers_per_category_fetch", 10) * len(expanded_categories),
-        sort_by=sort_by,
-        sort_order=sort_order,
+    # 默认每个子查询的上限为 每个分类的篇数 × 子查询中的分类数，合计与不拆分时相同
+    per_category = fetch_settings.get("max_papers_per_category_fetch", 10)
+    per_chunk = int(fetch_settings.get("arxiv_max_results_per_chunk", 0) or 0)
+    chunk_results = _run_arxiv_queries(
+        fetch_settings,
+        [(query, per_chunk or per_category * category_count) for query, category_count in plan],
+        config.get("query_cache"),
     )
-
-    try:
-        results = list(client.results(search))
-        logger.info(f"arXiv 分类查询找到 {len(results)} 篇论文。")
-        unique_paper_urls = set()
-        for result in results:
-            paper_data = _arxiv_result_to_paper_data(result)
-            if paper_data and paper_data["paper_url"] not in unique_paper_urls:
-                unique_paper_urls.add(paper_data["paper_url"])
-                yield paper_data
-    except Exception as e:
-        logger.error(f"执行 arXiv 分类查询时出错: {e}", exc_info=True)
+    records = _merge_arxiv_results(chunk_results, fetch_settings)
+    logger.info("arXiv 分类查询找到 %s 篇论文。", len(records))
+    unique_paper_urls = set()
+    for record in records:
+        paper_url = record["paper"]["paper_url"]
+        if paper_url not in unique_paper_urls:
+            unique_paper_urls.add(paper_url)
+            yield Paper.from_dict(record["paper"])
 
 
 # --- bioRxiv Fetchers ---
@@ -380,12 +599,259 @@ def _get_biorxiv_date_range(fetch_settings):
         return f"{start_date.strftime('%Y-%m-%d')}/{end_date.strftime('%Y-%m-%d')}"
 
 
-def _query_biorxiv_api(date_range):
-    url = f"https://api.biorxiv.org/details/biorxiv/{date_range}"
-    response = utils.make_api_request(url)
-    if not response:
-        return []
-    return response.json().get("collection", [])
+# 解析 bioRxiv 响应所用的 JSON 后端，首次查询时确定
+_json_backend = None
+
+
+def _biorxiv_json_backend():
+    """
+    选择解析 bioRxiv 响应的方式 (结果缓存)：
+        ijson   逐条流式解析，响应体不必完整读入内存，被预过滤排除的记录不会构造完整的字典；
+        orjson  一次解析整页，比标准库 json 快数倍；
+        json    标准库。
+    ijson 与 orjson 均为可选依赖 (pip install ijson / orjson)。
+    """
+    global _json_backend
+    if _json_backend is None:
+        try:
+            import ijson
+
+            _json_backend = ("ijson", ijson)
+        except ImportError:
+            try:
+                import orjson
+
+                _json_backend = ("orjson", orjson.loads)
+            except ImportError:
+                import json
+
+                _json_backend = ("json", json.loads)
+        logger.debug("bioRxiv 响应解析方式: %s", _json_backend[0])
+    return _json_backend
+
+
+_BIORXIV_RECORD_PREFIX = "collection.item"
+_BIORXIV_FIELD_PREFIX = _BIORXIV_RECORD_PREFIX + "."
+_BIORXIV_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+
+
+def _stream_biorxiv_records(ijson, body, field_filters, page):
+    """
+    用 ijson 逐个事件解析一页响应，产出通过 field_filters 的记录。
+    某个字段未通过过滤时，该记录剩余的字段直接跳过，不再保存。
+    page["count"] 为本页的记录总数 (含被过滤的)，page["total"] 为接口报告的总数。
+    """
+    record = None
+    rejected = False
+    for prefix, event, value in ijson.parse(body):
+        if prefix == _BIORXIV_RECORD_PREFIX:
+            if event == "start_map":
+                record, rejected = {}, False
+            elif event == "end_map":
+                page["count"] += 1
+                # 缺少的字段按空字符串判断，与整页解析的结果一致
+                if not rejected and all(check("") for field, check in field_filters.items() if field not in record):
+                    yield record
+                record = None
+        elif record is not None:
+            if rejected or event not in _BIORXIV_SCALAR_EVENTS:
+                continue
+            field = prefix[len(_BIORXIV_FIELD_PREFIX):]
+            if "." in field:  # 嵌套结构，记录中用不到
+                continue
+            check = field_filters.get(field)
+            if check is not None and not check(str(value or "").lower()):
+                rejected = True
+                continue
+            record[field] = value
+        elif prefix == "messages.item.total":
+            page["total"] = value
+
+
+def _load_biorxiv_records(loads, content, field_filters, page):
+    """一次解析整页响应，产出通过 field_filters 的记录。page 的含义同 _stream_biorxiv_records。"""
+    data = loads(content)
+    collection = data.get("collection") or []
+    messages = data.get("messages") or [{}]
+    page["count"] = len(collection)
+    page["total"] = messages[0].get("total", 0)
+    for record in collection:
+        if all(check(str(record.get(field) or "").lower()) for field, check in field_filters.items()):
+            yield record
+
+
+def _split_biorxiv_date_range(date_range, window_days):
+    """
+    把 "起始日期/结束日期" 切分为连续的、每个不超过 window_days 天的窗口 (按日期升序)。
+    window_days 不大于 0 或日期无法解析时不切分。
+    """
+    try:
+        start, end = (datetime.strptime(part, "%Y-%m-%d") for part in date_range.split("/"))
+    except ValueError:
+        return [date_range]
+    if window_days <= 0 or start > end:
+        return [date_range]
+
+    windows = []
+    while start <= end:
+        stop = min(end, start + timedelta(days=window_days - 1))
+        windows.append(f"{start.strftime('%Y-%m-%d')}/{stop.strftime('%Y-%m-%d')}")
+        start = stop + timedelta(days=1)
+    return windows
+
+
+class _BiorxivWindow:
+    """一个日期窗口的检查点：当前页的游标，以及该页已经产出的记录数。"""
+
+    def __init__(self, date_range):
+        self.date_range = date_range
+        self.cursor = 0
+        self.emitted = 0
+
+
+def _iter_biorxiv_window(window, field_filters):
+    """
+    从检查点开始按游标逐页请求一个窗口，逐条产出原始记录，并随之推进检查点。
+    请求或解析失败时抛出异常；从同一检查点重新调用会跳过已产出的记录，不会重复。
+    """
+    backend, parser = _biorxiv_json_backend()
+    while True:
+        url = f"{BIORXIV_API_URL}/{window.date_range}/{window.cursor}"
+        page = {"count": 0, "total": 0}
+        with metrics.FETCH_SECONDS.time(source="biorxiv"), tracing.span("biorxiv.api_page"):
+            response = utils.make_api_request(url, stream=backend == "ijson")
+        if not response:
+            raise RuntimeError(f"请求 {url} 失败")
+        try:
+            if backend == "ijson":
+                response.raw.decode_content = True  # 由 urllib3 解压 gzip 响应
+                records = _stream_biorxiv_records(parser, response.raw, field_filters, page)
+            else:
+                records = _load_biorxiv_records(parser, response.content, field_filters, page)
+            skip = window.emitted  # 上次在本页中途失败时已经产出的记录
+            for record in records:
+                if skip:
+                    skip -= 1
+                    continue
+                yield record
+                window.emitted += 1
+        finally:
+            response.close()
+
+        try:
+            total = int(page["total"] or 0)
+        except (TypeError, ValueError):
+            total = 0
+        window.cursor += page["count"]
+        window.emitted = 0
+        if not page["count"] or window.cursor >= total:
+            return
+
+
+def _iter_biorxiv_window_with_retries(window, field_filters, max_retries, stop_event=None):
+    """抓取一个窗口，失败时只从该窗口的检查点重试；重试用尽后记录错误并放弃该窗口。"""
+    policy = retry.RetryPolicy(max_retries=max_retries, base_delay=BIORXIV_WINDOW_RETRY_DELAY)
+    for attempt in range(max_retries + 1):
+        try:
+            yield from _iter_biorxiv_window(window, field_filters)
+            return
+        except Exception as e:
+            if attempt >= max_retries:
+                logger.error("bioRxiv 日期窗口 %s 抓取失败，已跳过该窗口: %s", window.date_range, e)
+                return
+            wait = policy.backoff(attempt)
+            logger.warning(
+                "bioRxiv 日期窗口 %s 在游标 %d 处出错 (第 %d 次)，%.1f 秒后从该处重试: %s",
+                window.date_range,
+                window.cursor,
+                attempt + 1,
+                wait,
+                e,
+            )
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return
+            else:
+                time.sleep(wait)
+
+
+def _merge_biorxiv_windows(windows, field_filters, parallel, max_retries):
+    """
+    用 parallel 个线程并发抓取各窗口，按窗口的日期顺序流式产出记录。
+    每个窗口的记录先放入有界队列，后面的窗口只预取有限的记录，内存占用不随日期范围增长。
+    """
+    stop_event = threading.Event()
+    queues = [queue.Queue(maxsize=BIORXIV_WINDOW_BUFFER) for _ in windows]
+    # Tracer 按线程保存，窗口线程需要显式激活调用方的 Tracer，各页的耗时才会计入阶段统计
+    tracer = tracing.current_tracer()
+
+    def put(q, item):
+        while not stop_event.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(window, q):
+        with tracing.activate(tracer):
+            try:
+                for record in _iter_biorxiv_window_with_retries(window, field_filters, max_retries, stop_event):
+                    if not put(q, record):
+                        return
+            except Exception as e:
+                logger.error("bioRxiv 日期窗口 %s 抓取出错: %s", window.date_range, e, exc_info=True)
+            finally:
+                put(q, _WINDOW_DONE)
+
+    # 线程池按提交顺序开始任务，正在抓取的总是最早的几个未完成窗口，不会互相等待
+    pool = ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="biorxiv-window")
+    try:
+        for window, q in zip(windows, queues):
+            pool.submit(run, window, q)
+        for q in queues:
+            while True:
+                item = q.get()
+                if item is _WINDOW_DONE:
+                    break
+                yield item
+    finally:
+        # 调用方提前停止迭代时，通知仍在运行的窗口尽快退出
+        stop_event.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+_WINDOW_DONE = object()
+
+
+def _query_biorxiv_api(fetch_settings, field_filters=None):
+    """
+    请求 bioRxiv details 接口，按日期顺序逐条产出原始记录。
+
+    日期范围按 biorxiv_window_days 切分为多个窗口，由 biorxiv_parallel_windows 个线程并发抓取
+    (同一主机上的并发请求数即为该值)，再按日期顺序合并。每个窗口按游标逐页请求 (每页最多 100 条)，
+    出错时只重试该窗口，从其检查点继续。
+
+    field_filters 为 {字段名: 判断函数}，判断函数接收该字段小写后的值；任一字段不满足的记录
+    在解析阶段就被丢弃。记录边解析边产出，内存占用与日期范围内的论文总数无关。
+    """
+    field_filters = field_filters or {}
+    date_range = _get_biorxiv_date_range(fetch_settings)
+    window_days = int(fetch_settings.get("biorxiv_window_days", BIORXIV_WINDOW_DAYS) or 0)
+    parallel = int(fetch_settings.get("biorxiv_parallel_windows", BIORXIV_PARALLEL_WINDOWS) or 1)
+    max_retries = int(fetch_settings.get("biorxiv_window_retries", BIORXIV_WINDOW_RETRIES) or 0)
+
+    windows = [_BiorxivWindow(r) for r in _split_biorxiv_date_range(date_range, window_days)]
+    parallel = max(1, min(parallel, len(windows)))
+    if len(windows) > 1:
+        logger.info("bioRxiv 日期范围 %s 切分为 %d 个窗口，并发数 %d。", date_range, len(windows), parallel)
+
+    if parallel == 1:
+        for window in windows:
+            yield from _iter_biorxiv_window_with_retries(window, field_filters, max_retries)
+        return
+    yield from _merge_biorxiv_windows(windows, field_filters, parallel, max_retries)
 
 
 def _parse_biorxiv_entry(paper):
@@ -394,15 +860,15 @@ def _parse_biorxiv_entry(paper):
     if not doi or not version:
         return None
 
-    return {
-        "title": paper.get("title", "N/A").strip(),
-        "authors": paper.get("authors", "N/A").strip(),
-        "source": "bioRxiv",
-        "category": paper.get("category", "N/A").strip(),
-        "paper_url": f"https://www.biorxiv.org/content/{doi}v{version}",
-        "pdf_url": f"https://www.biorxiv.org/content/{doi}v{version}.full.pdf",
-        "abstract": paper.get("abstract", "N/A").strip(),
-    }
+    return Paper.create(
+        title=paper.get("title", "N/A").strip(),
+        authors=paper.get("authors", "N/A").strip(),
+        source="bioRxiv",
+        category=paper.get("category", "N/A").strip(),
+        paper_url=f"{BIORXIV_CONTENT_URL}/{doi}v{version}",
+        pdf_url=f"{BIORXIV_CONTENT_URL}/{doi}v{version}.full.pdf",
+        abstract=paper.get("abstract", "N/A").strip(),
+    )
 
 
 def _biorxiv_matches_filters(paper, keywords, authors, search_field='all'):
@@ -434,11 +900,17 @@ def _biorxiv_matches_filters(paper, keywords, authors, search_field='all'):
     return True
 
 
+def _author_filter(authors):
+    """返回只含作者条件的 field_filters；未指定作者时为空。"""
+    authors = [author.lower() for author in authors]
+    if not authors:
+        return {}
+    return {"authors": lambda value: any(author in value for author in authors)}
+
+
 def fetch_from_biorxiv_by_keyword(config):
     logger.info("开始从 bioRxiv 按关键词获取论文列表...")
     fetch_settings = config["fetch_settings"]
-    date_range = _get_biorxiv_date_range(fetch_settings)
-    all_papers = _query_biorxiv_api(date_range)
 
     keywords = [kw.lower() for kw in config.get("keywords", [])]
     authors = fetch_settings.get("search_by_authors", [])
@@ -448,8 +920,16 @@ def fetch_from_biorxiv_by_keyword(config):
         logger.warning("未提供关键词或作者，bioRxiv (关键词模式) 查询将不会返回任何结果。")
         return
 
+    # 只涉及单个字段的条件在解析阶段预过滤；'all' 模式的关键词需要标题与摘要，留给完整检查
+    field_filters = _author_filter(authors)
+    if keywords and search_field in ("title", "abstract"):
+        field_filters[search_field] = lambda value: any(kw in value for kw in keywords)
+    all_papers = _query_biorxiv_api(fetch_settings, field_filters)
+
     for paper in all_papers:
-        if _biorxiv_matches_filters(paper, keywords, authors, search_field):
+        with tracing.span("biorxiv.filter"):
+            matched = _biorxiv_matches_filters(paper, keywords, authors, search_field)
+        if matched:
             paper_data = _parse_biorxiv_entry(paper)
             if paper_data:
                 yield paper_data
@@ -458,25 +938,16 @@ def fetch_from_biorxiv_by_keyword(config):
 def fetch_from_biorxiv_by_category(config, selected_categories_list):
     logger.info("开始从 bioRxiv 按分类获取论文列表...")
     fetch_settings = config["fetch_settings"]
-    date_range = _get_biorxiv_date_range(fetch_settings)
-    all_papers = _query_biorxiv_api(date_range)
 
-    categories = [cat.lower() for cat in selected_categories_list]
+    categories = {cat.lower() for cat in selected_categories_list}
     authors = fetch_settings.get("search_by_authors", [])
 
-    for paper in all_papers:
-        # Category check
-        category_match = paper.get("category", "").lower() in categories
-        if not category_match:
-            continue
-
-        # Author check (only if authors are specified)
-        if authors:
-            paper_authors = paper.get("authors", "").lower()
-            author_match = any(author.lower() in paper_authors for author in authors)
-            if not author_match:
-                continue
+    # 分类与作者条件 (仅在指定作者时) 在解析阶段过滤
+    field_filters = _author_filter(authors)
+    field_filters["category"] = lambda value: value in categories
+    all_papers = _query_biorxiv_api(fetch_settings, field_filters)
 
+    for paper in all_papers:
         paper_data = _parse_biorxiv_entry(paper)
         if paper_data:
             yield paper_data
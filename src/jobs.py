@@ -0,0 +1,189 @@
+# src/jobs.py
+
+"""
+并发抓取任务管理。
+
+Web 界面的每个抓取请求都成为一个独立的 CrawlJob：拥有自己的 ID、配置快照、
+Crawler 实例 (停止信号互不影响) 以及 Socket.IO 房间 "job:<id>"，
+任务产生的事件只发送给加入了该房间的客户端。
+JobManager 用信号量限制同时运行的任务数，超出上限的任务排队等待空闲名额。
+"""
+
+import copy
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from .crawler import Crawler
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_FINISHED = "finished"
+STATUS_STOPPED = "stopped"
+STATUS_FAILED = "failed"
+
+_FINAL_STATUSES = (STATUS_FINISHED, STATUS_STOPPED, STATUS_FAILED)
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class CrawlJob:
+    """一次抓取任务及其状态。"""
+
+    def __init__(self, job_id, mode, categories, config, socketio=None, owner=None):
+        self.id = job_id
+        self.mode = mode
+        self.categories = copy.deepcopy(categories or {})
+        # 配置快照：任务运行期间配置文件或其他任务的修改不会影响本任务
+        self.config = copy.deepcopy(config)
+        self.owner = owner
+        self.room = f"job:{job_id}"
+        self.crawler = Crawler(self.config, socketio, room=self.room)
+        self.status = STATUS_QUEUED
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.papers_found = None
+        self.error = None
+        self.stop_requested = False
+
+    @property
+    def finished(self):
+        return self.status in _FINAL_STATUSES
+
+    def stop(self):
+        """请求停止；排队中的任务不会再开始，运行中的任务在当前论文处理完毕后停止。"""
+        self.stop_requested = True
+        self.crawler.request_shutdown()
+
+    def snapshot(self):
+        return {
+            "job_id": self.id,
+            "mode": self.mode,
+            "categories": self.categories,
+            "status": self.status,
+            "owner": self.owner,
+            "room": self.room,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "papers_found": self.papers_found,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    创建并运行抓取任务。
+
+    max_concurrent 为同时运行的任务上限 (定时任务通过 slot() 共享同一上限)；
+    已结束的任务最多保留 max_history 个，供 /api/jobs 查询。
+    """
+
+    def __init__(self, socketio=None, max_concurrent=2, max_history=50):
+        self.socketio = socketio
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_history = max_history
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _emit_status(self, job):
+        if self.socketio:
+            self.socketio.emit("job_status", job.snapshot(), room=job.room)
+
+    @contextmanager
+    def slot(self):
+        """占用一个运行名额直到 with 代码块结束；名额已满时阻塞等待。"""
+        with self._slots:
+            yield
+
+    def create(self, mode, categories, config, owner=None):
+        """
+        登记一个新任务但不启动它；调用者可先让客户端加入 job.room，
+        再调用 start()，以免错过任务的第一个事件。
+        """
+        job = CrawlJob(uuid.uuid4().hex[:12], mode, categories, config, self.socketio, owner)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+        logger.info("已创建抓取任务 %s，模式: %s，来源: %s", job.id, mode, owner)
+        return job
+
+    def start(self, job):
+        """在后台线程中运行任务 (名额已满时排队)。"""
+        thread = threading.Thread(target=self._run, args=(job,), name=f"crawl-job-{job.id}", daemon=True)
+        thread.start()
+        return job
+
+    def submit(self, mode, categories, config, owner=None):
+        """创建并启动任务，立即返回 CrawlJob。"""
+        return self.start(self.create(mode, categories, config, owner))
+
+    def _run(self, job):
+        self._emit_status(job)
+        with self._slots:
+            if job.stop_requested:
+                job.status = STATUS_STOPPED
+                job.finished_at = _now()
+                logger.info("抓取任务 %s 在开始前被取消。", job.id)
+                self._emit_status(job)
+                return
+
+            job.status = STATUS_RUNNING
+            job.started_at = _now()
+            self._emit_status(job)
+            try:
+                papers = job.crawler.run_crawl(job.mode, job.categories)
+                job.papers_found = len(papers or [])
+                job.status = STATUS_STOPPED if job.stop_requested else STATUS_FINISHED
+            except Exception as e:
+                job.status = STATUS_FAILED
+                job.error = str(e)
+                logger.error("抓取任务 %s 失败: %s", job.id, e, exc_info=True)
+            finally:
+                job.finished_at = _now()
+                self._emit_status(job)
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values()]
+
+    def active_jobs(self, owner=None):
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if not job.finished]
+        if owner is not None:
+            jobs = [job for job in jobs if job.owner == owner]
+        return jobs
+
+    def stop(self, job_id):
+        """停止指定任务，返回是否找到了未结束的任务。"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.stop()
+        logger.info("已请求停止抓取任务 %s", job_id)
+        return True
+
+    def stop_all(self, owner=None):
+        """停止全部 (或指定客户端发起的) 未结束任务，返回任务数。"""
+        jobs = self.active_jobs(owner)
+        for job in jobs:
+            job.stop()
+        return len(jobs)
@@ -2,20 +2,72 @@
 
 import argparse
 import logging
+import signal
 import sys
-import questionary
 import copy
-from rich.console import Console
-from rich.progress import Progress
+import threading
 
 from . import config
-from .crawler import Crawler
 from .database import init_db
 from .utils import setup_logging
-from .fetchers import get_arxiv_categories, get_biorxiv_categories
+
+# questionary、rich、arxiv 与 requests 导入较慢，只在真正用到它们的代码路径中导入，
+# 使 --help、配置错误以及 JSON 日志下的无人值守运行不必为交互界面付出启动时间。
 
 logger = logging.getLogger(__name__)
-console = Console()
+_console = None
+
+
+def get_console():
+    """返回共享的 rich Console，首次调用时才导入 rich。"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+class AllThreadsProfiler:
+    """
+    用 cProfile 分析整个进程，包括流水线下载线程与抓取器的线程池。
+
+    Python 3.12 之前 cProfile 只记录启用它的线程，因此通过 threading.setprofile
+    为之后启动的每个线程各创建一个分析器，结束时合并为一份 pstats 结果。
+    Python 3.12 起一个分析器已记录全部线程，子线程中无法再启用第二个分析器，直接跳过。
+    """
+
+    def __init__(self):
+        self._profilers = []
+        self._lock = threading.Lock()
+
+    def _start_thread_profiler(self, *args):
+        import cProfile
+
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Python 3.12+: 已有分析器在记录本线程
+            return
+        with self._lock:
+            self._profilers.append(profiler)
+
+    def start(self):
+        threading.setprofile(self._start_thread_profiler)
+        self._start_thread_profiler()
+
+    def stop(self):
+        """停止分析并返回合并后的 pstats.Stats。"""
+        import pstats
+
+        threading.setprofile(None)
+        with self._lock:
+            profilers = list(self._profilers)
+        stats = pstats.Stats(profilers[0], stream=sys.stdout)
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        return stats
 
 class CliApp:
     """
@@ -25,16 +77,22 @@ class CliApp:
     def __init__(self):
         self.args = None
         self.config_data = None
+        self._shutdown_requested = False
 
     def setup(self):
         """
         初始化应用程序，包括日志、数据库和参数解析。
         """
-        setup_logging()
+        if self.args is None:
+            self.parse_arguments()
+        self.load_configuration()
+        logging_settings = dict(self.config_data.get("logging") or {})
+        if self.args.log_format:
+            logging_settings["mode"] = self.args.log_format
+        setup_logging(logging_settings)
+        logger.info("Configuration loaded from '%s'.", self.args.config)
         logger.info("Initializing database...")
         init_db()
-        self.parse_arguments()
-        self.load_configuration()
 
     def parse_arguments(self):
         """
@@ -54,6 +112,43 @@ class CliApp:
             default="interactive", # Default to interactive if no mode is specified
             help="Set the fetch mode. 'interactive' will start a guided session.",
         )
+        parser.add_argument(
+            "--pipeline",
+            action="store_true",
+            help="Start downloading papers while discovery is still running.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of download workers in pipeline mode.",
+        )
+        parser.add_argument(
+            "--queue-size",
+            type=int,
+            default=16,
+            help="Max number of discovered papers waiting for download in pipeline mode.",
+        )
+        parser.add_argument(
+            "--drain-timeout",
+            type=float,
+            default=30,
+            help="Seconds to wait for in-flight downloads to stop after Ctrl-C/SIGTERM.",
+        )
+        parser.add_argument(
+            "--log-format",
+            type=str,
+            choices=["rich", "json"],
+            default=None,
+            help="Override logging.mode from the config: 'json' writes JSON lines for headless runs.",
+        )
+        parser.add_argument(
+            "--cprofile",
+            type=str,
+            metavar="PATH",
+            default=None,
+            help="Profile the whole run (all threads) with cProfile and write pstats output to PATH.",
+        )
         self.args = parser.parse_args()
 
     def load_configuration(self):
@@ -62,12 +157,11 @@ class CliApp:
         """
         try:
             self.config_data = config.load_config(self.args.config)
-            logger.info(f"Configuration loaded from '{self.args.config}'.")
         except FileNotFoundError as e:
-            logger.error(f"Configuration file not found: {e}")
+            logger.error("Configuration file not found: %s", e)
             sys.exit(1)
         except Exception as e:
-            logger.error(f"Error loading configuration: {e}")
+            logger.error("Error loading configuration: %s", e)
             sys.exit(1)
 
     def run(self):
@@ -93,36 +187,149 @@ class CliApp:
             if "keywords" in runtime_config:
                 final_config["keywords"] = runtime_config["keywords"]
 
+        from .crawler import Crawler
+
+        console = get_console()
         console.rule(f"[bold blue]Executing Crawl: {fetch_method}[/bold blue]")
 
         crawler = Crawler(final_config, socketio=None)
+        previous_handlers = self._install_signal_handlers(crawler)
 
-        # The categories to fetch are now derived from the final_config
-        categories_to_fetch = final_config.get("categories", {})
+        try:
+            # The categories to fetch are now derived from the final_config
+            categories_to_fetch = final_config.get("categories", {})
+
+            if self.args.pipeline:
+                self._run_pipelined(crawler, fetch_method, categories_to_fetch)
+            else:
+                self._run_sequential(crawler, fetch_method, categories_to_fetch)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self._print_trace_summary(crawler)
+
+        if self._shutdown_requested:
+            logger.warning("任务已被中断。")
+            console.rule("[bold yellow]Interrupted[/bold yellow]")
+            return
 
+        logger.info("所有任务完成。")
+        console.rule("[bold green]Done[/bold green]")
+
+    def _print_trace_summary(self, crawler):
+        """
+        打印本次运行各阶段的耗时统计。
+        """
+        rows = crawler.tracer.summary()
+        if not rows:
+            return
+        from rich.table import Table
+
+        table = Table(title="Stage Timings")
+        table.add_column("Stage")
+        table.add_column("Count", justify="right")
+        table.add_column("Total (s)", justify="right")
+        table.add_column("Avg (ms)", justify="right")
+        table.add_column("Max (ms)", justify="right")
+        table.add_column("% Wall", justify="right")
+        for row in rows:
+            table.add_row(
+                row["stage"],
+                str(row["count"]),
+                f"{row['total_seconds']:.3f}",
+                f"{row['avg_ms']:.2f}",
+                f"{row['max_ms']:.2f}",
+                f"{row['percent_of_wall']:.1f}",
+            )
+        get_console().print(table)
+
+    def _install_signal_handlers(self, crawler):
+        """
+        安装 SIGINT/SIGTERM 处理函数：第一次收到信号时停止发现并取消所有下载
+        (未完成的 .part 文件保留以便续传)；再次收到则立即中断。
+        返回原有的处理函数，以便结束后恢复。
+        """
+        self._shutdown_requested = False
+
+        def handle_signal(signum, frame):
+            if self._shutdown_requested:
+                raise KeyboardInterrupt
+            self._shutdown_requested = True
+            logger.warning("收到信号 %s，正在停止任务 (再次按 Ctrl-C 强制退出)...", signal.Signals(signum).name)
+            crawler.request_shutdown()
+
+        previous_handlers = {}
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[signum] = signal.getsignal(signum)
+            signal.signal(signum, handle_signal)
+        return previous_handlers
+
+    def _run_sequential(self, crawler, fetch_method, categories_to_fetch):
+        """
+        先完成全部发现，再逐篇下载。
+        """
         new_papers = crawler._run_crawl_task(fetch_method, categories_to_fetch)
 
+        if self._shutdown_requested:
+            return
         if not new_papers:
             logger.info("没有找到需要下载的新论文。")
-        else:
-            console.rule(f"[bold blue]开始下载 {len(new_papers)} 篇新论文[/bold blue]")
-            with Progress(console=console) as progress:
-                task = progress.add_task("[green]下载中...", total=len(new_papers))
-                for paper in new_papers:
-                    logger.info(f"正在下载: {paper['title']}")
-                    # Note: _download_paper is now private. We use the public method.
-                    # The public method handles DB interaction and notifications (which are suppressed w/o socketio).
-                    crawler.download_single_paper(paper)
-                    progress.update(task, advance=1)
+            return
 
-        logger.info("所有任务完成。")
-        console.rule("[bold green]Done[/bold green]")
+        from rich.progress import Progress
+
+        console = get_console()
+        console.rule(f"[bold blue]开始下载 {len(new_papers)} 篇新论文[/bold blue]")
+        with Progress(console=console) as progress:
+            task = progress.add_task("[green]下载中...", total=len(new_papers))
+            for paper in new_papers:
+                if self._shutdown_requested:
+                    break
+                logger.info("正在下载: %s", paper.title)
+                # Note: _download_paper is now private. We use the public method.
+                # The public method handles DB interaction and notifications (which are suppressed w/o socketio).
+                crawler.download_single_paper(paper)
+                progress.update(task, advance=1)
+
+    def _run_pipelined(self, crawler, fetch_method, categories_to_fetch):
+        """
+        流水线模式：边发现边下载，下载总数事先未知。
+        """
+        from rich.progress import Progress
+
+        console = get_console()
+        console.rule(
+            f"[bold blue]流水线模式: {self.args.workers} 个下载线程[/bold blue]"
+        )
+        with Progress(console=console) as progress:
+            task = progress.add_task("[green]下载中...", total=None)
+
+            def on_result(paper, success):
+                progress.update(task, advance=1)
+
+            stats = crawler.run_pipelined(
+                fetch_method,
+                categories_to_fetch,
+                num_workers=self.args.workers,
+                queue_size=self.args.queue_size,
+                on_result=on_result,
+                drain_timeout=self.args.drain_timeout,
+            )
+
+        if stats:
+            logger.info(
+                "发现 %d 篇新论文，成功下载 %d 篇，失败 %d 篇。",
+                stats['discovered'], stats['downloaded'], stats['failed'],
+            )
 
     def run_interactive_entry(self):
         """
         交互模式的入口点，让用户选择快速模式或预设模式。
         """
-        console.rule("[bold blue]Interactive Mode[/bold blue]")
+        import questionary
+
+        get_console().rule("[bold blue]Interactive Mode[/bold blue]")
 
         run_mode = questionary.select(
             "Welcome! How would you like to run the crawler?",
@@ -147,6 +354,9 @@ class CliApp:
         """
         引导用户完成抓取参数的设置。
         """
+        import questionary
+
+        console = get_console()
         console.print("\n[bold green]Starting Preset Mode Setup...[/bold green]")
 
         fetch_method = questionary.select(
@@ -197,6 +407,9 @@ class CliApp:
 
     def _format_arxiv_choices(self):
         """Formats arXiv categories for questionary."""
+        import questionary
+        from .fetchers import get_arxiv_categories
+
         choices = []
         for group in get_arxiv_categories():
             choices.append(questionary.Separator(f'--- {group["group"]} ---'))
@@ -206,6 +419,8 @@ class CliApp:
 
     def _format_biorxiv_choices(self):
         """Formats bioRxiv categories for questionary."""
+        from .fetchers import get_biorxiv_categories
+
         return [{"name": cat, "value": cat} for cat in get_biorxiv_categories()]
 
 
@@ -214,8 +429,24 @@ def main():
     主函数，程序的命令行入口点。
     """
     cli_app = CliApp()
-    cli_app.setup()
-    cli_app.run()
+    cli_app.parse_arguments()
+
+    if not cli_app.args.cprofile:
+        cli_app.setup()
+        cli_app.run()
+        return
+
+    # 在加载配置与初始化数据库之前开始分析，使结果涵盖整个运行
+    profiler = AllThreadsProfiler()
+    profiler.start()
+    try:
+        cli_app.setup()
+        cli_app.run()
+    finally:
+        stats = profiler.stop()
+        stats.dump_stats(cli_app.args.cprofile)
+        logger.info("性能分析结果已写入 %s (可用 `python -m pstats` 或 snakeviz 查看)", cli_app.args.cprofile)
+        stats.sort_stats("cumulative").print_stats(25)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,262 @@
+# src/metrics.py
+
+"""
+进程内的轻量指标收集，输出 Prometheus 文本格式 (text exposition format 0.0.4)。
+
+记录指标只是一次加锁的字典更新；格式化文本只在 /metrics 被抓取时进行，
+没有人抓取时几乎没有额外开销。不依赖 prometheus_client。
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# 默认的耗时分桶 (秒)，覆盖从本地数据库查询到慢速 PDF 下载的范围
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + inner + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    """只增不减的计数器。"""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值。"""
+
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """分桶直方图，附带 _sum 与 _count。"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [各分桶计数..., +Inf 计数], 总和
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """统计 with 代码块的耗时。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render():
+    """以 Prometheus 文本格式输出所有已注册的指标。"""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- 指标定义 ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "paper_crawler_http_request_duration_seconds",
+    "Latency of outgoing HTTP requests until response headers are received.",
+    ("host", "kind"),
+)
+HTTP_REQUESTS = Counter(
+    "paper_crawler_http_requests_total",
+    "Outgoing HTTP requests by host and response status ('error' for network failures).",
+    ("host", "kind", "status"),
+)
+HTTP_RETRIES = Counter(
+    "paper_crawler_http_retries_total",
+    "Retries scheduled after a failed HTTP request.",
+    ("host", "kind"),
+)
+CIRCUIT_STATE = Gauge(
+    "paper_crawler_circuit_breaker_state",
+    "Per-host circuit breaker state (0 = closed, 1 = half-open, 2 = open).",
+    ("host",),
+)
+DOWNLOAD_BYTES = Counter(
+    "paper_crawler_download_bytes_total",
+    "Bytes of PDF data written to disk; use rate() for bytes/s.",
+    ("host",),
+)
+DOWNLOADS = Counter(
+    "paper_crawler_downloads_total",
+    "Finished paper downloads by result.",
+    ("result",),
+)
+ACTIVE_DOWNLOADS = Gauge(
+    "paper_crawler_active_downloads",
+    "Paper downloads currently in progress.",
+)
+PIPELINE_QUEUE_DEPTH = Gauge(
+    "paper_crawler_pipeline_queue_depth",
+    "Discovered papers waiting in the pipelined download queue.",
+)
+FETCH_SECONDS = Histogram(
+    "paper_crawler_fetch_duration_seconds",
+    "Time spent querying a source for paper metadata.",
+    ("source",),
+)
+CANDIDATES = Counter(
+    "paper_crawler_candidates_total",
+    "Papers returned by fetchers, by what the crawler did with them.",
+    ("source", "result"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "paper_crawler_db_query_duration_seconds",
+    "Duration of database operations.",
+    ("operation",),
+)
+SCHEDULED_RUNS = Counter(
+    "paper_crawler_scheduled_runs_total",
+    "Scheduler triggers by result (started, overlap, misfire, failed).",
+    ("profile", "result"),
+)
+
+SOCKET_EVENTS_DROPPED = Counter(
+    "paper_crawler_socket_events_dropped_total",
+    "Progress-type Socket.IO events dropped because a client's outbound queue was full.",
+    ("event",),
+)
+SOCKET_CLIENTS_OVERFLOWED = Counter(
+    "paper_crawler_socket_clients_overflowed_total",
+    "Socket.IO clients disconnected because their queue of terminal events reached overflow_limit.",
+)
+MIRROR_THROUGHPUT_BYTES = Gauge(
+    "paper_crawler_mirror_throughput_bytes_per_second",
+    "Rolling average (EWMA) whole-transfer throughput of each PDF mirror.",
+    ("mirror",),
+)
+MIRROR_FAILOVERS = Counter(
+    "paper_crawler_mirror_failovers_total",
+    "PDF downloads that moved on to another mirror after a failure, by source.",
+    ("source",),
+)
+QUERY_CACHE_LOOKUPS = Counter(
+    "paper_crawler_query_cache_lookups_total",
+    "Source query cache lookups, by source and result (hit, stale, miss).",
+    ("source", "result"),
+)
+STORAGE_USED_BYTES = Gauge(
+    "paper_crawler_storage_used_bytes",
+    "Total size of downloaded PDFs still on disk, as recorded in the database.",
+)
+STORAGE_FREE_BYTES = Gauge(
+    "paper_crawler_storage_free_bytes",
+    "Free space on the filesystem holding the download directory.",
+)
+STORAGE_EVICTIONS = Counter(
+    "paper_crawler_storage_evictions_total",
+    "PDFs removed to stay within the disk quota or free-space threshold, by policy.",
+    ("policy",),
+)
@@ -0,0 +1,197 @@
+# src/mirrors.py
+
+"""
+PDF 下载镜像的选择与故障转移。
+
+每个数据源可以配置多个镜像 (基础 URL)。论文的 pdf_url 以其中某个镜像开头时，可以改写为其他镜像上的
+同一路径，例如 https://arxiv.org/pdf/2401.00001v1 -> https://export.arxiv.org/pdf/2401.00001v1。
+
+每个镜像记录滚动的统计 (进程内共享)，每次从该镜像下载 (含重试) 结束后更新一次：
+    - 吞吐量 (字节/秒，按整个传输计算) 的指数加权平均 (EWMA，权重 ewma_alpha)，
+      响应很快但之后限速或停滞的镜像不会被当作快速镜像；
+    - 失败率的指数加权平均，并随时间按 error_half_life 秒的半衰期衰减，
+      一段时间没有请求的故障镜像会重新获得尝试的机会。404 等不可重试的 4xx 错误说明该镜像
+      缺少这个文件，而不是镜像本身有问题，不计入失败率。
+下载时按以下顺序尝试镜像：失败率低于 max_error_rate 且熔断器未打开的镜像按吞吐量从高到低
+(尚无数据的镜像先尝试一次)，其余按失败率从低到高。一个镜像下载失败后立即换下一个，
+已下载的部分文件在下一个镜像上断点续传。
+
+    mirrors:
+      ewma_alpha: 0.3
+      max_error_rate: 0.5
+      error_half_life: 60
+      retries_per_mirror: 1   # 有多个镜像时每个镜像的尝试次数
+      sources:
+        arXiv:
+        - https://arxiv.org
+        - https://export.arxiv.org
+"""
+
+import math
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+
+from . import metrics, retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "ewma_alpha": 0.3,
+    "max_error_rate": 0.5,
+    "error_half_life": 60,
+    "retries_per_mirror": 1,
+    "sources": {},
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _settings(settings):
+    return {**DEFAULT_SETTINGS, **(settings or {})}
+
+
+class MirrorStats:
+    """单个镜像的滚动吞吐量与失败率。"""
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+        self.throughput = None  # 字节/秒，EWMA
+        self.error_rate = 0.0  # 0~1，EWMA
+        self.successes = 0
+        self.failures = 0
+        self.misses = 0  # 不可重试的 4xx (镜像缺少文件)，不计入失败率
+        self.updated_at = None
+        self._lock = threading.Lock()
+
+    def _decayed_error_rate(self, half_life, now=None):
+        if self.updated_at is None or half_life <= 0:
+            return self.error_rate
+        elapsed = (now or time.monotonic()) - self.updated_at
+        return self.error_rate * 0.5 ** (elapsed / half_life)
+
+    def record(self, settings, ok, size=0, seconds=0.0):
+        alpha = float(settings["ewma_alpha"])
+        with self._lock:
+            now = time.monotonic()
+            error_rate = self._decayed_error_rate(float(settings["error_half_life"]), now)
+            self.error_rate = (1 - alpha) * error_rate + alpha * (0.0 if ok else 1.0)
+            if ok:
+                self.successes += 1
+                if size > 0 and seconds > 0:
+                    rate = size / seconds
+                    self.throughput = rate if self.throughput is None else (1 - alpha) * self.throughput + alpha * rate
+            else:
+                self.failures += 1
+            self.updated_at = now
+            throughput = self.throughput
+        if throughput is not None:
+            metrics.MIRROR_THROUGHPUT_BYTES.set(round(throughput), mirror=self.mirror)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self, settings):
+        with self._lock:
+            return {
+                "mirror": self.mirror,
+                "throughput": self.throughput,
+                "error_rate": round(self._decayed_error_rate(float(settings["error_half_life"])), 4),
+                "successes": self.successes,
+                "failures": self.failures,
+                "misses": self.misses,
+            }
+
+
+def _get_stats(mirror):
+    with _stats_lock:
+        stats = _stats.get(mirror)
+        if stats is None:
+            stats = _stats[mirror] = MirrorStats(mirror)
+        return stats
+
+
+def _split_base(base):
+    """把镜像的基础 URL 拆分为 (scheme, 主机, 路径前缀)；省略 scheme 时使用 https。"""
+    parsed = urlparse(base if "://" in base else f"https://{base}")
+    return parsed.scheme or "https", parsed.netloc.lower(), parsed.path.rstrip("/")
+
+
+def _rewrite_targets(source, url, settings):
+    """返回 [(镜像, 改写后的 URL)]；url 不属于该数据源的任何镜像时返回空列表。"""
+    bases = [_split_base(base) for base in (settings["sources"] or {}).get(source) or ()]
+    parsed = urlparse(url)
+    host, path = parsed.netloc.lower(), parsed.path
+    for _, base_host, base_path in bases:
+        if host == base_host and (path == base_path or path.startswith(base_path + "/")):
+            rest = path[len(base_path) :] + (f"?{parsed.query}" if parsed.query else "")
+            return [
+                (f"{scheme}://{mirror_host}{mirror_path}", f"{scheme}://{mirror_host}{mirror_path}{rest}")
+                for scheme, mirror_host, mirror_path in bases
+            ]
+    return []
+
+
+def candidates(source, url, settings=None):
+    """
+    返回下载 url 时依次尝试的 [(镜像, URL)]，最优的在前。
+    未配置镜像或 url 不属于任何镜像时只返回原 URL (镜像为 None)。
+    """
+    settings = _settings(settings)
+    targets = _rewrite_targets(source, url, settings)
+    if not targets:
+        return [(None, url)]
+
+    max_error_rate = float(settings["max_error_rate"])
+    half_life = float(settings["error_half_life"])
+    now = time.monotonic()
+
+    def rank(item):
+        mirror, mirror_url = item
+        stats = _get_stats(mirror)
+        error_rate = stats._decayed_error_rate(half_life, now)
+        healthy = error_rate < max_error_rate and retry.get_breaker(mirror_url).state != retry.STATE_OPEN
+        if healthy:
+            if stats.throughput is not None:
+                return (0, -stats.throughput)
+            # 从未尝试过的镜像排在最前，先尝试一次以获得数据；尝试过但没有吞吐量数据的排在有数据的镜像之后
+            tried = stats.successes or stats.failures or stats.misses
+            return (0, 0.0 if tried else -math.inf)
+        return (1, error_rate)
+
+    # sorted 是稳定的：条件相同的镜像保持配置中的顺序
+    return sorted(targets, key=rank)
+
+
+def retries_per_mirror(settings=None):
+    """有多个镜像时，每个镜像的下载尝试次数。"""
+    return max(1, int(_settings(settings)["retries_per_mirror"]))
+
+
+def record(mirror, settings=None, ok=True, size=0, seconds=0.0, status_code=None):
+    """
+    记录从 mirror 下载一个文件 (含重试) 的结果：是否成功、传输的字节数与总耗时，以及失败时的 HTTP 状态码。
+    mirror 为 None (未使用镜像) 时忽略；失败原因是不可重试的 4xx (镜像缺少该文件) 时只计数，不计入失败率。
+    """
+    if mirror is None:
+        return
+    if not ok and status_code is not None and 400 <= status_code < 500 and status_code not in retry.RETRYABLE_STATUS_CODES:
+        _get_stats(mirror).record_miss()
+        return
+    _get_stats(mirror).record(_settings(settings), ok, size, seconds)
+
+
+def status(settings=None):
+    """返回各数据源的镜像及其统计 (按当前的尝试顺序)，供 /api/mirrors 使用。"""
+    settings = _settings(settings)
+    result = {}
+    for source, bases in (settings["sources"] or {}).items():
+        if not bases:
+            continue
+        scheme, host, path = _split_base(bases[0])
+        order = candidates(source, f"{scheme}://{host}{path}/", settings)
+        result[source] = [_get_stats(mirror).snapshot(settings) for mirror, _ in order]
+    return result
@@ -0,0 +1,121 @@
+# src/models.py
+
+"""
+论文记录类型。
+
+抓取器产出、抓取任务保存、下载后写入数据库的论文都是 Paper：
+    - 不可变 (frozen)，在 Python 3.10 及以上版本使用 __slots__，每条记录没有实例字典；
+    - source 与 category 取值有限，驻留 (sys.intern) 后所有记录共享同一个字符串对象；
+    - 摘要以 zlib 压缩后保存，通过 abstract 属性读取，一次大规模抓取中摘要通常占了记录的大部分内存；
+    - 下载完成后用 downloaded() 得到带有文件信息的新记录，而不是修改原记录。
+
+to_dict() / from_dict() 用于 JSON (Socket.IO 事件、客户端请求、查询缓存)，
+to_row() 为写入 papers 表的列，from_dict() 也接受数据库行 (sqlite3.Row 或字典)。
+"""
+
+import sys
+import zlib
+from dataclasses import dataclass, fields, replace
+
+# slots 参数需要 Python 3.10；更早的版本仍为不可变记录，只是带有实例字典
+_DATACLASS_OPTIONS = {"frozen": True, "slots": True} if sys.version_info >= (3, 10) else {"frozen": True}
+
+
+def _compress(text):
+    return zlib.compress(text.encode("utf-8")) if text else b""
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Paper:
+    title: str
+    authors: str
+    source: str
+    category: str
+    paper_url: str
+    pdf_url: str
+    published_date: str = None
+    compressed_abstract: bytes = b""
+    # 以下字段在下载完成或从数据库读取后才有值
+    id: int = None
+    filepath: str = None
+    file_size: int = None
+    sha256: str = None
+    download_date: str = None
+
+    @classmethod
+    def create(cls, title, authors, source, category, paper_url, pdf_url, abstract="", **kwargs):
+        """创建记录：驻留 source / category 并压缩摘要。"""
+        return cls(
+            title=title,
+            authors=authors,
+            source=sys.intern(source or ""),
+            category=sys.intern(category or ""),
+            paper_url=paper_url,
+            pdf_url=pdf_url,
+            compressed_abstract=_compress(abstract),
+            **kwargs,
+        )
+
+    @property
+    def abstract(self):
+        if not self.compressed_abstract:
+            return ""
+        return zlib.decompress(self.compressed_abstract).decode("utf-8")
+
+    @classmethod
+    def from_dict(cls, data):
+        """由 JSON 对象或数据库行创建记录；忽略未知的键 (例如界面中的下载状态)。"""
+        if isinstance(data, cls):
+            return data
+        keys = data.keys()
+        values = {name: data[name] for name in _FIELD_NAMES if name in keys and data[name] is not None}
+        values.pop("compressed_abstract", None)
+        return cls.create(
+            title=values.pop("title", "N/A"),
+            authors=values.pop("authors", ""),
+            source=values.pop("source", ""),
+            category=values.pop("category", ""),
+            paper_url=values.pop("paper_url", ""),
+            pdf_url=values.pop("pdf_url", ""),
+            abstract=data["abstract"] if "abstract" in keys and data["abstract"] else "",
+            **values,
+        )
+
+    def to_dict(self):
+        """返回可序列化为 JSON 的字典；摘要解压为文本，尚无值的下载字段省略。"""
+        data = {
+            "title": self.title,
+            "authors": self.authors,
+            "source": self.source,
+            "category": self.category,
+            "paper_url": self.paper_url,
+            "pdf_url": self.pdf_url,
+            "abstract": self.abstract,
+        }
+        for name in _OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    def to_row(self):
+        """返回写入 papers 表的列 (与 database.add_paper 的 INSERT 语句顺序一致)。"""
+        return (
+            self.title,
+            self.authors,
+            self.source,
+            self.category,
+            self.paper_url,
+            self.pdf_url,
+            self.filepath,
+            self.sha256,
+            self.file_size,
+        )
+
+    def downloaded(self, filepath, file_size, sha256, download_date):
+        """返回带有下载结果的新记录。"""
+        return replace(self, filepath=filepath, file_size=file_size, sha256=sha256, download_date=download_date)
+
+
+_FIELD_NAMES = tuple(field.name for field in fields(Paper))
+_OPTIONAL_FIELDS = ("published_date", "id", "filepath", "file_size", "sha256", "download_date")
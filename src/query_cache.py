@@ -0,0 +1,119 @@
+# src/query_cache.py
+
+"""
+数据源查询结果的持久化缓存。
+
+arXiv 每页请求需要间隔 3 秒，在界面中重新运行同一配置档、Web 服务之后紧接着运行命令行，
+或下载失败后重试，都会重复发出完全相同的查询。查询结果 (解析后的论文字典) 以查询参数
+规范化后的摘要为键，压缩后保存在数据库中 (query_cache 表)：
+    - 缓存时间不超过 ttl 秒：直接使用；
+    - 超过 ttl 但不超过 ttl + stale_ttl 秒：先返回旧结果，同时在后台重新查询并更新缓存；
+    - 更早的缓存视为不存在，重新查询；写入新缓存时顺带清除。
+查询出错时不写入缓存。
+stale_ttl 默认为 0：旧结果会让定时抓取或新的抓取错过其间发布的论文，只有愿意以此换取速度时才应设置。
+
+    query_cache:
+      enabled: true
+      ttl: 3600          # 秒
+      stale_ttl: 0       # 秒，0 表示过期后总是重新查询
+"""
+
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+
+from . import database, metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "ttl": 3600,
+    "stale_ttl": 0,
+}
+
+# 正在后台刷新的缓存键，同一查询只刷新一次
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _settings(settings):
+    return {**DEFAULT_SETTINGS, **(settings or {})}
+
+
+def make_key(source, params):
+    """返回 source 与查询参数对应的缓存键；参数相同 (与字典键的顺序无关) 时键相同。"""
+    normalized = json.dumps([source, params], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _encode(data):
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(payload):
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def _store(key, data, settings):
+    now = time.time()
+    expire_before = now - float(settings["ttl"]) - float(settings["stale_ttl"])
+    database.save_query_cache(key, now, _encode(data), expire_before)
+
+
+def _refresh(key, fetch, settings):
+    try:
+        _store(key, fetch(), settings)
+        logger.debug("已在后台刷新查询缓存 %s。", key[:12])
+    except Exception as e:
+        logger.warning("后台刷新查询缓存失败，继续使用旧结果: %s", e)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _refresh_in_background(key, fetch, settings):
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    threading.Thread(
+        target=_refresh, args=(key, fetch, settings), name=f"query-cache-refresh-{key[:8]}", daemon=True
+    ).start()
+
+
+def get_or_fetch(source, params, fetch, settings=None):
+    """
+    返回 fetch() 的结果 (须可序列化为 JSON)，优先使用 source 与 params 对应的缓存。
+    fetch 出错时应抛出异常，异常会传给调用方，不会写入缓存。
+    """
+    settings = _settings(settings)
+    if not settings["enabled"]:
+        return fetch()
+
+    key = make_key(source, params)
+    cached = database.get_query_cache(key)
+    if cached is not None:
+        created_at, payload = cached
+        age = time.time() - created_at
+        if age < float(settings["ttl"]) + float(settings["stale_ttl"]):
+            try:
+                data = _decode(payload)
+            except (zlib.error, ValueError) as e:
+                logger.warning("查询缓存 %s 已损坏，重新查询: %s", key[:12], e)
+            else:
+                if age < float(settings["ttl"]):
+                    metrics.QUERY_CACHE_LOOKUPS.inc(source=source, result="hit")
+                else:
+                    metrics.QUERY_CACHE_LOOKUPS.inc(source=source, result="stale")
+                    _refresh_in_background(key, fetch, settings)
+                logger.debug("使用查询缓存 %s (%.0f 秒前)。", key[:12], age)
+                return data
+
+    metrics.QUERY_CACHE_LOOKUPS.inc(source=source, result="miss")
+    data = fetch()
+    _store(key, data, settings)
+    return data
@@ -0,0 +1,297 @@
+# src/reconcile.py
+
+"""
+数据库与下载目录的一致性检查。
+
+    python -m src.reconcile                       # 只检查并报告，不做修改
+    python -m src.reconcile --fix                 # 修复路径并标记丢失的文件
+    python -m src.reconcile --fix --redownload    # 同时重新下载丢失的文件
+    python -m src.reconcile --full                # 忽略目录缓存，完整扫描
+
+扫描: 用线程池并行 os.scandir 下载目录下的各级目录。每个目录的内容连同其 mtime 缓存在数据库中
+(scan_cache 表)；文件的增加、删除与改名都会更新所在目录的 mtime，因此 mtime 未变化的目录
+直接使用缓存的文件列表，只需一次 stat，再次检查十万级的文件库只需数秒甚至更短。
+
+对比: 一次读取全部记录，在内存中与扫描到的文件集合比较：
+    - 文件存在但记录为绝对路径 (旧版本保存的)：改写为相对项目根目录的路径；
+    - 文件不在记录的位置，但下载目录中有同名 (大小一致) 且没有记录的文件：更新为新的路径；
+    - 仍然找不到的文件：标记为已清理 (evicted_at)，界面中显示为可重新下载；
+      指定 --redownload 时立即重新下载；
+    - 没有对应记录的 PDF (孤儿文件)：只报告，不删除。
+不指定 --fix 时只报告上述结果。
+
+结果以 NDJSON 写到标准输出，日志以 JSON 行写到标准错误。
+
+退出码:
+    0    数据库与文件一致 (或问题已全部修复)
+    1    仍有丢失的文件或孤儿文件
+    2    参数或配置错误
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import config, database, utils
+from .batch import NdjsonWriter
+from .database import init_db
+from .utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_PROBLEMS = 1
+EXIT_USAGE = 2
+
+# mtime 距扫描开始不到该时长的目录不写入缓存：同一时间片内的后续修改可能不会改变 mtime
+_RACY_MTIME_NS = 2 * 10**9
+
+
+class DirectoryScanner:
+    """
+    并行扫描 root 下的全部 PDF 文件。
+
+    cache 为上次扫描的 {目录: (mtime_ns, 子目录名列表, [[文件名, 大小]])}；
+    扫描后 self.entries 为本次结果 (同样的格式)，可写回缓存供下次使用。
+    """
+
+    def __init__(self, root, workers=8, cache=None):
+        self.root = os.path.abspath(root)
+        self.workers = max(1, workers)
+        self.cache = cache or {}
+        self.entries = {}
+        self.dirs_scanned = 0
+        self.dirs_cached = 0
+
+    def _scan_dir(self, path):
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = self.cache.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return path, cached, True
+
+        subdirs, files = [], []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                    files.append([entry.name, entry.stat().st_size])
+        return path, (mtime_ns, subdirs, files), False
+
+    def scan(self):
+        """返回 {规范化的绝对路径: (绝对路径, 大小)}。"""
+        files = {}
+        if not os.path.isdir(self.root):
+            return files
+
+        scan_started_ns = time.time_ns()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reconcile-scan") as pool:
+            pending = {pool.submit(self._scan_dir, self.root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        path, entry, from_cache = future.result()
+                    except OSError as e:  # 扫描过程中目录被删除或无权限
+                        logger.warning("无法扫描目录: %s", e)
+                        continue
+                    mtime_ns, subdirs, dir_files = entry
+                    if from_cache:
+                        self.dirs_cached += 1
+                    else:
+                        self.dirs_scanned += 1
+                        if mtime_ns > scan_started_ns - _RACY_MTIME_NS:
+                            entry = (-1, subdirs, dir_files)  # 下次重新列出
+                    self.entries[path] = entry
+                    for name, size in dir_files:
+                        abs_path = os.path.join(path, name)
+                        files[os.path.normcase(abs_path)] = (abs_path, size)
+                    for name in subdirs:
+                        pending.add(pool.submit(self._scan_dir, os.path.join(path, name)))
+        return files
+
+
+class ReconcileReport:
+    """一次对比的结果。"""
+
+    def __init__(self):
+        self.updates = []  # 文件存在、需要改写路径或补写大小的记录 [(paper_id, 路径, 大小)]
+        self.relativized = 0
+        self.relocated = []  # [(paper, 新路径, 大小)]
+        self.missing = []  # [paper]
+        self.orphans = []  # [(绝对路径, 大小)]
+        self.checked = 0
+
+
+def diff(papers, files, root):
+    """
+    把数据库记录与扫描到的文件比较，返回 ReconcileReport。
+    files 为 DirectoryScanner.scan() 的返回值；root 之外的记录单独检查文件是否存在。
+    """
+    report = ReconcileReport()
+    root_prefix = os.path.normcase(os.path.join(os.path.abspath(root), ""))
+    matched = set()
+    unresolved = []
+
+    for paper in papers:
+        filepath = paper.get("filepath")
+        if not filepath:
+            continue
+        report.checked += 1
+        abs_path = utils.resolve_paper_path(filepath)
+        key = os.path.normcase(abs_path)
+        if key in files:
+            matched.add(key)
+            size = files[key][1]
+        elif not key.startswith(root_prefix) and os.path.isfile(abs_path):
+            size = os.path.getsize(abs_path)
+        else:
+            unresolved.append(paper)
+            continue
+        relative = utils.relative_paper_path(abs_path)
+        if relative != filepath:
+            report.relativized += 1
+        if relative != filepath or paper.get("file_size") is None:
+            report.updates.append((paper["id"], relative, size))
+
+    orphans = {key: value for key, value in files.items() if key not in matched}
+    # 按文件名索引孤儿文件，用于找回被移动到其他目录的文件
+    orphans_by_name = {}
+    for key in orphans:
+        orphans_by_name.setdefault(os.path.basename(key), []).append(key)
+
+    for paper in unresolved:
+        name = os.path.basename(os.path.normcase(utils.resolve_paper_path(paper["filepath"])))
+        candidates = [
+            key
+            for key in orphans_by_name.get(name, ())
+            if key in orphans and (paper.get("file_size") is None or orphans[key][1] == paper["file_size"])
+        ]
+        if len(candidates) == 1:
+            abs_path, size = orphans.pop(candidates[0])
+            report.relocated.append((paper, utils.relative_paper_path(abs_path), size))
+        else:
+            report.missing.append(paper)
+
+    report.orphans = sorted(orphans.values())
+    return report
+
+
+def apply_fixes(report):
+    """写入路径修复，并把仍然丢失文件的记录标记为已清理 (可重新下载)。"""
+    updates = report.updates + [(paper["id"], path, size) for paper, path, size in report.relocated]
+    if updates:
+        database.update_paper_paths(updates)
+    if report.missing:
+        database.mark_papers_evicted([paper["id"] for paper in report.missing])
+
+
+def redownload(config_data, papers, workers=4):
+    """重新下载丢失的文件，返回 [(paper, 是否成功)]。"""
+    from .crawler import Crawler
+
+    crawler = Crawler(config_data)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="reconcile-download") as pool:
+        return list(zip(papers, pool.map(crawler.download_single_paper, [dict(p) for p in papers])))
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.reconcile",
+        description="Check the paper database against the download directory.",
+    )
+    parser.add_argument("--config", default="config.yaml", help="Path to the configuration file.")
+    parser.add_argument("--fix", action="store_true", help="Rewrite paths and mark papers whose files are missing.")
+    parser.add_argument(
+        "--redownload", action="store_true", help="Download missing files again (implies --fix)."
+    )
+    parser.add_argument("--full", action="store_true", help="Ignore the directory cache and list every directory.")
+    parser.add_argument("--workers", type=int, default=8, help="Number of directory scanning threads.")
+    parser.add_argument(
+        "--download-workers", type=int, default=4, help="Number of download threads for --redownload."
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default=None,
+        help="Override logging.level from the config.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    try:
+        config_data = config.load_config(args.config)
+    except Exception as e:
+        sys.stderr.write(f"加载配置文件失败: {e}\n")
+        return EXIT_USAGE
+
+    # 标准输出留给 NDJSON 结果，日志始终以 JSON 行写到标准错误
+    logging_settings = {**(config_data.get("logging") or {}), "mode": "json"}
+    if args.log_level:
+        logging_settings["level"] = args.log_level
+    setup_logging(logging_settings)
+    init_db()
+
+    fix = args.fix or args.redownload
+    download_root = (config_data.get("output_settings") or {}).get("download_dir") or "paper"
+    root = os.path.join(config.get_project_root(), download_root)
+    writer = NdjsonWriter(sys.stdout)
+    started = time.monotonic()
+
+    scanner = DirectoryScanner(root, args.workers, None if args.full else database.load_scan_cache(root))
+    files = scanner.scan()
+    database.save_scan_cache(scanner.root, scanner.entries)
+    scanned_at = time.monotonic()
+
+    report = diff(database.get_resident_papers(), files, root)
+    logger.info(
+        "扫描完成: %d 个文件 (%d 个目录重新列出，%d 个目录使用缓存)，耗时 %.2f 秒。",
+        len(files),
+        scanner.dirs_scanned,
+        scanner.dirs_cached,
+        scanned_at - started,
+    )
+
+    for paper, path, _ in report.relocated:
+        writer.write({"event": "relocated", "id": paper["id"], "title": paper["title"], "from": paper["filepath"], "to": path})
+    for paper in report.missing:
+        writer.write({"event": "missing", "id": paper["id"], "title": paper["title"], "filepath": paper["filepath"]})
+    for path, size in report.orphans:
+        writer.write({"event": "orphan", "path": path, "size": size})
+
+    redownloaded = 0
+    if fix:
+        apply_fixes(report)
+        if args.redownload and report.missing:
+            logger.info("正在重新下载 %d 篇丢失文件的论文...", len(report.missing))
+            for paper, success in redownload(config_data, report.missing, args.download_workers):
+                writer.write({"event": "redownloaded", "id": paper["id"], "title": paper["title"], "success": success})
+                redownloaded += bool(success)
+
+    writer.write(
+        {
+            "event": "summary",
+            "fixed": fix,
+            "files": len(files),
+            "papers": report.checked,
+            "relativized": report.relativized,
+            "relocated": len(report.relocated),
+            "missing": len(report.missing),
+            "redownloaded": redownloaded,
+            "orphans": len(report.orphans),
+            "dirs_scanned": scanner.dirs_scanned,
+            "dirs_cached": scanner.dirs_cached,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+    )
+    unresolved = len(report.missing) - redownloaded if fix else len(report.missing) + len(report.relocated)
+    return EXIT_PROBLEMS if unresolved or report.orphans else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+# src/retry.py
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# 值得重试的 HTTP 状态码：超时、限流以及服务端临时错误。404 等客户端错误不会重试。
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# 熔断器状态
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# 熔断器状态在 /metrics 中对应的数值
+_STATE_VALUES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+
+class RetryPolicy:
+    """
+    指数退避 + 抖动的重试策略。
+    第 n 次失败后等待 base_delay * 2**n 秒 (不超过 max_delay)，
+    并随机减去其中至多 jitter 比例的时间，避免大量线程同时重试。
+    """
+
+    def __init__(
+        self,
+        max_retries=3,
+        base_delay=1.0,
+        max_delay=60.0,
+        jitter=0.5,
+        retryable_status_codes=RETRYABLE_STATUS_CODES,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retryable_status_codes = retryable_status_codes
+
+    def is_retryable_status(self, status_code):
+        return status_code in self.retryable_status_codes
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        返回第 attempt 次 (从 0 开始) 失败后应等待的秒数。
+        服务器给出 Retry-After 时以其为准 (同样受 max_delay 限制)。
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (1 - self.jitter * random.random())
+
+
+def parse_retry_after(value):
+    """
+    解析 Retry-After 响应头，支持秒数和 HTTP 日期两种格式。
+    无法解析时返回 None。
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_after_from_response(response):
+    """从响应中读取 Retry-After (秒)；没有该响应头时返回 None。"""
+    if response is None:
+        return None
+    return parse_retry_after(response.headers.get("Retry-After"))
+
+
+class CircuitBreaker:
+    """
+    单个主机的熔断器。
+    连续失败 failure_threshold 次后进入 open 状态，在 recovery_timeout 秒内直接拒绝请求；
+    超时后进入 half_open 状态放行一个探测请求，成功则恢复 closed，失败则重新 open。
+    """
+
+    def __init__(self, host, failure_threshold=5, recovery_timeout=30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """当前是否允许向该主机发送请求。"""
+        new_state = None
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                new_state = self._set_state(STATE_HALF_OPEN)
+            if self.state == STATE_CLOSED:
+                allowed = True
+            elif self._probe_in_flight:
+                # half_open: 同一时间只放行一个探测请求
+                allowed = False
+            else:
+                self._probe_in_flight = True
+                allowed = True
+        _notify_state_change(self.host, new_state)
+        return allowed
+
+    def record_success(self):
+        new_state = None
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != STATE_CLOSED:
+                new_state = self._set_state(STATE_CLOSED)
+        _notify_state_change(self.host, new_state)
+
+    def record_failure(self):
+        new_state = None
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == STATE_HALF_OPEN or (
+                self.state == STATE_CLOSED
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+                new_state = self._set_state(STATE_OPEN)
+        _notify_state_change(self.host, new_state)
+
+    def release_probe(self):
+        """
+        请求因本地原因 (例如磁盘已满) 中止、无法判断主机是否正常时调用：
+        释放 half_open 状态下的探测名额，不改变熔断器状态，之后的请求可以重新探测。
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "host": self.host,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+            }
+
+    def _set_state(self, state):
+        # 调用方需持有 self._lock；状态变化的通知在释放锁之后发出
+        self.state = state
+        if state == STATE_OPEN:
+            logger.warning(
+                "主机 %s 连续失败 %d 次，熔断 %.0f 秒。",
+                self.host, self.consecutive_failures, self.recovery_timeout,
+            )
+        else:
+            logger.info("主机 %s 熔断器状态变为 %s。", self.host, state)
+        return state
+
+
+# --- 熔断器注册表 ---
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+_state_listeners = []
+
+# 新建熔断器时使用的参数，可通过 configure_breakers 修改
+_breaker_settings = {"failure_threshold": 5, "recovery_timeout": 30.0}
+
+
+def configure_breakers(failure_threshold=None, recovery_timeout=None):
+    """修改之后新建的熔断器所用的阈值与恢复时间。"""
+    if failure_threshold is not None:
+        _breaker_settings["failure_threshold"] = failure_threshold
+    if recovery_timeout is not None:
+        _breaker_settings["recovery_timeout"] = recovery_timeout
+
+
+def get_breaker(url):
+    """返回 URL 所属主机的熔断器，不存在时创建。"""
+    host = urlparse(url).netloc or url
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, **_breaker_settings)
+            _breakers[host] = breaker
+        return breaker
+
+
+def breaker_states():
+    """返回所有已知主机的熔断器状态列表，供界面展示。"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
+
+
+def add_state_listener(listener):
+    """注册熔断器状态变化回调: listener(host, state)。"""
+    _state_listeners.append(listener)
+
+
+def _notify_state_change(host, state):
+    if state is None:
+        return
+    metrics.CIRCUIT_STATE.set(_STATE_VALUES[state], host=host)
+    for listener in list(_state_listeners):
+        try:
+            listener(host, state)
+        except Exception as e:
+            logger.debug("熔断器状态回调出错: %s", e)
@@ -0,0 +1,289 @@
+# src/scheduler.py
+
+"""
+进程内的定时抓取调度器。
+
+按 config.yaml 中 schedules 段的 cron 表达式定期运行各配置档，供 app.py 与批量模式的
+守护进程 (python -m src.batch --daemon) 使用。与外部 cron 每次启动新进程相比，
+调度器在同一进程内复用 HTTP 连接池、Crawler 实例与已入库链接索引。
+
+    schedules:
+      enabled: true               # 仅对 app.py 有效；守护进程总是运行调度器
+      jitter_seconds: 60          # 每次触发时间随机推迟 0~60 秒，避免多个实例同时请求数据源
+      misfire_grace_seconds: 300  # 超过预定时间 300 秒仍未能触发 (例如进程被挂起) 则跳过本次
+      jobs:
+        - profile: genomics
+          cron: "0 3 * * *"
+        - profile: imaging
+          cron: "30 */6 * * *"
+          jitter_seconds: 0
+
+cron 表达式为标准的 5 个字段 (分 时 日 月 周)，支持 *、a-b、*/n、a-b/n、逗号列表，
+以及 @hourly / @daily / @weekly / @monthly 简写；时间按本地时区计算。
+同一任务的上一次运行尚未结束时，新的触发会被跳过 (single-flight)。
+"""
+
+import random
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+# (最小值, 最大值) —— 分、时、日、月、周 (0 与 7 均表示周日)
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# 调度循环的最长休眠时间，使系统时间被调整后也能及时重新计算
+_MAX_SLEEP_SECONDS = 30
+
+
+class CronSchedule:
+    """解析后的 5 字段 cron 表达式。"""
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式需要 5 个字段: '{expression}'")
+        parsed = [self._parse_field(field, low, high) for field, (low, high) in zip(fields, _FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 周日既可写作 0 也可写作 7；datetime.weekday() 中周一为 0，这里统一转换为 cron 的 0=周日
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # 与 Vixie cron 一致：日与周都被限定时，满足其一即可
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(","):
+            step = 1
+            stepped = "/" in part
+            if stepped:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"cron 步长必须为正数: '{field}'")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                # "N/step" 等价于 "N-最大值/step"，步长为 1 时也是如此
+                start = int(part)
+                end = high if stepped else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron 字段超出范围 [{low}, {high}]: '{field}'")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, dt):
+        """返回严格晚于 dt 的下一个触发时间 (精确到分钟)。"""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # 跳到下个月的第一天
+                year, month = (candidate.year + 1, 1) if candidate.month == 12 else (candidate.year, candidate.month + 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"cron 表达式在 5 年内没有触发时间: '{self.expression}'")
+
+
+class ScheduledJob:
+    """一个定时任务及其运行状态。"""
+
+    def __init__(self, name, profile, cron, jitter_seconds=0, misfire_grace_seconds=300):
+        self.name = name
+        self.profile = profile
+        self.schedule = CronSchedule(cron)
+        self.jitter_seconds = max(0, jitter_seconds)
+        self.misfire_grace_seconds = max(0, misfire_grace_seconds)
+        self.due_at = None
+        self.thread = None
+        self.runs = 0
+        self.skipped_overlap = 0
+        self.misfires = 0
+        self.last_started = None
+        self.last_finished = None
+        self.last_status = None
+
+    def plan_next(self, after):
+        """根据 cron 表达式与随机抖动计算下一次触发时间。"""
+        jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0
+        self.due_at = self.schedule.next_after(after) + timedelta(seconds=jitter)
+        return self.due_at
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def snapshot(self):
+        return {
+            "name": self.name,
+            "profile": self.profile,
+            "cron": self.schedule.expression,
+            "next_run": self.due_at.isoformat(timespec="seconds") if self.due_at else None,
+            "running": self.running,
+            "runs": self.runs,
+            "skipped_overlap": self.skipped_overlap,
+            "misfires": self.misfires,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "last_status": self.last_status,
+        }
+
+
+def jobs_from_config(schedules):
+    """根据 config.yaml 中的 schedules 段创建 ScheduledJob 列表。"""
+    schedules = schedules or {}
+    default_jitter = schedules.get("jitter_seconds", 0)
+    default_grace = schedules.get("misfire_grace_seconds", 300)
+    jobs = []
+    for entry in schedules.get("jobs") or []:
+        if not entry.get("enabled", True):
+            continue
+        profile = entry["profile"]
+        jobs.append(
+            ScheduledJob(
+                name=entry.get("name", profile),
+                profile=profile,
+                cron=entry["cron"],
+                jitter_seconds=entry.get("jitter_seconds", default_jitter),
+                misfire_grace_seconds=entry.get("misfire_grace_seconds", default_grace),
+            )
+        )
+    return jobs
+
+
+class Scheduler:
+    """
+    在后台线程中按计划触发任务。
+
+    run_profile(profile_name) 在每个任务自己的线程中执行，阻塞直到本次运行结束；
+    is_busy(profile_name) 若提供，返回 True 时本次触发会被跳过
+    (例如对应 Crawler 的 is_running 为真，或有手动发起的抓取正在进行)。
+    """
+
+    def __init__(self, jobs, run_profile, is_busy=None):
+        self.jobs = list(jobs)
+        self.run_profile = run_profile
+        self.is_busy = is_busy
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """在后台线程中启动调度循环。"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="crawl-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """停止调度循环；正在运行的任务不受影响。"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def wait_for_running_jobs(self, timeout=None):
+        """等待正在运行的任务结束，返回是否全部结束。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in self.jobs:
+            if job.thread is not None:
+                job.thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+        return not any(job.running for job in self.jobs)
+
+    def snapshot(self):
+        return [job.snapshot() for job in self.jobs]
+
+    def run_forever(self):
+        """调度循环，阻塞直到 stop() 被调用。"""
+        now = datetime.now()
+        for job in self.jobs:
+            job.plan_next(now)
+            logger.info("定时任务 '%s' (%s) 下次运行时间: %s", job.name, job.schedule.expression, job.due_at)
+
+        while not self._stop_event.is_set():
+            now = datetime.now()
+            for job in self.jobs:
+                if job.due_at <= now:
+                    self._fire(job, now)
+            if not self.jobs:
+                self._stop_event.wait(_MAX_SLEEP_SECONDS)
+                continue
+            next_due = min(job.due_at for job in self.jobs)
+            sleep_seconds = min(_MAX_SLEEP_SECONDS, max(0.0, (next_due - datetime.now()).total_seconds()))
+            self._stop_event.wait(sleep_seconds)
+
+    def _fire(self, job, now):
+        lateness = (now - job.due_at).total_seconds()
+        # 无论本次是否运行，下一次都从现在开始计算，错过的多次触发不会被补跑
+        scheduled_for = job.due_at
+        job.plan_next(now)
+
+        if lateness > job.misfire_grace_seconds:
+            job.misfires += 1
+            metrics.SCHEDULED_RUNS.inc(profile=job.profile, result="misfire")
+            logger.warning(
+                "定时任务 '%s' 错过了预定时间 %s (已晚 %.0f 秒)，跳过本次，下次运行时间: %s",
+                job.name, scheduled_for, lateness, job.due_at,
+            )
+            return
+
+        if job.running or (self.is_busy is not None and self.is_busy(job.profile)):
+            job.skipped_overlap += 1
+            metrics.SCHEDULED_RUNS.inc(profile=job.profile, result="overlap")
+            logger.warning("定时任务 '%s' 的上一次运行尚未结束，跳过本次。下次运行时间: %s", job.name, job.due_at)
+            return
+
+        job.thread = threading.Thread(
+            target=self._run_job, args=(job,), name=f"scheduled-{job.name}", daemon=True
+        )
+        job.thread.start()
+
+    def _run_job(self, job):
+        job.runs += 1
+        job.last_started = datetime.now().isoformat(timespec="seconds")
+        job.last_status = "running"
+        metrics.SCHEDULED_RUNS.inc(profile=job.profile, result="started")
+        logger.info("定时任务 '%s' 开始运行 (配置档: %s)", job.name, job.profile)
+        try:
+            self.run_profile(job.profile)
+            job.last_status = "ok"
+        except Exception as e:
+            job.last_status = f"error: {e}"
+            metrics.SCHEDULED_RUNS.inc(profile=job.profile, result="failed")
+            logger.error("定时任务 '%s' 运行失败: %s", job.name, e, exc_info=True)
+        finally:
+            job.last_finished = datetime.now().isoformat(timespec="seconds")
+            logger.info("定时任务 '%s' 结束，下次运行时间: %s", job.name, job.due_at)
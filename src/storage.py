@@ -0,0 +1,237 @@
+# src/storage.py
+
+"""
+下载目录的磁盘配额与剩余空间保护。
+
+数据库记录每个 PDF 的大小 (file_size) 与最近打开时间 (last_access)。每次下载前调用
+ensure_capacity()：
+    - 已下载文件总大小超过 quota_gb 时，按清理策略删除文件直到回到配额以内；
+    - 磁盘剩余空间低于 min_free_gb 时同样先清理；清理后仍然不足 (或策略为 none) 时，
+      最多等待 defer_timeout 秒，仍不足则拒绝下载，避免写满磁盘导致整个服务不可用。
+下载完成后调用 enforce_quota()，把刚写入的文件计入配额。
+
+清理策略: lru 先清理最久未打开的文件，oldest 先清理最早下载的文件，none 不自动清理。
+keep_metadata 为 true 时只删除文件并标记记录 (evicted_at)，论文仍显示在列表中，可重新下载；
+为 false 时连同记录一起删除。
+
+    storage:
+      quota_gb: 0           # 已下载 PDF 的总大小上限，0 表示不限制
+      min_free_gb: 1        # 下载前要求的最小磁盘剩余空间
+      eviction: lru         # lru | oldest | none
+      keep_metadata: true
+      defer_timeout: 0      # 空间不足时等待的秒数，0 表示立即拒绝
+"""
+
+import os
+import time
+import shutil
+import logging
+import threading
+
+from . import database, metrics, utils
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "quota_gb": 0,
+    "min_free_gb": 1,
+    "eviction": "lru",
+    "keep_metadata": True,
+    "defer_timeout": 0,
+}
+
+EVICTION_POLICIES = ("lru", "oldest", "none")
+
+# 每次从数据库取出的待清理文件数
+_EVICTION_BATCH = 100
+# 空间不足而等待时，重新检查的间隔 (秒)
+_DEFER_POLL_INTERVAL = 5
+
+# 同一时间只有一个线程检查配额并清理文件，避免多个下载线程重复清理
+_lock = threading.Lock()
+_sizes_backfilled = False
+_eviction_listeners = []
+
+
+def _settings(settings):
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    if settings["eviction"] not in EVICTION_POLICIES:
+        logger.warning("未知的清理策略 '%s'，不自动清理文件。", settings["eviction"])
+        settings["eviction"] = "none"
+    return settings
+
+
+def _gb_to_bytes(value):
+    return int(float(value or 0) * 1024**3)
+
+
+def add_eviction_listener(listener):
+    """注册文件清理回调: listener(papers, keep_metadata)，papers 为被清理的记录列表。"""
+    _eviction_listeners.append(listener)
+
+
+def _notify_evicted(papers, keep_metadata):
+    for listener in list(_eviction_listeners):
+        try:
+            listener(papers, keep_metadata)
+        except Exception as e:
+            logger.debug("文件清理回调出错: %s", e)
+
+
+def free_bytes(directory):
+    """返回 directory 所在文件系统的剩余空间；目录尚未创建时检查其最近的已存在上级目录。"""
+    path = os.path.abspath(directory)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    free = shutil.disk_usage(path).free
+    metrics.STORAGE_FREE_BYTES.set(free)
+    return free
+
+
+def backfill_sizes():
+    """为旧版本下载、缺少 file_size 的记录补写文件大小；文件已不存在的记录记为 0。"""
+    total = 0
+    while True:
+        papers = database.get_papers_missing_size()
+        if not papers:
+            break
+        sizes = []
+        for paper in papers:
+            try:
+                sizes.append((paper["id"], os.path.getsize(utils.resolve_paper_path(paper["filepath"]))))
+            except OSError:
+                sizes.append((paper["id"], 0))
+        database.set_paper_file_sizes(sizes)
+        total += len(sizes)
+    if total:
+        logger.info("已补写 %d 条论文记录的文件大小。", total)
+
+
+def usage():
+    """返回仍在磁盘上的论文文件总大小 (字节)。"""
+    global _sizes_backfilled
+    if not _sizes_backfilled:
+        backfill_sizes()
+        _sizes_backfilled = True
+    used, _ = database.storage_usage()
+    metrics.STORAGE_USED_BYTES.set(used)
+    return used
+
+
+def evict(settings, bytes_to_free, keep_ids=()):
+    """
+    按清理策略删除文件，直到释放 bytes_to_free 字节或没有可清理的文件；返回释放的字节数。
+    keep_ids 中的记录不会被清理。
+    """
+    settings = _settings(settings)
+    policy = settings["eviction"]
+    if policy == "none" or bytes_to_free <= 0:
+        return 0
+
+    freed = 0
+    skipped = set(keep_ids)  # 保留的记录与无法删除的文件，本次不再尝试
+    while freed < bytes_to_free:
+        candidates = database.get_eviction_candidates(policy, _EVICTION_BATCH, skipped)
+        if not candidates:
+            break
+        evicted = []
+        for paper in candidates:
+            if freed >= bytes_to_free:
+                break
+            try:
+                os.remove(utils.resolve_paper_path(paper["filepath"]))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("清理文件 %s 失败: %s", paper["filepath"], e)
+                skipped.add(paper["id"])
+                continue
+            freed += paper.get("file_size") or 0
+            evicted.append(paper)
+
+        if evicted:
+            ids = [paper["id"] for paper in evicted]
+            if settings["keep_metadata"]:
+                database.mark_papers_evicted(ids)
+            else:
+                database.delete_papers_by_ids(ids)
+            metrics.STORAGE_EVICTIONS.inc(len(evicted), policy=policy)
+            logger.info(
+                "磁盘配额: 已按 %s 策略清理 %d 个文件，释放 %.1f MB。",
+                policy,
+                len(evicted),
+                freed / 1048576,
+            )
+            _notify_evicted(evicted, settings["keep_metadata"])
+    return freed
+
+
+def _check(settings, directory):
+    """检查配额与剩余空间，必要时清理文件；返回 None 表示可以下载，否则返回原因。"""
+    quota = _gb_to_bytes(settings["quota_gb"])
+    if quota > 0:
+        over = usage() - quota
+        if over > 0 and evict(settings, over) < over:
+            return f"已下载的论文超过磁盘配额 ({settings['quota_gb']} GB)"
+
+    min_free = _gb_to_bytes(settings["min_free_gb"])
+    if min_free > 0:
+        shortfall = min_free - free_bytes(directory)
+        if shortfall > 0:
+            evict(settings, shortfall)
+            if free_bytes(directory) < min_free:
+                return f"磁盘剩余空间不足 {settings['min_free_gb']} GB"
+    return None
+
+
+def ensure_capacity(settings, directory, cancel_event=None):
+    """
+    下载前调用：确认 directory 所在磁盘有足够空间且未超过配额，必要时先清理文件。
+    空间不足时最多等待 defer_timeout 秒 (可被 cancel_event 中断)。
+    返回 (是否可以下载, 原因)。
+    """
+    settings = _settings(settings)
+    deadline = time.monotonic() + max(0, settings["defer_timeout"])
+    while True:
+        with _lock:
+            reason = _check(settings, directory)
+        if reason is None:
+            return True, None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False, reason
+        logger.info("%s，等待空间释放后再下载...", reason)
+        if cancel_event is not None:
+            if cancel_event.wait(min(_DEFER_POLL_INTERVAL, remaining)):
+                return False, "下载已取消"
+        else:
+            time.sleep(min(_DEFER_POLL_INTERVAL, remaining))
+
+
+def enforce_quota(settings, keep_ids=()):
+    """下载完成后调用：总大小超过配额时清理文件 (keep_ids 为刚下载的论文)；返回释放的字节数。"""
+    settings = _settings(settings)
+    quota = _gb_to_bytes(settings["quota_gb"])
+    if quota <= 0:
+        return 0
+    with _lock:
+        over = usage() - quota
+        return evict(settings, over, keep_ids) if over > 0 else 0
+
+
+def status(settings, directory):
+    """返回磁盘使用情况，供 /api/storage 使用。"""
+    settings = _settings(settings)
+    with _lock:
+        used = usage()
+    return {
+        "used_bytes": used,
+        "free_bytes": free_bytes(directory),
+        "quota_bytes": _gb_to_bytes(settings["quota_gb"]),
+        "min_free_bytes": _gb_to_bytes(settings["min_free_gb"]),
+        "eviction": settings["eviction"],
+        "keep_metadata": settings["keep_metadata"],
+    }
@@ -0,0 +1,101 @@
+# src/tracing.py
+
+"""
+按阶段统计耗时的轻量追踪工具。
+
+Crawler 为每次运行创建一个 Tracer，并在执行线程中通过 activate() 将其设为当前 Tracer；
+代码中任意位置的 span("阶段名") 都会把耗时累加到当前 Tracer 上。
+没有激活的 Tracer 时 span() 不做任何记录。
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class Tracer:
+    """累加每个阶段 (span) 的调用次数、总耗时与最大耗时。"""
+
+    def __init__(self):
+        self._spans = {}
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+
+    def record(self, name, seconds, count=1):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = [0, 0.0, 0.0]
+            stats[0] += count
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def summary(self):
+        """按总耗时降序返回各阶段统计，单位为秒。"""
+        with self._lock:
+            items = [(name, list(stats)) for name, stats in self._spans.items()]
+        wall = time.perf_counter() - self.started_at
+        rows = []
+        for name, (count, total, longest) in sorted(items, key=lambda item: item[1][1], reverse=True):
+            rows.append(
+                {
+                    "stage": name,
+                    "count": count,
+                    "total_seconds": round(total, 4),
+                    "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+                    "max_ms": round(longest * 1000, 3),
+                    "percent_of_wall": round(total / wall * 100, 1) if wall > 0 else 0.0,
+                }
+            )
+        return rows
+
+
+def current_tracer():
+    return getattr(_local, "tracer", None)
+
+
+@contextmanager
+def activate(tracer):
+    """在当前线程中将 tracer 设为当前 Tracer。"""
+    previous = current_tracer()
+    _local.tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _local.tracer = previous
+
+
+@contextmanager
+def span(name):
+    """统计 with 代码块的耗时，记录到当前线程的 Tracer。"""
+    tracer = current_tracer()
+    if tracer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.record(name, time.perf_counter() - start)
+
+
+def traced_iter(name, iterable):
+    """
+    逐个产出 iterable 的元素，并把每次取下一个元素所花的时间记为一个 span。
+    用于统计生成器 (例如各个 fetcher) 自身的耗时，而不包括消费者处理元素的时间。
+    """
+    iterator = iter(iterable)
+    while True:
+        tracer = current_tracer()
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            if tracer is not None:
+                tracer.record(name, time.perf_counter() - start, count=0)
+            return
+        if tracer is not None:
+            tracer.record(name, time.perf_counter() - start)
+        yield item
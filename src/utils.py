@@ -1,24 +1,120 @@
 import os
 import re
+import sys
+import json
 import time
+import hashlib
+import functools
+import queue
+import atexit
+import threading
 import logging
-import requests
+import logging.handlers
+from datetime import datetime, timezone
+
+from . import metrics, retry
+
+# requests 在首次发起网络请求时才导入 (见 get_session 等)，
+# 只用到日志配置或文件名处理的代码路径不必为它付出导入时间。
 
 logger = logging.getLogger(__name__)
 
 
-from rich.logging import RichHandler
+# JSON 模式下负责实际格式化与写出的后台监听器
+_log_listener = None
+
+# 进程内共享的 HTTP 会话 (连接池)，见 get_session()
+_session = None
+_session_lock = threading.Lock()
+
+# 每个主机保持的空闲连接数上限，需不小于并发下载线程数
+HTTP_POOL_SIZE = 32
+
+# 计算文件摘要时每次读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    每条日志输出为一行 JSON，便于日志收集系统解析。
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
 
-def setup_logging():
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
     """
-    配置日志记录，使用 rich.logging 来美化输出。
+    不在调用线程中格式化消息的 QueueHandler。
+    标准实现的 prepare() 会在工作线程里先格式化一次；这里直接入队原始记录，
+    % 参数的拼接与 JSON 序列化全部交给 QueueListener 所在的后台线程。
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _stop_log_listener():
+    """停止后台日志监听器，并写出队列中剩余的日志。"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+atexit.register(_stop_log_listener)
+
+
+def setup_logging(settings=None):
+    """
+    配置日志记录。
+
+    settings 对应 config.yaml 中的 logging 段:
+        mode: rich | json   rich 为带颜色的控制台输出 (默认)；json 为适合无人值守运行的 JSON 行输出，
+                            经 QueueHandler/QueueListener 在后台线程中格式化与写出
+        level: INFO         根日志级别
+        levels:             按模块覆盖日志级别，例如 {src.fetchers: WARNING}
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(message)s",
-        datefmt="[%X]",
-        handlers=[RichHandler(rich_tracebacks=True, show_path=False)],
-    )
+    global _log_listener
+    settings = settings or {}
+    mode = settings.get("mode", "rich")
+    level = logging.getLevelName(str(settings.get("level", "INFO")).upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    if mode == "json":
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        _stop_log_listener()
+        _log_listener = logging.handlers.QueueListener(
+            log_queue, stream_handler, respect_handler_level=True
+        )
+        _log_listener.start()
+        handler = _DeferredQueueHandler(log_queue)
+    else:
+        from rich.logging import RichHandler
+
+        handler = RichHandler(rich_tracebacks=True, show_path=False)
+        handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name, module_level in (settings.get("levels") or {}).items():
+        logging.getLogger(name).setLevel(str(module_level).upper())
 
 
 def sanitize_filename(filename):
@@ -31,33 +127,226 @@ def sanitize_filename(filename):
     return filename[:150]
 
 
-def make_api_request(url, max_retries=3, delay=5):
+@functools.lru_cache(maxsize=None)
+def _project_root_prefix():
+    from .config import get_project_root
+
+    return os.path.join(get_project_root(), "")
+
+
+def resolve_paper_path(filepath):
+    """
+    把数据库中保存的论文文件路径转换为规范化的绝对路径。
+    相对路径 (新版本保存的，或手工导入的记录) 按项目根目录解析；绝对路径原样规范化。
+    """
+    return os.path.normpath(os.path.join(_project_root_prefix(), filepath))
+
+
+def relative_paper_path(filepath):
+    """
+    返回保存到数据库的论文文件路径：项目根目录下的文件保存为相对路径，
+    整个目录被移动或复制到其他机器后记录仍然有效；其他位置的文件保存绝对路径。
+    """
+    abs_path = resolve_paper_path(filepath)
+    prefix = _project_root_prefix()
+    if os.path.normcase(abs_path).startswith(os.path.normcase(prefix)):
+        return abs_path[len(prefix) :]
+    return abs_path
+
+
+def get_session():
+    """
+    返回进程内共享的 requests.Session。
+    多个线程与多个配置档复用同一个连接池，避免每次请求都重新建立 TCP/TLS 连接。
+    """
+    global _session
+    if _session is None:
+        import requests
+
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def make_api_request(url, max_retries=3, delay=5, stream=False):
     """
     带有重试机制的网络请求函数。
+    仅对网络错误和可重试的状态码 (见 retry.RETRYABLE_STATUS_CODES) 进行指数退避重试，
+    并遵循服务器返回的 Retry-After；目标主机熔断期间直接返回 None。
+    stream 为 True 时不预先读取响应体，调用方读取后需关闭响应。
     """
+    import requests
+
+    policy = retry.RetryPolicy(max_retries=max_retries, base_delay=delay)
+    breaker = retry.get_breaker(url)
+
     for attempt in range(max_retries):
+        if not breaker.allow_request():
+            logger.warning("主机 %s 处于熔断状态，跳过请求 %s。", breaker.host, url)
+            return None
+
+        response = None
         try:
-            response = requests.get(url, timeout=30)
+            with metrics.HTTP_REQUEST_SECONDS.time(host=breaker.host, kind="api"):
+                response = get_session().get(url, timeout=30, stream=stream)
+            metrics.HTTP_REQUESTS.inc(host=breaker.host, kind="api", status=response.status_code)
             response.raise_for_status()
+            breaker.record_success()
             return response
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code
+            e.response.close()  # stream 模式下未读取的响应体会占住连接
+            if not policy.is_retryable_status(status_code):
+                # 主机本身是正常的，只是请求无效，不计入熔断
+                breaker.record_success()
+                logger.error("API 请求失败 %s，HTTP 错误 %s，不再重试。", url, status_code)
+                return None
+            if status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            logger.debug("错误详情: %s", e)
         except requests.exceptions.RequestException as e:
+            metrics.HTTP_REQUESTS.inc(host=breaker.host, kind="api", status="error")
+            breaker.record_failure()
+            logger.debug("错误详情: %s", e)
+
+        if attempt < max_retries - 1:
+            metrics.HTTP_RETRIES.inc(host=breaker.host, kind="api")
+            wait = policy.backoff(attempt, retry.retry_after_from_response(response))
             logger.warning(
-                f"API 请求失败 (尝试 {attempt + 1}/{max_retries})。 {delay}秒后重试..."
+                "API 请求失败 (尝试 %d/%d)。 %.1f秒后重试...", attempt + 1, max_retries, wait
             )
-            logger.debug(f"错误详情: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(delay)
-    logger.error(f"连接 API 失败 {url} 经过 {max_retries} 次尝试。")
+            time.sleep(wait)
+    logger.error("连接 API 失败 %s 经过 %s 次尝试。", url, max_retries)
     return None
 
 
+def _wait_or_cancelled(cancel_event, seconds):
+    """等待指定秒数；若期间收到取消信号则提前返回 True。"""
+    if cancel_event is None:
+        time.sleep(seconds)
+        return False
+    return cancel_event.wait(seconds)
+
+
+def _hash_partial_file(part_path, length):
+    """返回包含 part_path 前 length 字节的 sha256 对象，用于断点续传时继续计算摘要。"""
+    digest = hashlib.sha256()
+    if length:
+        with open(part_path, "rb") as f:
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(HASH_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+    return digest
+
+
+def _response_validator(response):
+    """
+    返回可放入 If-Range 的响应校验值：强 ETag 优先，其次 Last-Modified；都没有时返回 None。
+    弱 ETag (W/"...") 不能用于 If-Range。
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _read_validator(validator_path):
+    try:
+        with open(validator_path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_validator(validator_path, validator):
+    if validator:
+        with open(validator_path, "w", encoding="utf-8") as f:
+            f.write(validator)
+    elif os.path.exists(validator_path):
+        os.remove(validator_path)
+
+
+def file_sha256(path):
+    """计算文件的 SHA-256 十六进制摘要。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def download_pdf(
-    url, filepath, referer=None, progress_callback=None, max_retries=3, delay=3
+    url,
+    filepath,
+    referer=None,
+    progress_callback=None,
+    max_retries=3,
+    delay=3,
+    cancel_event=None,
+    keep_partial=True,
+    checksum_callback=None,
+    transfer_callback=None,
 ):
     """
     下载单个PDF文件并使用回调报告进度，带有重试机制。
+
+    数据先写入 `<filepath>.part`，完成后再原子地重命名为目标文件，
+    因此中断的下载不会留下看似完整的 PDF。
+    若传入 cancel_event (threading.Event)，每个数据块之间以及重试等待期间都会检查它，
+    一旦被设置便立即中止并返回 False。取消时若 keep_partial 为 True 则保留 .part 文件，
+    下次下载同一路径时通过 HTTP Range 请求断点续传；否则删除它。
+    若传入 checksum_callback，下载过程中同步计算 SHA-256 (续传时先计入已有的部分)，
+    下载成功后以十六进制摘要调用它，无需事后再读一遍文件。
+    开始写入 .part 时，响应的 ETag / Last-Modified 保存在 `<filepath>.part.validator` 中；
+    续传时以 If-Range 发送，服务器 (包括换用的其他镜像) 上的文件不同时会返回完整内容，从头写入，
+    避免把不同副本的片段拼在一起。没有校验值的部分文件不续传。
+    若传入 transfer_callback，下载结束时 (取消除外) 调用一次 transfer_callback(ok, size, seconds, status_code)：
+    是否成功、本次调用传输的字节数与总耗时 (含重试)，以及最后一次失败的 HTTP 状态码 (网络错误或成功时为 None)，用于镜像选择。
     """
-    for attempt in range(max_retries):
+    import requests
+
+    part_path = filepath + ".part"
+    validator_path = part_path + ".validator"
+    policy = retry.RetryPolicy(max_retries=max_retries, base_delay=delay)
+    breaker = retry.get_breaker(url)
+
+    def discard_partial():
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+
+    started = time.monotonic()
+    transferred = 0
+    status_code = None
+
+    def finish(ok):
+        if transfer_callback is not None and not (cancel_event is not None and cancel_event.is_set()):
+            transfer_callback(ok, transferred, time.monotonic() - started, None if ok else status_code)
+        return ok
+
+    attempt = 0
+    while attempt < max_retries:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        if not breaker.allow_request():
+            logger.warning("主机 %s 处于熔断状态，跳过下载 %s。", breaker.host, url)
+            return finish(False)
+
+        response = None
         try:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -65,53 +354,156 @@ def download_pdf(
             if referer:
                 headers["Referer"] = referer
 
-            logger.debug(f"尝试下载 {url}, 尝试 {attempt + 1}/{max_retries}")
-            response = requests.get(url, stream=True, timeout=30, headers=headers)
+            resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            validator = _read_validator(validator_path) if resume_from else None
+            if validator:
+                headers["Range"] = f"bytes={resume_from}-"
+                headers["If-Range"] = validator
+            else:
+                # 无法确认服务器上的文件与部分文件相同，从头下载
+                resume_from = 0
+
+            logger.debug("尝试下载 %s, 尝试 %s/%s", url, attempt + 1, max_retries)
+            with metrics.HTTP_REQUEST_SECONDS.time(host=breaker.host, kind="download"):
+                response = get_session().get(url, stream=True, timeout=30, headers=headers)
+            metrics.HTTP_REQUESTS.inc(host=breaker.host, kind="download", status=response.status_code)
             response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-            logger.debug(f"下载请求成功，状态码: {response.status_code}")
+            logger.debug("下载请求成功，状态码: %s", response.status_code)
 
+            # 服务器不支持 Range 或文件已变化 (If-Range 不匹配) 时会返回完整内容 (200)，此时从头写入
+            if resume_from and response.status_code != 206:
+                resume_from = 0
+            if resume_from and _response_validator(response) not in (None, validator):
+                # 忽略 If-Range 的服务器返回了另一份文件的片段：丢弃部分文件后立即从头下载，不计为一次尝试
+                response.close()
+                discard_partial()
+                breaker.record_success()
+                continue
+            if not resume_from:
+                _write_validator(validator_path, _response_validator(response))
             total_size = int(response.headers.get("content-length", 0))
+            if total_size:
+                total_size += resume_from
             block_size = 1024
 
             filename = os.path.basename(filepath)
-            logger.info(f"  开始下载: {filename}")
+            if resume_from:
+                logger.info("  继续下载: %s (已完成 %s 字节)", filename, resume_from)
+            else:
+                logger.info("  开始下载: %s", filename)
+
+            downloaded_size = resume_from
+            digest = _hash_partial_file(part_path, resume_from) if checksum_callback else None
+            # 字节数指标按 1MB 批量累加，避免每个数据块都更新一次
+            unreported_bytes = 0
+            cancelled = False
+            try:
+                with response, open(part_path, "ab" if resume_from else "wb") as f:
+                    for data in response.iter_content(block_size):
+                        if cancel_event is not None and cancel_event.is_set():
+                            cancelled = True
+                            break
+                        f.write(data)
+                        if digest is not None:
+                            digest.update(data)
+                        downloaded_size += len(data)
+                        transferred += len(data)
+                        unreported_bytes += len(data)
+                        if unreported_bytes >= 1024 * 1024:
+                            metrics.DOWNLOAD_BYTES.inc(unreported_bytes, host=breaker.host)
+                            unreported_bytes = 0
+                        if total_size > 0 and progress_callback:
+                            progress = int(100 * downloaded_size / total_size)
+                            progress_callback(progress, downloaded_size, total_size)
+            finally:
+                if unreported_bytes:
+                    metrics.DOWNLOAD_BYTES.inc(unreported_bytes, host=breaker.host)
 
-            downloaded_size = 0
-            with open(filepath, "wb") as f:
-                for data in response.iter_content(block_size):
-                    f.write(data)
-                    downloaded_size += len(data)
-                    if total_size > 0 and progress_callback:
-                        progress = int(100 * downloaded_size / total_size)
-                        progress_callback(progress, downloaded_size, total_size)
+            breaker.record_success()
+            if cancelled:
+                break
 
-            logger.info(f"  下载完成: {filename}")
-            return True
+            os.replace(part_path, filepath)
+            if os.path.exists(validator_path):
+                os.remove(validator_path)
+            logger.info("  下载完成: %s", filename)
+            if checksum_callback is not None:
+                checksum_callback(digest.hexdigest())
+            return finish(True)
 
         except requests.exceptions.HTTPError as e:
-            logger.warning(
-                f"下载失败 {url} (尝试 {attempt + 1}/{max_retries}) - HTTP 错误: {e.response.status_code}. 重试..."
-            )
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            status_code = e.response.status_code
+            e.response.close()  # stream 模式下未读取的响应体会占住连接
+            if status_code == 416 and resume_from:
+                # 断点已失效 (例如远端文件已变化)，丢弃部分文件后立即从头下载，不计为一次尝试
+                discard_partial()
+                breaker.record_success()
+                continue
+            if not policy.is_retryable_status(status_code):
+                # 404 等错误重试也无济于事；主机本身正常，不计入熔断
+                discard_partial()
+                breaker.record_success()
+                logger.error("下载失败 %s - HTTP 错误: %s，不再重试。", url, status_code)
+                return finish(False)
+            # 429 / 5xx 等可重试的错误保留 .part 文件，下次尝试从断点继续
+            if status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
             if attempt < max_retries - 1:
-                time.sleep(delay * (attempt + 1))
+                metrics.HTTP_RETRIES.inc(host=breaker.host, kind="download")
+                wait = policy.backoff(attempt, retry.retry_after_from_response(response))
+                logger.warning(
+                    "下载失败 %s (尝试 %d/%d) - HTTP 错误: %s. %.1f秒后重试...",
+                    url, attempt + 1, max_retries, status_code, wait,
+                )
+                if _wait_or_cancelled(cancel_event, wait):
+                    break
             else:
                 logger.error(
-                    f"下载失败 {url} 经过 {max_retries} 次尝试。最终 HTTP 错误: {e.response.status_code}."
+                    "下载失败 %s 经过 %d 次尝试。最终 HTTP 错误: %s.", url, max_retries, status_code
                 )
-                return False
+                if not keep_partial:
+                    discard_partial()
+                return finish(False)
         except requests.exceptions.RequestException as e:
-            logger.warning(
-                f"下载失败 {url} (尝试 {attempt + 1}/{max_retries}) - 请求错误: {e}. 重试..."
-            )
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            status_code = None
+            if response is None:
+                metrics.HTTP_REQUESTS.inc(host=breaker.host, kind="download", status="error")
+            breaker.record_failure()
+            # 网络中断时保留已下载的部分，下次尝试从断点继续
             if attempt < max_retries - 1:
-                time.sleep(delay * (attempt + 1))
+                metrics.HTTP_RETRIES.inc(host=breaker.host, kind="download")
+                wait = policy.backoff(attempt)
+                logger.warning(
+                    "下载失败 %s (尝试 %d/%d) - 请求错误: %s. %.1f秒后重试...",
+                    url, attempt + 1, max_retries, e, wait,
+                )
+                if _wait_or_cancelled(cancel_event, wait):
+                    break
             else:
                 logger.error(
-                    f"下载失败 {url} 经过 {max_retries} 次尝试。最终请求错误: {e}."
+                    "下载失败 %s 经过 %d 次尝试。最终请求错误: %s.", url, max_retries, e
                 )
-                return False
+                if not keep_partial:
+                    discard_partial()
+                return finish(False)
+        except OSError as e:
+            # 写入 .part 文件、计算校验和或重命名时的本地错误 (例如磁盘已满)：不是主机的问题，
+            # 只释放熔断器的探测名额；重试通常也会失败，直接放弃，并删除部分文件以释放空间
+            breaker.release_probe()
+            if response is not None:
+                response.close()
+            logger.error("下载 %s 时写入文件 %s 失败: %s", url, part_path, e)
+            try:
+                discard_partial()
+            except OSError:
+                pass
+            return finish(False)
+        attempt += 1
+
+    if cancel_event is not None and cancel_event.is_set():
+        logger.info("  下载已取消: %s", os.path.basename(filepath))
+        if not keep_partial:
+            discard_partial()
     return False